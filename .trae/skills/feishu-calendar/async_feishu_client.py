@@ -0,0 +1,416 @@
+import asyncio
+import heapq
+import re
+import time
+
+from feishu_client import (FeishuCalendar, CalendarAPIError, EVENT_PAGE_SIZE, FREEBUSY_WORKERS, CALENDAR_PAGE_SIZE,
+                           CALENDAR_FANOUT_WORKERS, to_rfc3339, from_rfc3339, event_start_key, proposed_span,
+                           match_conflicts)
+from recurrence import expand_events
+from identity_resolver import get_identity_resolver, IdentityNotFoundError
+from intervals import BusyIndex, find_free_slots, DEFAULT_WORK_HOURS, WEEKDAYS, DEFAULT_SLOT_STEP
+from async_transport import get_async_transport, get_tenant_access_token_async, close_async_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+
+
+@instrument_client
+class AsyncFeishuCalendar(FeishuCalendar):
+    """
+    FeishuCalendar 的 asyncio 版本，方法与同步版本一致，需要 await 调用
+    配置读取与 initialize() 复用同步版本
+    """
+
+    async def _aget_tenant_access_token(self):
+        if self.tenant_access_token and time.time() < self.token_expire_time:
+            return self.tenant_access_token
+
+        token, expire_time = await get_tenant_access_token_async(self.app_id, self.app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
+        return self.tenant_access_token
+
+    async def resolve_user_ids(self, values, keep_unresolved_emails=False):
+        """
+        open_id / 手机号 / 邮箱 -> open_id 列表 (同 FeishuCalendar.resolve_user_ids)
+        缓存文件读写在线程中进行，不阻塞事件循环
+        """
+        token = await self._aget_tenant_access_token()
+        return await asyncio.to_thread(get_identity_resolver().resolve_open_ids, self.app_id, token, values,
+                                       keep_unresolved_emails)
+
+    async def list_calendars(self, page_token=None, page_size=CALENDAR_PAGE_SIZE):
+        """
+        获取日历列表的一页 (同 FeishuCalendar.list_calendars)
+        """
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/calendar/v4/calendars"
+        headers = {
+            "Authorization": f"Bearer {token}",
+        }
+        params = {"page_size": page_size}
+        if page_token:
+            params["page_token"] = page_token
+        response = await get_async_transport().get(url, headers=headers, params=params)
+        return response.json()
+
+    async def iter_calendars(self, page_size=CALENDAR_PAGE_SIZE):
+        """
+        逐个返回全部日历的异步生成器 (同 FeishuCalendar.iter_calendars)
+        """
+        page_token = None
+        while True:
+            resp_json = await self.list_calendars(page_token, page_size)
+            if resp_json.get("code") != 0:
+                raise CalendarAPIError("List calendars failed", resp_json)
+            data = resp_json.get("data", {})
+            for calendar in data.get("calendar_list") or []:
+                yield calendar
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                return
+
+    async def refresh_calendars(self):
+        """
+        重新拉取日历列表 (全部分页) 并写入配置 (同 FeishuCalendar.refresh_calendars)
+        """
+        try:
+            calendar_list = [calendar async for calendar in self.iter_calendars()]
+        except CalendarAPIError as e:
+            print(f"List calendars failed: {e.resp_json}")
+            return None
+        self._store_calendars(calendar_list)
+        return calendar_list
+
+    async def resolve_calendar_id(self, name=None, refresh=False):
+        """
+        获取日历 ID，优先使用配置中的缓存 (同 FeishuCalendar.resolve_calendar_id)
+        """
+        if not refresh and self._calendar_cache_valid():
+            calendar_id = self._lookup_calendar(name)
+            if calendar_id:
+                return calendar_id
+        if await self.refresh_calendars() is None:
+            return None
+        return self._lookup_calendar(name)
+
+    async def resolve_calendar_ids(self, names=None):
+        """
+        多个日历名称 / calendar_id -> calendar_id 列表 (同 FeishuCalendar.resolve_calendar_ids)
+        """
+        if not names:
+            if not self._calendar_cache_valid() or "calendar_ids" not in self.config:
+                await self.resolve_calendar_id(refresh=True)
+            return list(self.config.get("calendar_ids") or [])
+        calendar_ids = []
+        for name in names:
+            calendar_id = await self.resolve_calendar_id(name)
+            if not calendar_id:
+                raise ValueError(f"Calendar not found: {name}")
+            calendar_ids.append(calendar_id)
+        return list(dict.fromkeys(calendar_ids))
+
+    async def with_calendar_id(self, func, calendar_id=None):
+        """
+        以 await func(calendar_id) 执行日历接口调用，日历失效时刷新缓存后重试一次 (同 FeishuCalendar.with_calendar_id)
+        """
+        explicit = bool(calendar_id)
+        if not explicit:
+            calendar_id = await self.resolve_calendar_id()
+            if not calendar_id:
+                return None, None
+        resp_json = await func(calendar_id)
+        if not explicit and self.is_stale_calendar_error(resp_json):
+            calendar_id = await self.resolve_calendar_id(refresh=True)
+            if calendar_id:
+                resp_json = await func(calendar_id)
+        return calendar_id, resp_json
+
+    async def iter_events(self, start_time=None, end_time=None, page_size=EVENT_PAGE_SIZE, calendar_id=None,
+                          index=True):
+        """
+        逐条返回日程的异步生成器 (参数同 FeishuCalendar.iter_events)，用法: async for event in client.iter_events(...)
+        """
+        params = {"page_size": page_size}
+        if start_time is not None and end_time is not None:
+            params["start_time"] = str(start_time)
+            params["end_time"] = str(end_time)
+
+        async def fetch_page(cid, page_token=None):
+            url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{cid}/events"
+            headers = {
+                "Authorization": f"Bearer {await self._aget_tenant_access_token()}",
+            }
+            page_params = dict(params, page_token=page_token) if page_token else params
+            response = await get_async_transport().get(url, headers=headers, params=page_params)
+            return response.json()
+
+        calendar_id, resp_json = await self.with_calendar_id(fetch_page, calendar_id)
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+
+        while True:
+            if resp_json.get("code") != 0:
+                raise Exception(f"List events failed: {resp_json}")
+            data = resp_json.get("data", {})
+            items = data.get("items") or []
+            if index:
+                self._index_events(calendar_id, items)
+            for event in items:
+                yield event
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                return
+            resp_json = await fetch_page(calendar_id, page_token)
+
+    async def iter_events_multi(self, calendar_ids=None, start_time=None, end_time=None, page_size=EVENT_PAGE_SIZE,
+                                workers=CALENDAR_FANOUT_WORKERS, errors=None):
+        """
+        同时列出多个日历的日程，按开始时间合并的异步生成器 (同 FeishuCalendar.iter_events_multi)
+        """
+        calendar_ids = list(dict.fromkeys(calendar_ids or await self.resolve_calendar_ids()))
+        if not calendar_ids:
+            return
+        semaphore = asyncio.Semaphore(max(1, workers))
+        failures = {}
+
+        async def fetch(calendar_id):
+            async with semaphore:
+                try:
+                    events = []
+                    async for event in self.iter_events(start_time, end_time, page_size, calendar_id, index=False):
+                        event.setdefault("calendar_id", calendar_id)
+                        events.append(event)
+                    events.sort(key=event_start_key)
+                    return events
+                except Exception as e:
+                    failures[calendar_id] = e
+                    return []
+
+        streams = await asyncio.gather(*(fetch(cid) for cid in calendar_ids))
+        if failures:
+            if errors is None:
+                raise CalendarAPIError(f"List events failed for {len(failures)} calendars",
+                                       {"code": -1, "errors": {cid: str(e) for cid, e in failures.items()}})
+            errors.update(failures)
+        # 并发拉取时不写本地日程库 (SQLite 写锁会让各线程互相等待)，取完后在调用方线程中统一写入
+        for calendar_id, events in zip(calendar_ids, streams):
+            self._index_events(calendar_id, events)
+        for event in heapq.merge(*streams, key=event_start_key):
+            yield event
+
+    async def select_events(self, start_time=None, end_time=None, pattern=None, calendar_id=None,
+                            page_size=EVENT_PAGE_SIZE):
+        """
+        按时间范围与标题正则选出日程的异步生成器 (同 FeishuCalendar.select_events)
+        """
+        matcher = re.compile(pattern, re.IGNORECASE) if pattern else None
+        async for event in self.iter_events(start_time, end_time, page_size, calendar_id):
+            if event.get("status") == "cancelled":
+                continue
+            if matcher and not matcher.search(event.get("summary") or ""):
+                continue
+            yield event
+
+    # 以下方法以本地文件 / SQLite 读写或线程池批量请求为主，在线程中执行同步版本，不阻塞事件循环
+
+    async def sync_events(self, *args, **kwargs):
+        return await self._run_sync("sync_events", *args, **kwargs)
+
+    async def search_events(self, *args, **kwargs):
+        return await self._run_sync("search_events", *args, **kwargs)
+
+    async def agenda(self, *args, **kwargs):
+        return await self._run_sync("agenda", *args, **kwargs)
+
+    async def export_ics(self, *args, **kwargs):
+        return await self._run_sync("export_ics", *args, **kwargs)
+
+    async def import_ics(self, *args, **kwargs):
+        return await self._run_sync("import_ics", *args, **kwargs)
+
+    async def reschedule_events(self, *args, **kwargs):
+        return await self._run_sync("reschedule_events", *args, **kwargs)
+
+    async def delete_events(self, *args, **kwargs):
+        return await self._run_sync("delete_events", *args, **kwargs)
+
+    async def _run_sync(self, name, *args, **kwargs):
+        return await asyncio.to_thread(getattr(FeishuCalendar(), name), *args, **kwargs)
+
+    async def query_freebusy(self, open_id, start_time, end_time):
+        """
+        查询一个用户的忙碌时段 (同 FeishuCalendar.query_freebusy)
+        """
+        url = f"{FEISHU_API_BASE}/calendar/v4/freebusy/list"
+        headers = {
+            "Authorization": f"Bearer {await self._aget_tenant_access_token()}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+        payload = {
+            "time_min": to_rfc3339(start_time),
+            "time_max": to_rfc3339(end_time),
+            "user_id": open_id
+        }
+        response = await get_async_transport().post(url, headers=headers, params={"user_id_type": "open_id"},
+                                                     json=payload, idempotent=True)
+        resp_json = response.json()
+        if resp_json.get("code") != 0:
+            raise CalendarAPIError(f"Query freebusy failed for {open_id}", resp_json)
+        return [
+            (from_rfc3339(item["start_time"]), from_rfc3339(item["end_time"]))
+            for item in resp_json.get("data", {}).get("freebusy_list") or []
+        ]
+
+    async def batch_freebusy(self, open_ids, start_time, end_time, workers=FREEBUSY_WORKERS):
+        """
+        并发查询多个用户的忙碌时段 (同 FeishuCalendar.batch_freebusy)
+        """
+        open_ids = list(dict.fromkeys(uid for uid in open_ids if uid))
+        semaphore = asyncio.Semaphore(max(1, workers))
+
+        async def query(open_id):
+            async with semaphore:
+                return await self.query_freebusy(open_id, start_time, end_time)
+
+        results = await asyncio.gather(*[query(uid) for uid in open_ids], return_exceptions=True)
+        errors = {uid: str(r) for uid, r in zip(open_ids, results) if isinstance(r, BaseException)}
+        if errors:
+            raise CalendarAPIError(f"Query freebusy failed for {len(errors)} users", {"code": -1, "errors": errors})
+        return dict(zip(open_ids, results))
+
+    async def find_common_free_slots(self, open_ids, duration_minutes=60, start_time=None, end_time=None, count=3,
+                                     work_hours=DEFAULT_WORK_HOURS, weekdays=WEEKDAYS, step=DEFAULT_SLOT_STEP):
+        """
+        查找所有人都空闲的前 count 个时段 (同 FeishuCalendar.find_common_free_slots)
+        """
+        start_time = int(start_time or time.time())
+        end_time = int(end_time or start_time + 7 * 24 * 3600)
+        busy = BusyIndex()
+        for intervals in (await self.batch_freebusy(open_ids, start_time, end_time)).values():
+            for start, end in intervals:
+                busy.add(start, end)
+        return find_free_slots(busy, start_time, end_time, duration_minutes * 60, count, work_hours, weekdays, step)
+
+    async def check_conflicts(self, proposed, calendar_ids=None, local=False, page_size=EVENT_PAGE_SIZE):
+        """
+        检查一批日程之间以及与已有日程的时间冲突 (同 FeishuCalendar.check_conflicts)
+        """
+        proposed = list(proposed)
+        span = proposed_span(proposed)
+        if span is None:
+            return []
+        calendar_ids = calendar_ids or [await self.resolve_calendar_id()]
+        if local:
+            existing = await self.agenda(span[0], span[1], calendar_ids, sync=False)
+        else:
+            existing = expand_events([event async for event in self.iter_events_multi(calendar_ids, *span,
+                                                                                      page_size=page_size)], *span)
+        return match_conflicts(proposed, existing)
+
+    async def create_event(self, summary, start_time, end_time, attendees=None, description=None, calendar_id=None,
+                           check_conflicts=False):
+        """
+        创建日程 (参数同 FeishuCalendar.create_event)
+        """
+        if not self.app_id:
+            print("Configuration missing. Please run initialize() first.")
+            return
+
+        token = await self._aget_tenant_access_token()
+
+        if check_conflicts:
+            conflicts = await self.check_conflicts(
+                [{"summary": summary, "start_time": start_time, "end_time": end_time}],
+                [calendar_id] if calendar_id else None)
+            if conflicts:
+                for conflict in conflicts:
+                    print(f"Time conflict with {conflict['other'].get('summary')} ({conflict['other'].get('event_id')})")
+                return None
+
+        if not attendees:
+            attendees = [self.open_id]
+            print(f"No attendees specified. Defaulting to self ({self.open_id}).")
+
+        if not description:
+            description = f"会议主题：{summary}\n自动生成的会议日程。"
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+
+        payload = {
+            "summary": summary,
+            "description": description,
+            "start_time": {"timestamp": str(start_time)},
+            "end_time": {"timestamp": str(end_time)},
+            "need_notification": True
+        }
+
+        async def post_event(cid):
+            url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{cid}/events"
+            response = await get_async_transport().post(url, headers=headers, json=payload)
+            return response.json()
+
+        calendar_id, resp_json = await self.with_calendar_id(post_event, calendar_id)
+        if not calendar_id:
+             print("Error: Could not determine calendar_id. Please specify one.")
+             return None
+
+        if resp_json.get("code") != 0:
+            print(f"Create event failed: {resp_json}")
+            return None
+
+        event_id = resp_json.get("data", {}).get("event", {}).get("event_id")
+        print(f"Event created successfully! Event ID: {event_id}")
+        self._index_events(calendar_id, [resp_json.get("data", {}).get("event")])
+
+        await self._add_attendees(token, calendar_id, event_id, attendees)
+
+        return event_id
+
+    async def _add_attendees(self, token, calendar_id, event_id, attendee_ids):
+        try:
+            attendee_ids = await self.resolve_user_ids(attendee_ids or [], keep_unresolved_emails=True)
+        except IdentityNotFoundError as e:
+            print(f"Add attendees failed: {e}")
+            return
+        if not attendee_ids:
+            return
+
+        url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event_id}/attendees"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+
+        attendees_payload = [
+            {"type": "third_party", "third_party_email": uid} if "@" in uid
+            else {"type": "user", "user_id_type": "open_id", "user_id": uid}
+            for uid in attendee_ids
+        ]
+
+        payload = {
+            "attendees": attendees_payload
+        }
+
+        response = await get_async_transport().post(url, headers=headers, json=payload)
+        resp_json = response.json()
+
+        if resp_json.get("code") != 0:
+            print(f"Add attendees failed: {resp_json}")
+        else:
+            print(f"Added {len(attendee_ids)} attendees.")
+
+
+if __name__ == "__main__":
+    async def main():
+        assistant = AsyncFeishuCalendar()
+        if not assistant.app_id:
+            print("Feishu Calendar is not configured. Please run: python3 feishu_client.py")
+            return
+        print(await assistant.list_calendars())
+        await close_async_transport()
+
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+批量创建飞书日程 (CSV / ICS)
+用法: python3 bulk_create.py <events.csv|events.ics> [--calendar 名称] [--workers 8] [--manifest 路径]
+                             [--duration 60] [--no-notify] [--no-self] [--dry-run] [--check-conflicts [--local-busy]]
+
+- 日历只解析一次，日程由固定大小的线程池并发创建，每个日程拿到 event_id 后立即在同一线程中添加参与人
+- 输入按行流式读取，同时在途的任务数有上限，几千行的文件也不会一次性堆积在内存中
+- 每行的结果追加写入清单文件 (默认 <输入文件>.manifest.jsonl)，中断后重新运行会跳过已完成的行，
+  只补加参与人失败的行不会重复创建日程
+- --check-conflicts 创建前一次性检查冲突 (扫描线，不逐个请求)：与日历中已有日程冲突的行、
+  以及与前面保留下来的行冲突的行都不创建 (上次运行已创建的行不再检查)；--local-busy 时与本地日程库比较，不拉取日程列表
+
+CSV 表头 (除 summary / start 外均可省略):
+    id,summary,start,end,duration,description,location,attendees
+    id: 行的稳定标识 (可选)；没有时按行的内容识别，插入 / 删除行后其他行的进度仍然有效
+    start / end: "YYYY-MM-DD HH:MM"、ISO 8601 或秒级时间戳；只有日期时为全天日程
+    duration: 分钟，没有 end 时使用 (默认 --duration)
+    attendees: 以 ; 分隔的 open_id、手机号或邮箱 (批量解析；通讯录中找不到的邮箱作为外部参与人邀请)
+"""
+
+import sys
+import os
+import csv
+import argparse
+from datetime import datetime
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar
+from event_import import DEFAULT_WORKERS, RowKeys, ics_rows, import_events, manifest_key
+from journal import load_manifest
+
+def parse_time(value):
+    """:return: (秒级时间戳, 是否全天)"""
+    value = value.strip()
+    if value.isdigit():
+        return int(value), False
+    if len(value) == 10:
+        return int(datetime.strptime(value, "%Y-%m-%d").timestamp()), True
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return int(datetime.strptime(value, fmt).timestamp()), False
+        except ValueError:
+            pass
+    return int(datetime.fromisoformat(value).timestamp()), False
+
+def read_csv(path, duration):
+    keys = RowKeys()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for line_no, row in enumerate(csv.DictReader(f), 2):
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+            if not row.get("summary") or not row.get("start"):
+                raise ValueError(f"第 {line_no} 行缺少 summary 或 start")
+            start_time, all_day = parse_time(row["start"])
+            if row.get("end"):
+                end_time, _ = parse_time(row["end"])
+            elif all_day:
+                end_time = start_time + 86400
+            else:
+                end_time = start_time + int(row.get("duration") or duration) * 60
+            event = {
+                "summary": row["summary"],
+                "start_time": start_time,
+                "end_time": end_time,
+                "all_day": all_day,
+                "description": row.get("description") or None,
+                "location": row.get("location") or None,
+                "attendees": [a.strip() for a in row.get("attendees", "").split(";") if a.strip()],
+            }
+            yield keys.key(event, row.get("id")), line_no, event
+
+def iter_input(path, duration):
+    if path.lower().endswith((".ics", ".ical")):
+        return ics_rows(path)
+    return read_csv(path, duration)
+
+def reject_conflicts(assistant, calendar_id, rows, local=False, manifest_path=None):
+    """
+    去掉与已有日程冲突、或与前面保留下来的行冲突的行 (按行的顺序逐行决定，被去掉的行不再占用时间)
+    清单中已创建的行 (上次运行的结果) 视为已保留，不再检查，对应的日程也不算作「已有日程」，
+    这样重新运行时只需补加参与人的行不会与自己冲突
+    :return: 保留的 rows (list)
+    """
+    rows = list(rows)
+    previous = load_manifest(manifest_path) if manifest_path else {}
+    created = {}
+    for i, (key, _, _) in enumerate(rows):
+        prev = previous.get(manifest_key(calendar_id, key))
+        if prev and prev.get("status") == "created" and prev.get("event_id"):
+            created[i] = prev["event_id"]
+    # 已创建的行带上 event_id：check_conflicts 不会再把这些日程当作已有日程
+    proposed = [dict(event, event_id=created[i]) if i in created else event for i, (_, _, event) in enumerate(rows)]
+    conflicts = assistant.check_conflicts(proposed, [calendar_id], local)
+
+    # 每一行的所有冲突 (同一批中两行冲突时两边都记一次)
+    by_row = {}
+    for conflict in conflicts:
+        by_row.setdefault(conflict["index"], []).append(conflict)
+        if not conflict["existing"]:
+            other_index = conflict["other"]["index"]
+            by_row.setdefault(other_index, []).append(dict(conflict, index=other_index, other={
+                "index": conflict["index"], "summary": conflict["summary"]}))
+
+    kept = set(created)
+    rejected = 0
+    for i, (_, line_no, event) in enumerate(rows):
+        if i in kept:
+            continue
+        blocking = next((c for c in by_row.get(i, [])
+                         if c["existing"] or c["other"]["index"] in created or
+                         (c["other"]["index"] < i and c["other"]["index"] in kept)), None)
+        if blocking is None:
+            kept.add(i)
+            continue
+        rejected += 1
+        start = datetime.fromtimestamp(blocking["overlap_start"]).strftime("%Y-%m-%d %H:%M")
+        end = datetime.fromtimestamp(blocking["overlap_end"]).strftime("%H:%M")
+        if blocking["existing"]:
+            with_what = f"已有日程 {blocking['other'].get('summary', '无标题')} "
+        else:
+            with_what = f"第 {rows[blocking['other']['index']][1]} 行"
+        print(f"⚠️  第 {line_no} 行 {event['summary']} 与{with_what}冲突 ({start} - {end})，跳过")
+    if rejected:
+        print(f"⚠️  {rejected} 行因时间冲突未创建")
+    return [row for i, row in enumerate(rows) if i in kept]
+
+def bulk_create(path, calendar=None, workers=DEFAULT_WORKERS, manifest_path=None, duration=60,
+                notify=True, add_self=True, dry_run=False, check_conflicts=False, local_busy=False):
+    """批量创建日程，返回是否全部成功"""
+    if dry_run:
+        count = 0
+        for count, (key, row, event) in enumerate(iter_input(path, duration), 1):
+            start = datetime.fromtimestamp(event["start_time"]).strftime("%Y-%m-%d %H:%M")
+            end = datetime.fromtimestamp(event["end_time"]).strftime("%Y-%m-%d %H:%M")
+            print(f"{row:4}. 📝 {event['summary']}  📅 {start} - {end}  👥 {len(event['attendees'])}")
+        print(f"🔍 共 {count} 个日程 (dry-run，未创建)")
+        return True
+
+    assistant = FeishuCalendar()
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+
+    calendar_id = assistant.resolve_calendar_id(calendar)
+    if not calendar_id:
+        print(f"❌ 没有找到日历: {calendar or '默认日历'}")
+        return False
+
+    manifest_path = manifest_path or f"{path}.manifest.jsonl"
+    print(f"📅 日历: {calendar_id}")
+    print(f"📄 清单: {manifest_path}")
+    rows = iter_input(path, duration)
+    if check_conflicts:
+        rows = reject_conflicts(assistant, calendar_id, rows, local_busy, manifest_path)
+    stats = import_events(assistant, calendar_id, rows, manifest_path, workers, notify, add_self,
+                          batch_id=os.path.abspath(path))
+
+    print("-" * 70)
+    print(f"✅ 新建 {stats['created']} 个, 补加参与人 {stats['attendees_retried']} 个, "
+          f"跳过已完成 {stats['skipped']} 个, 失败 {stats['failed']} 个, 耗时 {stats['seconds']}s")
+    if stats["failed"]:
+        print("💡 修正后重新运行同一命令，只会重试失败的行")
+    return not stats["failed"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量创建飞书日程 (CSV / ICS)")
+    parser.add_argument("file", help="CSV 或 ICS 文件")
+    parser.add_argument("--calendar", help="日历名称或 calendar_id (默认使用默认日历)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"并发数 (默认 {DEFAULT_WORKERS})")
+    parser.add_argument("--manifest", help="结果清单路径 (默认 <file>.manifest.jsonl)")
+    parser.add_argument("--duration", type=int, default=60, help="CSV 中没有 end / duration 时的时长 (分钟，默认 60)")
+    parser.add_argument("--no-notify", action="store_true", help="不给参与人发送通知")
+    parser.add_argument("--no-self", action="store_true", help="没有参与人的日程不默认添加自己")
+    parser.add_argument("--dry-run", action="store_true", help="只解析并打印，不创建")
+    parser.add_argument("--check-conflicts", action="store_true", help="跳过与已有日程或前面的行时间冲突的行")
+    parser.add_argument("--local-busy", action="store_true", help="与 --check-conflicts 一起使用，与本地日程库比较")
+
+    args = parser.parse_args()
+    try:
+        success = bulk_create(args.file, args.calendar, max(1, args.workers), args.manifest, args.duration,
+                              not args.no_notify, not args.no_self, args.dry_run, args.check_conflicts,
+                              args.local_busy)
+    except (OSError, ValueError) as e:
+        print(f"❌ 错误: {e}")
+        success = False
+    sys.exit(0 if success else 1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+按条件批量改期 / 删除飞书日程
+用法: python3 bulk_update.py [--match 正则] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+                             (--shift 偏移 | --duration 分钟 | --delete) [--dry-run] [--yes] [--workers 8]
+                             [--check-conflicts]
+
+一次分页遍历选出匹配的日程，再并发发出 PATCH / DELETE (速率受日历 QPS 限制)；
+改期的新时间直接由列表中的时间字段计算，不逐个 GET 日程。
+偏移格式: 1d、-2h、30m、+1d2h (d 天 / h 小时 / m 分钟)
+--check-conflicts 改期前用扫描线一次检查新时间与其他日程 (及同批改期的日程) 的冲突，冲突的日程不改期
+
+示例:
+    # 节假日调整：10 月 8 日的所有周会推迟一天 (先预览)
+    python3 bulk_update.py --match "周会" --from 2026-10-08 --to 2026-10-09 --shift 1d --dry-run
+    # 取消一段时间内的所有培训
+    python3 bulk_update.py --match "^培训" --from 2026-10-01 --to 2026-10-08 --delete --yes
+"""
+
+import sys
+import os
+import re
+import time
+import argparse
+from datetime import datetime, timedelta
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar, BULK_WORKERS, reschedule_update
+from event_store import event_timestamp
+
+_OFFSET = re.compile(r"^([+-])?(?:(\d+)d)?(?:(\d+)h)?(?:(\d+)m)?$")
+
+def parse_offset(value):
+    """"+1d2h" / "-30m" -> 秒"""
+    match = _OFFSET.match(value.strip().lower())
+    if not match or not any(match.groups()[1:]):
+        raise ValueError(f"无效的偏移: {value} (示例: 1d、-2h、30m)")
+    sign, days, hours, minutes = match.groups()
+    seconds = int(days or 0) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60
+    return -seconds if sign == "-" else seconds
+
+def format_range(start_ts, end_ts):
+    start_dt = datetime.fromtimestamp(start_ts)
+    end_dt = datetime.fromtimestamp(end_ts)
+    end_format = "%H:%M" if start_dt.date() == end_dt.date() else "%m-%d %H:%M"
+    return f"{start_dt.strftime('%Y-%m-%d %H:%M')} - {end_dt.strftime(end_format)}"
+
+def describe(event, shift, duration):
+    """预览一行：原时间 -> 新时间"""
+    start_ts = event_timestamp(event.get("start_time")) or 0
+    end_ts = event_timestamp(event.get("end_time")) or 0
+    line = f"📝 {event.get('summary', '无标题')}  📅 {format_range(start_ts, end_ts)}"
+    if shift is None and duration is None:
+        return line
+    update = reschedule_update(event, shift or 0, duration)
+    if update is None:
+        return line + "  (时间不变)"
+    new_start = event_timestamp(update["start_time"])
+    new_end = event_timestamp(update["end_time"])
+    return line + f"  ➡️  {format_range(new_start, new_end)}"
+
+def skip_conflicts(assistant, calendar_id, events, shift, duration):
+    """去掉改期后与其他日程冲突的日程 (同一批中两个日程冲突时保留靠前的一个)"""
+    proposed = [dict(event, **(reschedule_update(event, shift or 0, duration) or {})) for event in events]
+    rejected = set()
+    for conflict in assistant.check_conflicts(proposed, [calendar_id]):
+        other = conflict["other"]
+        index = conflict["index"] if conflict["existing"] else max(conflict["index"], other["index"])
+        if index not in rejected:
+            rejected.add(index)
+            print(f"⚠️  {events[index].get('summary', '无标题')} 改期后与 {other.get('summary', '无标题')} 冲突，跳过")
+    return [event for i, event in enumerate(events) if i not in rejected]
+
+def bulk_update(pattern=None, date_from=None, date_to=None, shift=None, duration=None, delete=False,
+                dry_run=False, yes=False, workers=BULK_WORKERS, check_conflicts=False):
+    """批量改期或删除匹配的日程"""
+    assistant = FeishuCalendar()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+
+    try:
+        start_time = end_time = None
+        if date_from or date_to:
+            start = datetime.strptime(date_from, "%Y-%m-%d") if date_from else datetime.now()
+            end = datetime.strptime(date_to, "%Y-%m-%d") if date_to else start + timedelta(days=30)
+            start_time, end_time = int(start.timestamp()), int(end.timestamp())
+
+        calendar_id = assistant.resolve_calendar_id()
+        if not calendar_id:
+            print("❌ 没有找到日历")
+            return False
+
+        events = list(assistant.select_events(start_time, end_time, pattern, calendar_id))
+        action = "删除" if delete else "改期"
+        print(f"🔍 匹配到 {len(events)} 个日程，将{action}:")
+        print("-" * 70)
+        for i, event in enumerate(events, 1):
+            print(f"{i:3d}. {describe(event, None if delete else shift, None if delete else duration)}")
+        print("-" * 70)
+
+        if check_conflicts and not delete:
+            events = skip_conflicts(assistant, calendar_id, events, shift, duration)
+        if not events:
+            print("📭 没有匹配的日程")
+            return True
+        if dry_run:
+            print("🔍 dry-run，未做任何修改")
+            return True
+        if not yes:
+            answer = input(f"确认{action}以上 {len(events)} 个日程? [y/N] ").strip().lower()
+            if answer not in ("y", "yes"):
+                print("已取消")
+                return False
+
+        started = time.time()
+        if delete:
+            results = assistant.delete_events(events, calendar_id, workers)
+        else:
+            results = assistant.reschedule_events(events, shift or 0, duration, calendar_id, workers)
+
+        failed = [r for r in results if not r["ok"]]
+        for result in failed:
+            print(f"❌ {result['summary']} ({result['event_id']}): {result['error']}")
+        print(f"✅ {action}成功 {len(results) - len(failed)} 个, 失败 {len(failed)} 个, "
+              f"耗时 {time.time() - started:.2f}s")
+        return not failed
+
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="按条件批量改期 / 删除飞书日程",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("示例:", 1)[1])
+    parser.add_argument("--match", help="标题正则 (忽略大小写)")
+    parser.add_argument("--from", dest="date_from", help="开始日期 YYYY-MM-DD (默认今天)")
+    parser.add_argument("--to", dest="date_to", help="结束日期 YYYY-MM-DD，不含当天 (默认开始日期后 30 天)")
+    parser.add_argument("--shift", help="整体平移，如 1d、-2h、30m")
+    parser.add_argument("--duration", type=int, help="新的时长 (分钟)")
+    parser.add_argument("--delete", action="store_true", help="删除匹配的日程")
+    parser.add_argument("--dry-run", action="store_true", help="只预览，不修改")
+    parser.add_argument("--yes", "-y", action="store_true", help="跳过确认")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS, help=f"并发数 (默认 {BULK_WORKERS})")
+    parser.add_argument("--check-conflicts", action="store_true", help="跳过改期后与其他日程时间冲突的日程")
+
+    args = parser.parse_args()
+    if args.delete == bool(args.shift or args.duration):
+        parser.error("请指定 --shift / --duration (改期) 或 --delete (删除) 之一")
+    if not (args.match or args.date_from or args.date_to):
+        parser.error("请至少指定 --match 或 --from / --to 来选择日程")
+    try:
+        shift = parse_offset(args.shift) if args.shift else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    success = bulk_update(args.match, args.date_from, args.date_to, shift, args.duration, args.delete,
+                          args.dry_run, args.yes, args.workers, args.check_conflicts)
+    sys.exit(0 if success else 1)
@@ -6,12 +6,13 @@
 
 import sys
 import os
-import requests
 
 # 获取当前脚本所在目录并添加到 sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 from feishu_client import FeishuCalendar
+from http_transport import get_transport
+from api_base import FEISHU_API_BASE
 
 def delete_event(event_id):
     """删除日程事件"""
@@ -24,34 +25,27 @@ def delete_event(event_id):
     try:
         token = assistant._get_tenant_access_token()
         
-        # 获取日历ID
-        calendars = assistant.list_calendars()
-        if calendars.get("code") != 0:
-            print(f"❌ 获取日历失败")
-            return False
-            
-        calendar_list = calendars.get("data", {}).get("calendar_list", [])
-        if not calendar_list:
-            print("❌ 没有找到日历")
-            return False
-            
-        calendar_id = calendar_list[0].get("calendar_id")
-        
-        # 删除日程
-        url = f"https://open.feishu.cn/open-apis/calendar/v4/calendars/{calendar_id}/events/{event_id}"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json; charset=utf-8"
         }
         
-        response = requests.delete(url, headers=headers)
-        resp_json = response.json()
+        # 删除日程 (calendar_id 使用配置中缓存的默认日历)
+        def remove_event(calendar_id):
+            url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event_id}"
+            return get_transport().delete(url, headers=headers).json()
+        
+        calendar_id, resp_json = assistant.with_calendar_id(remove_event)
+        if not calendar_id:
+            print("❌ 没有找到日历")
+            return False
         
         if resp_json.get("code") != 0:
             print(f"❌ 删除失败: {resp_json.get('msg', '未知错误')}")
             return False
             
         print(f"✅ 删除成功: {event_id}")
+        assistant._index_events(calendar_id, [{"event_id": event_id, "status": "cancelled"}])
         return True
         
     except Exception as e:
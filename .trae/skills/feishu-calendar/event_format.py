@@ -0,0 +1,40 @@
+"""
+日程的终端输出格式 (list.py / search.py 共用)
+"""
+
+from datetime import datetime, timedelta
+
+from event_store import event_span, event_timestamp
+
+
+def format_event_time(event):
+    """日程时间段；全天日程 (时间为 {"date": ...}，结束日期不含) 只显示日期"""
+    start, end = event_span(event.get("start_time"), event.get("end_time"))
+    start_dt = datetime.fromtimestamp(start or 0)
+    end_dt = datetime.fromtimestamp(end or start or 0)
+    if (event.get("start_time") or {}).get("date"):
+        last_day = end_dt - timedelta(days=1)
+        if last_day.date() == start_dt.date():
+            return f"{start_dt.strftime('%m月%d日')} 全天"
+        return f"{start_dt.strftime('%m月%d日')} - {last_day.strftime('%m月%d日')} 全天"
+    return f"{start_dt.strftime('%m月%d日 %H:%M')} - {end_dt.strftime('%H:%M')}"
+
+
+def print_event(i, event, calendar=None):
+    event_id = event.get("event_id")
+    summary = event.get("summary", "无标题")
+    description = event.get("description", "")
+
+    start_dt = datetime.fromtimestamp(event_timestamp(event.get("start_time")) or 0)
+
+    # 标记周末
+    is_weekend = "🏖️ " if start_dt.weekday() >= 5 else ""
+
+    print(f"{is_weekend}{i:2d}. 📝 {summary}")
+    print(f"    📅 {format_event_time(event)}")
+    print(f"    🆔 {event_id}")
+    if calendar:
+        print(f"    🗓️  {calendar}")
+    if description:
+        print(f"    📋 {description[:50]}{'...' if len(description) > 50 else ''}")
+    print(flush=True)
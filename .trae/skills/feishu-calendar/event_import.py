@@ -0,0 +1,156 @@
+"""
+批量导入日程 (bulk_create.py 与 FeishuCalendar.import_ics 共用)
+
+- 日程由固定大小的线程池并发创建，每个日程拿到 event_id 后立即在同一线程中添加参与人
+- 输入按行流式读取，同时在途的任务数有上限，几千行的文件也不会一次性堆积在内存中
+- 每行的结果追加写入清单 (checkpoint，见 skill-common/journal.py) 文件，中断后重新运行会跳过已完成的行，
+  只补加参与人失败的行不会重复创建日程
+- 清单中的行标识带上目标日历 (manifest_key)，同一个文件导入另一个日历时不会被当作已完成
+- 每行带确定的幂等键 (idempotency_key，由批次标识与行标识计算)：超时 / 5xx 时传输层可以安全重试，
+  重新运行时失败的行沿用同一个幂等键，上次其实已经创建成功的日程也不会重复
+"""
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from event_store import event_time
+from ics import iter_ics_events
+from journal import RowKeys, load_manifest, Manifest
+
+DEFAULT_WORKERS = 8
+
+
+def ics_rows(path):
+    """
+    逐个读取 ICS 文件中的日程
+    :return: 生成器 (key, 序号, event)，event 为 {"summary", "start_time", "end_time", "all_day", ...}
+    """
+    keys = RowKeys()
+    with open(path, "r", encoding="utf-8") as f:
+        for index, item in enumerate(iter_ics_events(f), 1):
+            event = {k: item[k] for k in
+                     ("summary", "start_time", "end_time", "all_day", "description", "location", "attendees")}
+            event["summary"] = event["summary"] or "无标题"
+            if item["rrule"]:
+                event["recurrence"] = item["rrule"]
+            yield keys.key(event, item["uid"]), index, event
+
+
+def manifest_key(calendar_id, key):
+    """清单中的行标识：同一行导入不同日历是不同的记录"""
+    return f"{calendar_id}/{key}"
+
+
+def idempotency_key(batch_id, key):
+    """行的幂等键：同一批次中同一行 (内容与目标日历不变) 总是得到同一个幂等键"""
+    return hashlib.sha1(f"{batch_id}|{key}".encode("utf-8")).hexdigest()
+
+
+def event_payload(event, notify=True):
+    """输入行 -> 创建日程接口的请求体"""
+    payload = {
+        "summary": event["summary"],
+        "start_time": event_time(event["start_time"], event.get("all_day")),
+        "end_time": event_time(event["end_time"], event.get("all_day")),
+        "need_notification": notify,
+    }
+    if event.get("description"):
+        payload["description"] = event["description"]
+    if event.get("location"):
+        payload["location"] = {"name": event["location"]}
+    if event.get("recurrence"):
+        payload["recurrence"] = event["recurrence"]
+    return payload
+
+
+def create_one(client, calendar_id, key, row, event, previous, notify=True, add_self=True, idem_key=None):
+    """创建一个日程并添加参与人；previous 为清单中的上次结果"""
+    token = client._get_tenant_access_token()
+    record = {"key": key, "row": row, "summary": event["summary"], "event_id": None,
+              "status": "failed", "attendees": "none", "idempotency_key": idem_key, "error": None}
+
+    event_id = previous.get("event_id") if previous and previous.get("status") == "created" else None
+    if not event_id:
+        resp_json = client._post_event(token, calendar_id, event_payload(event, notify), idem_key)
+        if resp_json.get("code") != 0:
+            record["error"] = f"{resp_json.get('code')}: {resp_json.get('msg')}"
+            return record
+        event_id = resp_json.get("data", {}).get("event", {}).get("event_id")
+    record.update(event_id=event_id, status="created")
+
+    # 日程已经创建：添加参与人出错 (找不到用户、网络错误等) 也要记下 event_id，重新运行时只补加参与人
+    attendees = event.get("attendees") or ([client.open_id] if add_self else [])
+    try:
+        resp_json = client._post_attendees(token, calendar_id, event_id, attendees)
+    except Exception as e:
+        record.update(attendees="failed", error=str(e))
+        return record
+    if resp_json is not None:
+        if resp_json.get("code") == 0:
+            record["attendees"] = "ok"
+        else:
+            record["attendees"] = "failed"
+            record["error"] = f"{resp_json.get('code')}: {resp_json.get('msg')}"
+    return record
+
+
+def import_events(client, calendar_id, rows, manifest_path, workers=DEFAULT_WORKERS, notify=True, add_self=True,
+                  batch_id=None):
+    """
+    并发创建 rows 中的日程
+    :param client: FeishuCalendar
+    :param rows: 可迭代的 (key, 序号, event)
+    :param manifest_path: 清单文件，已完成的行会跳过
+    :param batch_id: 批次标识，参与计算幂等键，默认为清单文件的绝对路径
+    :return: {"created", "attendees_retried", "skipped", "failed", "seconds"}
+    """
+    batch_id = batch_id or os.path.abspath(manifest_path)
+    previous = load_manifest(manifest_path)
+    manifest = Manifest(manifest_path)
+    stats = {"created": 0, "attendees_retried": 0, "skipped": 0, "failed": 0}
+    stats_lock = threading.Lock()
+    # 限制在途任务数：读取速度远快于创建速度，不加限制会把整个输入文件都排进队列
+    slots = threading.BoundedSemaphore(workers * 2)
+    started = time.time()
+
+    def run(key, row, event, prev):
+        idem_key = idempotency_key(batch_id, key)
+        try:
+            record = create_one(client, calendar_id, key, row, event, prev, notify, add_self, idem_key)
+        except Exception as e:
+            record = {"key": key, "row": row, "summary": event["summary"], "event_id": None,
+                      "status": "failed", "attendees": "none", "idempotency_key": idem_key, "error": str(e)}
+        finally:
+            slots.release()
+        manifest.write(record)
+        with stats_lock:
+            if record["status"] != "created" or record["attendees"] == "failed":
+                stats["failed"] += 1
+                print(f"❌ 第 {row} 行 {event['summary']}: {record['error']}", flush=True)
+            elif prev and prev.get("status") == "created":
+                stats["attendees_retried"] += 1
+            else:
+                stats["created"] += 1
+            done = stats["created"] + stats["attendees_retried"] + stats["failed"]
+            if done % 50 == 0:
+                print(f"⏳ 已处理 {done} 个日程, {time.time() - started:.1f}s", flush=True)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for key, row, event in rows:
+                key = manifest_key(calendar_id, key)
+                prev = previous.get(key)
+                if prev and prev.get("status") == "created" and prev.get("attendees") != "failed":
+                    stats["skipped"] += 1
+                    continue
+                slots.acquire()
+                # 带上调用方的上下文，工作线程中的请求在指标中归属到调用方 (如 FeishuCalendar.import_ics)
+                pool.submit(contextvars.copy_context().run, run, key, row, event, prev)
+    finally:
+        manifest.close()
+    stats["seconds"] = round(time.time() - started, 2)
+    return stats
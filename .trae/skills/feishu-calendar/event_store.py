@@ -0,0 +1,284 @@
+"""
+本地日程库 (SQLite)
+
+FeishuCalendar.sync_events() 把日程增量同步到本地，之后的查询直接读磁盘：
+- events 表按 (calendar_id, event_id) 存储日程，start_ts / end_ts 建有索引，原始 JSON 保存在 data 列
+- sync_state 表记录每个日历上次同步得到的 sync_token
+- events_fts 是 summary / description 的 FTS5 全文索引 (trigram 分词，支持中文子串)，由触发器随 events 表更新；
+  FeishuCalendar 在列出、创建、修改、删除日程时也会顺带写入，search() 不需要访问接口
+- 重复日程中被取消的某一次实例保留为 status=cancelled 的记录，本地展开重复日程 (recurrence.py) 时据此跳过该次
+- 使用 WAL 模式，同步写入时其他进程仍可读取
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+EVENT_DB_FILE = os.path.expanduser(os.environ.get("FEISHU_CALENDAR_DB", "~/.feishu_calendar_events.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    summary TEXT,
+    description TEXT,
+    start_ts INTEGER,
+    end_ts INTEGER,
+    status TEXT,
+    data TEXT NOT NULL,
+    synced_at INTEGER,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events (calendar_id, start_ts, end_ts);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at INTEGER
+);
+"""
+
+# external content 的 FTS5 表不保存正文，只保存索引；events 使用 UPSERT 保持 rowid 不变，触发器据此同步
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    summary, description, content='events', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, summary, description) VALUES (new.rowid, new.summary, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, summary, description)
+    VALUES ('delete', old.rowid, old.summary, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF summary, description ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, summary, description)
+    VALUES ('delete', old.rowid, old.summary, old.description);
+    INSERT INTO events_fts (rowid, summary, description) VALUES (new.rowid, new.summary, new.description);
+END;
+INSERT INTO events_fts (events_fts) VALUES ('rebuild');
+"""
+# trigram 分词最短匹配 3 个字符，更短的关键词改用 LIKE
+FTS_MIN_TERM = 3
+
+
+def event_timestamp(value):
+    """
+    日程时间转为秒级时间戳
+    普通日程为 {"timestamp": "..."}，全天日程为 {"date": "YYYY-MM-DD"} (按本地时区零点计算)
+    """
+    value = value or {}
+    if value.get("timestamp"):
+        return int(value["timestamp"])
+    if value.get("date"):
+        return int(datetime.strptime(value["date"], "%Y-%m-%d").timestamp())
+    return None
+
+
+def event_span(start_value, end_value):
+    """
+    日程的 (开始, 结束) 秒级时间戳，时间为接口格式 {"timestamp"} / {"date"}
+    全天日程沿用飞书的约定：结束日期不含 (10-21 ~ 10-22 只占 21 日一天)，结束日期不晚于开始日期时按一天计算
+    """
+    start, end = event_timestamp(start_value), event_timestamp(end_value)
+    if (start_value or {}).get("date") and start is not None and (end is None or end <= start):
+        end = start + 86400
+    return start, end
+
+
+def event_time(timestamp, all_day=False):
+    """event_timestamp 的逆操作：普通日程使用时间戳，全天日程使用本地日期"""
+    if all_day:
+        return {"date": time.strftime("%Y-%m-%d", time.localtime(int(timestamp)))}
+    return {"timestamp": str(int(timestamp))}
+
+
+class EventStore:
+    def __init__(self, path=EVENT_DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.fts = self._init_fts()
+        os.chmod(path, 0o600)
+
+    def _init_fts(self):
+        """创建全文索引 (已有日程一并建索引)；SQLite 不支持 FTS5 / trigram 时返回 False，search() 退化为 LIKE"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'").fetchone()
+        if exists:
+            return True
+        try:
+            self.conn.executescript(f"BEGIN IMMEDIATE; {FTS_SCHEMA} COMMIT;")
+        except sqlite3.OperationalError:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            return False
+        return True
+
+    def close(self):
+        self.conn.close()
+
+    def transaction(self):
+        """
+        with store.transaction(): ... 期间的修改一起提交，出错时全部回滚
+        """
+        return _Transaction(self.conn)
+
+    # --- 同步 ---
+
+    def get_sync_token(self, calendar_id):
+        row = self.conn.execute(
+            "SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)).fetchone()
+        return row["sync_token"] if row else None
+
+    def set_sync_token(self, calendar_id, sync_token):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, synced_at) VALUES (?, ?, ?)",
+            (calendar_id, sync_token, int(time.time())))
+
+    def last_synced_at(self, calendar_id):
+        row = self.conn.execute(
+            "SELECT synced_at FROM sync_state WHERE calendar_id = ?", (calendar_id,)).fetchone()
+        return row["synced_at"] if row else None
+
+    def clear(self, calendar_id):
+        """删除某个日历的全部本地日程与同步状态 (全量同步前调用)"""
+        self.conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+        self.conn.execute("DELETE FROM sync_state WHERE calendar_id = ?", (calendar_id,))
+
+    def apply(self, calendar_id, events):
+        """
+        写入一批日程变更：status 为 cancelled 的日程从本地删除，其余按 event_id 覆盖
+        重复日程中被取消的某一次实例 (带 recurring_event_id) 不删除，保留为已取消的例外
+        :return: (写入数, 删除数)
+        """
+        upserts = []
+        deletes = []
+        now = int(time.time())
+        for event in events:
+            event_id = (event or {}).get("event_id")
+            if not event_id:
+                continue
+            if event.get("status") == "cancelled" and not event.get("recurring_event_id"):
+                deletes.append((calendar_id, event_id))
+                continue
+            upserts.append((
+                calendar_id,
+                event_id,
+                event.get("summary"),
+                event.get("description"),
+                event_timestamp(event.get("start_time")),
+                event_timestamp(event.get("end_time")),
+                event.get("status"),
+                json.dumps(event, ensure_ascii=False),
+                now
+            ))
+        if upserts:
+            # UPSERT 而不是 INSERT OR REPLACE：保持 rowid 不变，全文索引触发器才能正确更新
+            self.conn.executemany(
+                "INSERT INTO events "
+                "(calendar_id, event_id, summary, description, start_ts, end_ts, status, data, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (calendar_id, event_id) DO UPDATE SET "
+                "summary = excluded.summary, description = excluded.description, start_ts = excluded.start_ts, "
+                "end_ts = excluded.end_ts, status = excluded.status, data = excluded.data, "
+                "synced_at = excluded.synced_at", upserts)
+        if deletes:
+            self.conn.executemany("DELETE FROM events WHERE calendar_id = ? AND event_id = ?", deletes)
+        return len(upserts), len(deletes)
+
+    # --- 查询 ---
+
+    def query(self, calendar_id, start_ts=None, end_ts=None, limit=None):
+        """
+        返回与 [start_ts, end_ts) 有交集的日程 (原始 JSON)，按开始时间排序；不含已取消的例外实例
+        """
+        sql = "SELECT data FROM events WHERE calendar_id = ? AND status IS NOT 'cancelled'"
+        params = [calendar_id]
+        if end_ts is not None:
+            sql += " AND start_ts < ?"
+            params.append(end_ts)
+        if start_ts is not None:
+            sql += " AND end_ts > ?"
+            params.append(start_ts)
+        sql += " ORDER BY start_ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield json.loads(row["data"])
+
+    def search(self, text=None, start_ts=None, end_ts=None, calendar_id=None, limit=50):
+        """
+        按关键词与时间范围查找日程 (原始 JSON)，按开始时间排序
+        :param text: 空格分隔的关键词，需同时出现在 summary 或 description 中 (不区分大小写)
+        :param start_ts: 与 end_ts 一起限定时间范围，返回与 [start_ts, end_ts) 有交集的日程
+        :param calendar_id: 为空时搜索所有日历
+        """
+        sql = "SELECT e.data FROM events e"
+        where = ["e.status IS NOT 'cancelled'"]
+        params = []
+        terms = (text or "").split()
+        fts_terms = [t for t in terms if self.fts and len(t) >= FTS_MIN_TERM]
+        if fts_terms:
+            sql += " JOIN events_fts f ON f.rowid = e.rowid"
+            where.append("events_fts MATCH ?")
+            # 每个关键词作为短语加引号，避免被解析为 FTS 语法
+            params.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in fts_terms))
+        for term in terms:
+            if term not in fts_terms:
+                where.append("(e.summary LIKE ? ESCAPE '\\' OR e.description LIKE ? ESCAPE '\\')")
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                params += [pattern, pattern]
+        if calendar_id:
+            where.append("e.calendar_id = ?")
+            params.append(calendar_id)
+        if end_ts is not None:
+            where.append("e.start_ts < ?")
+            params.append(end_ts)
+        if start_ts is not None:
+            where.append("e.end_ts > ?")
+            params.append(start_ts)
+        sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.start_ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield json.loads(row["data"])
+
+    def recurring(self, calendar_id, end_ts=None):
+        """
+        重复日程的主日程 (首次开始于 end_ts 之前) 以及全部例外实例 (含已取消的)，供本地展开重复日程
+        主日程首次开始时间可能远早于查询窗口，query() 按时间范围查不到
+        """
+        sql = ("SELECT data FROM events WHERE calendar_id = ? AND ("
+               "(json_extract(data, '$.recurrence') <> '' AND (? IS NULL OR start_ts < ?)) "
+               "OR json_extract(data, '$.recurring_event_id') <> '')")
+        for row in self.conn.execute(sql, (calendar_id, end_ts, end_ts)):
+            yield json.loads(row["data"])
+
+    def get(self, calendar_id, event_id):
+        row = self.conn.execute(
+            "SELECT data FROM events WHERE calendar_id = ? AND event_id = ?", (calendar_id, event_id)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def count(self, calendar_id):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM events WHERE calendar_id = ?", (calendar_id,)).fetchone()[0]
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # IMMEDIATE：开始时即获取写锁，避免两个同步进程交错写入
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+导出飞书日历为 .ics 文件
+用法: python3 export_ics.py <output.ics> [--days N] [--calendar 名称] [--page-size 500]
+
+按页拉取并逐个写入，日历再大也只在内存中保留一页；不指定 --days 时导出全部日程。
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar, EVENT_PAGE_SIZE
+
+def export_calendar(path, days=None, calendar=None, page_size=EVENT_PAGE_SIZE):
+    """导出日程到 ICS 文件"""
+    assistant = FeishuCalendar()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+
+    try:
+        calendar_id = assistant.resolve_calendar_id(calendar)
+        if not calendar_id:
+            print(f"❌ 没有找到日历: {calendar or '默认日历'}")
+            return False
+
+        start_time = end_time = None
+        if days:
+            start_time = int(time.time())
+            end_time = start_time + days * 24 * 3600
+
+        started = time.time()
+        count = assistant.export_ics(path, start_time, end_time, calendar_id, page_size)
+        print(f"✅ 已导出 {count} 个日程到 {path}, 耗时 {time.time() - started:.2f}s")
+        return True
+
+    except Exception as e:
+        print(f"❌ 导出失败: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="导出飞书日历为 .ics 文件")
+    parser.add_argument("output", help="输出的 .ics 文件")
+    parser.add_argument("--days", type=int, help="只导出未来 N 天的日程 (默认导出全部)")
+    parser.add_argument("--calendar", help="日历名称或 calendar_id (默认使用默认日历)")
+    parser.add_argument("--page-size", type=int, default=EVENT_PAGE_SIZE, help=f"每页条数 (默认 {EVENT_PAGE_SIZE})")
+
+    args = parser.parse_args()
+    success = export_calendar(args.output, args.days, args.calendar, args.page_size)
+    sys.exit(0 if success else 1)
@@ -1,10 +1,144 @@
+import contextvars
+import heapq
 import json
 import os
+import re
+import sys
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# 共享运行时 (跨进程 token 缓存、连接池等) 位于 .trae/skills/skill-common
+COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "skill-common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+from token_store import get_token_store
+from http_transport import get_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+from identity_resolver import get_identity_resolver, IdentityNotFoundError
+from event_store import EventStore, event_span, event_time, event_timestamp
+from recurrence import expand_events, stored_agenda
+from event_import import DEFAULT_WORKERS as IMPORT_WORKERS, ics_rows, import_events
+from ics import IcsWriter
+from intervals import BusyIndex, find_free_slots, find_overlaps, DEFAULT_WORK_HOURS, WEEKDAYS, DEFAULT_SLOT_STEP
 
 CONFIG_FILE = os.path.expanduser("~/.feishu_calendar_config.json")
+# 配置中缓存的日历列表 (默认 calendar_id 与 名称 -> ID 映射) 的有效期，过期后下次调用时重新拉取
+CALENDAR_CACHE_TTL = int(os.environ.get("FEISHU_CALENDAR_CACHE_TTL", 7 * 24 * 3600))
+# calendar_id 失效 (日历不存在 / 无权限 / 已删除) 的错误码，遇到时刷新缓存后重试一次
+STALE_CALENDAR_CODES = {191001, 191002, 191003}
+# 多线程共用客户端时，避免同时刷新日历列表
+_calendar_refresh_lock = threading.Lock()
+# 日程列表每页条数 (接口允许 50 ~ 1000)
+EVENT_PAGE_SIZE = 500
+# 批量查询忙闲时的并发数
+FREEBUSY_WORKERS = 8
+# 列出 / 创建 / 修改 / 删除日程时顺带写入本地日程库，供 search_events 离线查询 (FEISHU_CALENDAR_INDEX=0 关闭)
+EVENT_INDEX_ENABLED = os.environ.get("FEISHU_CALENDAR_INDEX", "1").lower() not in ("0", "off", "false", "no")
+# 批量修改 / 删除日程时的并发数 (实际速率仍受 skill-common 调度器的日历 QPS 限制)
+BULK_WORKERS = 8
+# 日历列表每页条数 (接口允许 50 ~ 1000)
+CALENDAR_PAGE_SIZE = 500
+# 同时列出多个日历的日程时的并发数 (实际速率仍受日历 QPS 限制)
+CALENDAR_FANOUT_WORKERS = 16
+
+
+def to_rfc3339(timestamp):
+    """秒级时间戳 -> 带本地时区偏移的 RFC 3339 时间 (忙闲接口使用)"""
+    return datetime.fromtimestamp(int(timestamp)).astimezone().isoformat()
+
+def from_rfc3339(value):
+    """RFC 3339 时间 -> 秒级时间戳"""
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+def event_start_key(event):
+    """多日历合并排序的键：开始时间戳 (全天日程为当天 0 点)"""
+    return event_timestamp(event.get("start_time")) or 0
+
+
+def event_interval(event):
+    """
+    日程的 (开始, 结束) 秒级时间戳，时间可以是时间戳 (int) 或接口格式 {"timestamp"} / {"date"}
+    全天日程的结束日期不含 (与飞书一致，见 event_store.event_span)
+    """
+    start, end = event.get("start_time"), event.get("end_time")
+    span_start, span_end = event_span(None if isinstance(start, (int, str)) else start,
+                                      None if isinstance(end, (int, str)) else end)
+    start = int(start) if isinstance(start, (int, str)) else span_start
+    end = int(end) if isinstance(end, (int, str)) else span_end
+    return start, end
+
+
+def is_busy_event(event):
+    """已取消或标记为「空闲」的日程不占用时间"""
+    return event.get("status") != "cancelled" and event.get("free_busy_status") != "free"
+
+
+def proposed_span(events):
+    """一批日程覆盖的时间范围 (最早开始, 最晚结束)，没有有效时间时返回 None"""
+    intervals = [event_interval(event) for event in events]
+    intervals = [(start, end) for start, end in intervals if start is not None and end is not None]
+    if not intervals:
+        return None
+    return min(start for start, _ in intervals), max(end for _, end in intervals)
+
 
+def match_conflicts(proposed, existing):
+    """
+    扫描线找出 proposed 彼此之间以及与 existing (已有日程) 的重叠，结果格式见 FeishuCalendar.check_conflicts
+    """
+    rescheduled = {event.get("event_id") for event in proposed if event.get("event_id")}
+    existing = [event for event in existing if is_busy_event(event) and event.get("event_id") not in rescheduled]
+
+    def keyed(events, key):
+        for i, event in enumerate(events):
+            start, end = event_interval(event)
+            if start is not None and end is not None:
+                yield start, end, key(i)
+
+    conflicts = []
+    # existing 的 key 用负数区分 (-1 对应 existing[0])
+    for i, other, overlap_start, overlap_end in find_overlaps(keyed(proposed, lambda i: i),
+                                                              keyed(existing, lambda j: -j - 1)):
+        is_existing = other < 0
+        other = existing[-other - 1] if is_existing else {"index": other, "summary": proposed[other].get("summary")}
+        conflicts.append({"index": i, "summary": proposed[i].get("summary"), "overlap_start": overlap_start,
+                          "overlap_end": overlap_end, "existing": is_existing, "other": other})
+    conflicts.sort(key=lambda c: (c["index"], c["overlap_start"]))
+    return conflicts
+
+
+def reschedule_update(event, shift=0, duration_minutes=None):
+    """
+    根据日程列表中已有的时间字段计算改期后的 PATCH 请求体，不需要再逐个 GET 日程
+    :param shift: 整体平移的秒数 (全天日程按天平移)
+    :param duration_minutes: 新的时长 (分钟)，为空时保持原时长
+    :return: {"start_time", "end_time"}，时间不变时返回 None
+    """
+    all_day = bool((event.get("start_time") or {}).get("date"))
+    start_ts = event_timestamp(event.get("start_time"))
+    end_ts = event_timestamp(event.get("end_time"))
+    if start_ts is None or end_ts is None:
+        return None
+    new_start = start_ts + shift
+    new_end = new_start + duration_minutes * 60 if duration_minutes else end_ts + shift
+    if (new_start, new_end) == (start_ts, end_ts):
+        return None
+    return {"start_time": event_time(new_start, all_day), "end_time": event_time(new_end, all_day)}
+
+
+class CalendarAPIError(Exception):
+    """日历接口返回非 0 code"""
+
+    def __init__(self, message, resp_json):
+        super().__init__(f"{message}: {resp_json}")
+        self.resp_json = resp_json
+        self.code = (resp_json or {}).get("code")
+
+
+@instrument_client
 class FeishuCalendar:
     def __init__(self):
         self.config = self._load_config()
@@ -13,6 +147,7 @@ class FeishuCalendar:
         self.open_id = self.config.get("open_id")
         self.tenant_access_token = None
         self.token_expire_time = 0
+        self._local = threading.local()  # 每个线程各自的本地日程库连接
 
     def _load_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -24,8 +159,11 @@ class FeishuCalendar:
         return {}
 
     def _save_config(self, config):
-        with open(CONFIG_FILE, "w") as f:
+        # 先写临时文件再替换，避免并发运行的脚本读到写了一半的配置
+        tmp_path = f"{CONFIG_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
             json.dump(config, f, indent=4)
+        os.replace(tmp_path, CONFIG_FILE)
         self.config = config
         self.app_id = config.get("app_id")
         self.app_secret = config.get("app_secret")
@@ -43,7 +181,7 @@ class FeishuCalendar:
         # 验证并获取 open_id
         try:
             token = self._get_tenant_access_token(app_id, app_secret)
-            open_id = self._get_user_id_by_mobile(token, phone)
+            open_id = get_identity_resolver().resolve_one(app_id, token, phone)
             
             if not open_id:
                 print("Failed to get Open ID. Please check the phone number.")
@@ -73,69 +211,585 @@ class FeishuCalendar:
         if not app_id or not app_secret:
             raise ValueError("App ID and App Secret are required.")
 
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-        headers = {"Content-Type": "application/json; charset=utf-8"}
-        payload = {
-            "app_id": app_id,
-            "app_secret": app_secret
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            raise Exception(f"Get token failed: {resp_json}")
-            
-        self.tenant_access_token = resp_json.get("tenant_access_token")
-        self.token_expire_time = time.time() + resp_json.get("expire", 7200) - 60 # 提前60秒过期
+        # 同一 app_id 的 token 在本机所有 skill 进程间共享，过期前只刷新一次
+        token, expire_time = get_token_store().get_token(app_id, app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
         return self.tenant_access_token
 
-    def _get_user_id_by_mobile(self, token, mobile):
-        url = "https://open.feishu.cn/open-apis/contact/v3/users/batch_get_id?user_id_type=open_id"
+    def resolve_user_ids(self, values, keep_unresolved_emails=False):
+        """
+        open_id / 手机号 / 邮箱 -> open_id 列表 (批量查询，结果跨进程缓存)
+        :param keep_unresolved_emails: 通讯录中找不到的邮箱原样保留，作为外部参与人邀请
+        :raise IdentityNotFoundError: 有手机号 / 邮箱找不到时
+        """
+        return get_identity_resolver().resolve_open_ids(self.app_id, self._get_tenant_access_token, values,
+                                                        keep_unresolved_emails)
+
+    def list_calendars(self, page_token=None, page_size=CALENDAR_PAGE_SIZE):
+        """
+        获取日历列表的一页 (响应 JSON)，data.has_more / data.page_token 用于翻页，完整列表见 iter_calendars
+        """
+        token = self._get_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/calendar/v4/calendars"
         headers = {
             "Authorization": f"Bearer {token}",
+        }
+        params = {"page_size": page_size}
+        if page_token:
+            params["page_token"] = page_token
+        response = get_transport().get(url, headers=headers, params=params)
+        return response.json()
+
+    def iter_calendars(self, page_size=CALENDAR_PAGE_SIZE):
+        """
+        逐个返回全部日历 (主日历、共享日历与订阅日历)，自动翻页
+        :raise CalendarAPIError: 接口返回非 0 code
+        """
+        page_token = None
+        while True:
+            resp_json = self.list_calendars(page_token, page_size)
+            if resp_json.get("code") != 0:
+                raise CalendarAPIError("List calendars failed", resp_json)
+            data = resp_json.get("data", {})
+            yield from data.get("calendar_list") or []
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                return
+
+    def refresh_calendars(self):
+        """
+        重新拉取日历列表 (全部分页)，并把默认 calendar_id 与 名称 -> ID 映射写入配置
+        :return: 日历列表，失败时返回 None
+        """
+        try:
+            calendar_list = list(self.iter_calendars())
+        except CalendarAPIError as e:
+            print(f"List calendars failed: {e.resp_json}")
+            return None
+        self._store_calendars(calendar_list)
+        return calendar_list
+
+    def resolve_calendar_id(self, name=None, refresh=False):
+        """
+        获取日历 ID：优先使用配置中缓存的结果，缓存缺失、过期或找不到指定名称时才调用 list_calendars
+        :param name: 日历名称 (summary) 或 calendar_id，为空时返回默认日历 (日历列表中的第一个)
+        :param refresh: 强制重新拉取日历列表
+        """
+        if not refresh and self._calendar_cache_valid():
+            calendar_id = self._lookup_calendar(name)
+            if calendar_id:
+                return calendar_id
+        refreshed_at = self.config.get("calendars_refreshed_at")
+        with _calendar_refresh_lock:
+            # 等锁期间其他线程可能已经刷新过
+            if self.config.get("calendars_refreshed_at") == refreshed_at and self.refresh_calendars() is None:
+                return None
+        return self._lookup_calendar(name)
+
+    def resolve_calendar_ids(self, names=None):
+        """
+        多个日历名称 / calendar_id -> calendar_id 列表 (去重)
+        :param names: 为空时返回全部日历
+        :raise ValueError: 有找不到的日历时
+        """
+        if not names:
+            if not self._calendar_cache_valid() or "calendar_ids" not in self.config:
+                self.resolve_calendar_id(refresh=True)
+            return list(self.config.get("calendar_ids") or [])
+        calendar_ids = []
+        for name in names:
+            calendar_id = self.resolve_calendar_id(name)
+            if not calendar_id:
+                raise ValueError(f"Calendar not found: {name}")
+            calendar_ids.append(calendar_id)
+        return list(dict.fromkeys(calendar_ids))
+
+    def calendar_names(self):
+        """calendar_id -> 日历名称 (来自配置中缓存的日历列表)"""
+        return {cid: name for name, cid in self.config.get("calendars", {}).items()}
+
+    def with_calendar_id(self, func, calendar_id=None):
+        """
+        以 func(calendar_id) 执行一次日历接口调用 (func 返回响应 JSON)
+        未指定 calendar_id 时使用缓存的默认日历；如果接口返回日历失效，刷新缓存后重试一次
+        :return: (calendar_id, 响应 JSON)
+        """
+        explicit = bool(calendar_id)
+        if not explicit:
+            calendar_id = self.resolve_calendar_id()
+            if not calendar_id:
+                return None, None
+        resp_json = func(calendar_id)
+        if not explicit and self.is_stale_calendar_error(resp_json):
+            calendar_id = self.resolve_calendar_id(refresh=True)
+            if calendar_id:
+                resp_json = func(calendar_id)
+        return calendar_id, resp_json
+
+    @staticmethod
+    def is_stale_calendar_error(resp_json):
+        return bool(resp_json) and resp_json.get("code") in STALE_CALENDAR_CODES
+
+    def _calendar_cache_valid(self):
+        refreshed_at = self.config.get("calendars_refreshed_at", 0)
+        return bool(self.config.get("default_calendar_id")) and time.time() - refreshed_at < CALENDAR_CACHE_TTL
+
+    def _lookup_calendar(self, name=None):
+        if not name:
+            return self.config.get("default_calendar_id")
+        calendars = self.config.get("calendars", {})
+        if name in calendars.values():
+            return name
+        return calendars.get(name)
+
+    def _store_calendars(self, calendar_list):
+        config = dict(self.config)
+        config["default_calendar_id"] = calendar_list[0].get("calendar_id") if calendar_list else None
+        config["calendars"] = {
+            cal.get("summary") or cal.get("calendar_id"): cal.get("calendar_id") for cal in calendar_list
+        }
+        # 同名日历在名称映射中只保留一个，完整的 ID 列表单独保存
+        config["calendar_ids"] = [cal.get("calendar_id") for cal in calendar_list]
+        config["calendars_refreshed_at"] = int(time.time())
+        self._save_config(config)
+
+    def iter_events(self, start_time=None, end_time=None, page_size=EVENT_PAGE_SIZE, calendar_id=None,
+                    index=True):
+        """
+        逐条返回日程的生成器，按 page_token / has_more 自动翻页，每次只在内存中保留一页
+        :param start_time: 开始时间戳 (int, 秒)，与 end_time 一起按时间范围过滤
+        :param end_time: 结束时间戳 (int, 秒)
+        :param page_size: 每页条数
+        :param calendar_id: 不填时使用缓存的默认日历
+        :param index: 是否顺带写入本地日程库 (见 EVENT_INDEX_ENABLED)
+        """
+        params = {"page_size": page_size}
+        if start_time is not None and end_time is not None:
+            params["start_time"] = str(start_time)
+            params["end_time"] = str(end_time)
+
+        def fetch_page(cid, page_token=None):
+            url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{cid}/events"
+            headers = {
+                "Authorization": f"Bearer {self._get_tenant_access_token()}",
+            }
+            page_params = dict(params, page_token=page_token) if page_token else params
+            return get_transport().get(url, headers=headers, params=page_params).json()
+
+        calendar_id, resp_json = self.with_calendar_id(fetch_page, calendar_id)
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+
+        while True:
+            if resp_json.get("code") != 0:
+                raise Exception(f"List events failed: {resp_json}")
+            data = resp_json.get("data", {})
+            items = data.get("items") or []
+            if index:
+                self._index_events(calendar_id, items)
+            for event in items:
+                yield event
+            page_token = data.get("page_token")
+            if not data.get("has_more") or not page_token:
+                return
+            resp_json = fetch_page(calendar_id, page_token)
+
+    def iter_events_multi(self, calendar_ids=None, start_time=None, end_time=None, page_size=EVENT_PAGE_SIZE,
+                          workers=CALENDAR_FANOUT_WORKERS, errors=None):
+        """
+        同时列出多个日历的日程，合并为按开始时间排序的一个生成器
+        各日历在线程池中并发翻页 (每个日程附带 calendar_id 字段) 并各自排序，再用 heapq.merge 做 k 路归并，
+        总耗时约等于最慢的一个日历，而不是各日历之和
+        :param calendar_ids: 为空时使用全部日历 (resolve_calendar_ids)
+        :param errors: 传入 dict 时，读取失败的日历记录为 {calendar_id: 异常} 后跳过；否则抛出 CalendarAPIError
+        """
+        calendar_ids = list(dict.fromkeys(calendar_ids or self.resolve_calendar_ids()))
+        if not calendar_ids:
+            return
+        failures = {}
+
+        def fetch(calendar_id):
+            try:
+                events = []
+                for event in self.iter_events(start_time, end_time, page_size, calendar_id, index=False):
+                    event.setdefault("calendar_id", calendar_id)
+                    events.append(event)
+                events.sort(key=event_start_key)
+                return events
+            except Exception as e:
+                failures[calendar_id] = e
+                return []
+
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(calendar_ids)))) as pool:
+            # 每个任务使用调用方上下文的副本，请求在指标中归属到调用方法
+            streams = list(pool.map(lambda cid: context.copy().run(fetch, cid), calendar_ids))
+        if failures:
+            if errors is None:
+                raise CalendarAPIError(f"List events failed for {len(failures)} calendars",
+                                       {"code": -1, "errors": {cid: str(e) for cid, e in failures.items()}})
+            errors.update(failures)
+        # 并发拉取时不写本地日程库 (SQLite 写锁会让各线程互相等待)，取完后在调用方线程中统一写入
+        for calendar_id, events in zip(calendar_ids, streams):
+            self._index_events(calendar_id, events)
+        yield from heapq.merge(*streams, key=event_start_key)
+
+    def sync_events(self, store=None, calendar_id=None, full=False, page_size=EVENT_PAGE_SIZE):
+        """
+        把日程同步到本地 SQLite 日程库 (event_store.EventStore)
+        首次 (或 full=True) 全量拉取；之后使用上次返回的 sync_token 只拉取新增 / 修改 / 删除的日程。
+        sync_token 失效或日历失效时自动回退为全量同步。
+        :return: {"calendar_id", "full", "upserted", "deleted", "pages"}
+        """
+        store = store or EventStore()
+        explicit = bool(calendar_id)
+        calendar_id = calendar_id or self.resolve_calendar_id()
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+
+        sync_token = None if full else store.get_sync_token(calendar_id)
+        try:
+            return self._sync_pages(store, calendar_id, sync_token, page_size)
+        except CalendarAPIError as e:
+            if not explicit and e.code in STALE_CALENDAR_CODES:
+                calendar_id = self.resolve_calendar_id(refresh=True)
+                if not calendar_id:
+                    raise
+            elif not sync_token:
+                raise
+            print(f"Incremental sync failed ({e.code}), falling back to full sync.")
+            return self._sync_pages(store, calendar_id, None, page_size)
+
+    def _sync_pages(self, store, calendar_id, sync_token, page_size):
+        """在一个事务内拉取全部变更页并写入本地库，中途失败时本地数据保持不变"""
+        url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events"
+        stats = {"calendar_id": calendar_id, "full": not sync_token, "upserted": 0, "deleted": 0, "pages": 0}
+        with store.transaction():
+            if not sync_token:
+                store.clear(calendar_id)
+            page_token = None
+            while True:
+                params = {"page_size": page_size}
+                if sync_token:
+                    params["sync_token"] = sync_token
+                if page_token:
+                    params["page_token"] = page_token
+                headers = {
+                    "Authorization": f"Bearer {self._get_tenant_access_token()}",
+                }
+                resp_json = get_transport().get(url, headers=headers, params=params, cache=False).json()
+                if resp_json.get("code") != 0:
+                    raise CalendarAPIError("Sync events failed", resp_json)
+
+                data = resp_json.get("data", {})
+                upserted, deleted = store.apply(calendar_id, data.get("items") or [])
+                stats["upserted"] += upserted
+                stats["deleted"] += deleted
+                stats["pages"] += 1
+
+                page_token = data.get("page_token")
+                if not data.get("has_more") or not page_token:
+                    break
+
+            if data.get("sync_token"):
+                store.set_sync_token(calendar_id, data["sync_token"])
+        return stats
+
+    def export_ics(self, path, start_time=None, end_time=None, calendar_id=None, page_size=EVENT_PAGE_SIZE):
+        """
+        把日历导出为 .ics 文件：按页拉取、逐个写入，内存中只保留一页日程
+        先写入临时文件，完成后再替换目标文件，中途失败不会留下不完整的导出
+        :param start_time: 与 end_time 一起按时间范围导出，默认导出全部日程
+        :return: 导出的日程数
+        """
+        calendar_id = calendar_id or self.resolve_calendar_id()
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+        calendar_name = next(
+            (name for name, cid in self.config.get("calendars", {}).items() if cid == calendar_id), None)
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                with IcsWriter(f, calendar_name) as writer:
+                    for event in self.iter_events(start_time, end_time, page_size, calendar_id):
+                        if event.get("status") != "cancelled":
+                            writer.write_event(event)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return writer.count
+
+    def import_ics(self, path, calendar_id=None, workers=IMPORT_WORKERS, checkpoint_path=None, notify=False):
+        """
+        从 .ics 文件导入日程：逐个读取 VEVENT，由线程池并发创建 (参与人为 ICS 中的 ATTENDEE 邮箱)
+        每个日程的结果写入 checkpoint 文件 (默认 <path>.manifest.jsonl)，中断后再次调用会跳过已导入的日程
+        :param notify: 是否给参与人发送通知 (迁移日历时默认不发送)
+        :return: {"created", "attendees_retried", "skipped", "failed", "seconds"}
+        """
+        calendar_id = calendar_id or self.resolve_calendar_id()
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+        return import_events(self, calendar_id, ics_rows(path), checkpoint_path or f"{path}.manifest.jsonl",
+                             workers, notify, add_self=False, batch_id=os.path.abspath(path))
+
+    def search_events(self, text=None, start_time=None, end_time=None, calendar_id=None, limit=50, sync=False):
+        """
+        在本地日程库中按关键词与时间范围查找日程，不访问接口
+        本地库由 sync_events 以及列出 / 创建 / 修改 / 删除日程时顺带写入；sync=True 时先增量同步默认日历
+        :param text: 空格分隔的关键词，需同时出现在标题或描述中
+        :param calendar_id: 为空时搜索所有已缓存的日历
+        :return: 日程列表 (与接口返回的格式相同)，按开始时间排序
+        """
+        store = self._event_store()
+        if sync:
+            self.sync_events(store, calendar_id)
+        return list(store.search(text, start_time, end_time, calendar_id, limit))
+
+    def agenda(self, start_time, end_time, calendar_ids=None, sync=True):
+        """
+        从本地日程库列出 [start_time, end_time) 内的日程，重复日程按 RRULE 在本地展开为各次实例
+        (服务端返回的例外实例代替对应的那一次，已取消的那一次跳过)，几个月的日程表也不需要逐个实例请求接口
+        :param calendar_ids: 默认为默认日历
+        :param sync: 先增量同步这些日历
+        :return: 日程列表 (附带 calendar_id)，按开始时间排序
+        """
+        calendar_ids = calendar_ids or [self.resolve_calendar_id()]
+        store = self._event_store()
+        per_calendar = []
+        for calendar_id in calendar_ids:
+            if sync:
+                self.sync_events(store, calendar_id)
+            per_calendar.append([dict(event, calendar_id=calendar_id)
+                                 for event in stored_agenda(store, calendar_id, start_time, end_time)])
+        return list(heapq.merge(*per_calendar, key=event_start_key))
+
+    def _event_store(self):
+        store = getattr(self._local, "event_store", None)
+        if store is None:
+            store = self._local.event_store = EventStore()
+        return store
+
+    def _index_events(self, calendar_id, events):
+        """把接口返回的日程写入本地日程库 (status 为 cancelled 的删除)；写入失败不影响接口调用"""
+        if not EVENT_INDEX_ENABLED or not calendar_id or not events:
+            return
+        try:
+            store = self._event_store()
+            with store.transaction():
+                store.apply(calendar_id, events)
+        except Exception:
+            pass
+
+    def select_events(self, start_time=None, end_time=None, pattern=None, calendar_id=None, page_size=EVENT_PAGE_SIZE):
+        """
+        一次分页遍历选出要批量处理的日程
+        :param pattern: 标题 (summary) 正则，忽略大小写，为空时不过滤
+        :return: 生成器，跳过已取消的日程
+        """
+        matcher = re.compile(pattern, re.IGNORECASE) if pattern else None
+        for event in self.iter_events(start_time, end_time, page_size, calendar_id):
+            if event.get("status") == "cancelled":
+                continue
+            if matcher and not matcher.search(event.get("summary") or ""):
+                continue
+            yield event
+
+    def reschedule_events(self, events, shift=0, duration_minutes=None, calendar_id=None, workers=BULK_WORKERS):
+        """
+        批量改期：按 shift (秒) 平移和 / 或把时长改为 duration_minutes，并发发出 PATCH
+        新时间直接由 events 中的 start_time / end_time 计算 (select_events 的结果已包含)，不再逐个 GET
+        :return: [{"event_id", "summary", "ok", "error", "update"}]
+        """
+        calendar_id = calendar_id or self.resolve_calendar_id()
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+
+        def patch(event):
+            update = reschedule_update(event, shift, duration_minutes)
+            if update is None:
+                return {"update": None}, None
+            url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event['event_id']}"
+            headers = {
+                "Authorization": f"Bearer {self._get_tenant_access_token()}",
+                "Content-Type": "application/json; charset=utf-8"
+            }
+            resp_json = get_transport().patch(url, headers=headers, json=update).json()
+            if resp_json.get("code") == 0:
+                self._index_events(calendar_id, [resp_json.get("data", {}).get("event")])
+            return {"update": update}, resp_json
+
+        return self._apply_concurrently(patch, events, workers)
+
+    def delete_events(self, events, calendar_id=None, workers=BULK_WORKERS):
+        """
+        批量删除 events (日程 JSON 或 event_id)，并发发出 DELETE
+        :return: [{"event_id", "summary", "ok", "error"}]
+        """
+        calendar_id = calendar_id or self.resolve_calendar_id()
+        if not calendar_id:
+            raise Exception("Could not determine calendar_id. Please specify one.")
+
+        def remove(event):
+            url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event['event_id']}"
+            headers = {
+                "Authorization": f"Bearer {self._get_tenant_access_token()}",
+            }
+            resp_json = get_transport().delete(url, headers=headers).json()
+            if resp_json.get("code") == 0:
+                self._index_events(calendar_id, [{"event_id": event["event_id"], "status": "cancelled"}])
+            return {}, resp_json
+
+        events = ({"event_id": e} if isinstance(e, str) else e for e in events)
+        return self._apply_concurrently(remove, events, workers)
+
+    def _apply_concurrently(self, func, events, workers):
+        """
+        在线程池中对每个日程执行 func(event) -> (额外字段, 响应 JSON 或 None)，按输入顺序返回结果
+        请求速率由 http_transport 的调度器统一限制，遇到频控会自动退避重试
+        """
+        def run(event):
+            result = {"event_id": event.get("event_id"), "summary": event.get("summary"), "ok": True, "error": None}
+            try:
+                extra, resp_json = func(event)
+                result.update(extra)
+                if resp_json is not None and resp_json.get("code") != 0:
+                    result.update(ok=False, error=f"{resp_json.get('code')}: {resp_json.get('msg')}")
+            except Exception as e:
+                result.update(ok=False, error=str(e))
+            return result
+
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            # 每个任务使用调用方上下文的副本，请求在指标中归属到调用方法
+            return list(pool.map(lambda event: context.copy().run(run, event), events))
+
+    def query_freebusy(self, open_id, start_time, end_time):
+        """
+        查询一个用户在 [start_time, end_time) 内的忙碌时段
+        :return: [(start, end)] 秒级时间戳
+        """
+        url = f"{FEISHU_API_BASE}/calendar/v4/freebusy/list"
+        headers = {
+            "Authorization": f"Bearer {self._get_tenant_access_token()}",
             "Content-Type": "application/json; charset=utf-8"
         }
         payload = {
-            "mobiles": [mobile]
+            "time_min": to_rfc3339(start_time),
+            "time_max": to_rfc3339(end_time),
+            "user_id": open_id
         }
-        response = requests.post(url, headers=headers, json=payload)
+        # 只读查询，可以安全重试
+        response = get_transport().post(url, headers=headers, params={"user_id_type": "open_id"}, json=payload,
+                                        idempotent=True)
         resp_json = response.json()
-        
         if resp_json.get("code") != 0:
-            raise Exception(f"Get user id failed: {resp_json}")
-            
-        user_list = resp_json.get("data", {}).get("user_list", [])
-        if user_list and user_list[0].get("user_id"):
-            return user_list[0].get("user_id")
-        return None
+            raise CalendarAPIError(f"Query freebusy failed for {open_id}", resp_json)
+        return [
+            (from_rfc3339(item["start_time"]), from_rfc3339(item["end_time"]))
+            for item in resp_json.get("data", {}).get("freebusy_list") or []
+        ]
 
-    def list_calendars(self):
+    def batch_freebusy(self, open_ids, start_time, end_time, workers=FREEBUSY_WORKERS):
         """
-        获取日历列表
+        并发查询多个用户的忙碌时段 (忙闲接口每次只能查一个用户)
+        任何一个用户查询失败都会抛出 CalendarAPIError，避免漏掉其忙碌时段
+        :return: {open_id: [(start, end)]}
         """
-        token = self._get_tenant_access_token()
-        url = "https://open.feishu.cn/open-apis/calendar/v4/calendars"
-        headers = {
-            "Authorization": f"Bearer {token}",
-        }
-        response = requests.get(url, headers=headers)
-        return response.json()
+        open_ids = list(dict.fromkeys(uid for uid in open_ids if uid))
+        if not open_ids:
+            return {}
+        results = {}
+        errors = {}
+
+        def query(open_id):
+            try:
+                results[open_id] = self.query_freebusy(open_id, start_time, end_time)
+            except Exception as e:
+                errors[open_id] = e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(open_ids)))) as pool:
+            # 每个任务使用调用方上下文的副本，请求在指标中归属到调用方法
+            futures = [pool.submit(contextvars.copy_context().run, query, open_id) for open_id in open_ids]
+            for future in futures:
+                future.result()
+        if errors:
+            raise CalendarAPIError(f"Query freebusy failed for {len(errors)} users",
+                                   {"code": -1, "errors": {uid: str(e) for uid, e in errors.items()}})
+        return {uid: results[uid] for uid in open_ids}
 
-    def create_event(self, summary, start_time, end_time, attendees=None, description=None, calendar_id=None):
+    def find_common_free_slots(self, open_ids, duration_minutes=60, start_time=None, end_time=None, count=3,
+                               work_hours=DEFAULT_WORK_HOURS, weekdays=WEEKDAYS, step=DEFAULT_SLOT_STEP):
+        """
+        查找所有人都空闲的前 count 个时段
+        :param open_ids: 参与人 open_id 列表
+        :param duration_minutes: 会议时长 (分钟)
+        :param start_time: 搜索起点时间戳，默认当前时间
+        :param end_time: 搜索终点时间戳，默认起点后 7 天
+        :param work_hours: 工作时间 ("09:00", "18:00")，为 None 时不限制
+        :param weekdays: 允许的星期 (0 为周一)，默认周一到周五
+        :return: [(start, end)] 秒级时间戳
+        """
+        start_time = int(start_time or time.time())
+        end_time = int(end_time or start_time + 7 * 24 * 3600)
+        busy = BusyIndex()
+        for intervals in self.batch_freebusy(open_ids, start_time, end_time).values():
+            for start, end in intervals:
+                busy.add(start, end)
+        return find_free_slots(busy, start_time, end_time, duration_minutes * 60, count, work_hours, weekdays, step)
+
+    def check_conflicts(self, proposed, calendar_ids=None, local=False, page_size=EVENT_PAGE_SIZE):
+        """
+        检查一批待创建 / 改期的日程在彼此之间以及与已有日程之间的时间冲突
+        已有日程只按整批的时间范围取一次 (local=True 时查询本地日程库，不联网；否则用 iter_events_multi 并发拉取)，
+        重复日程展开为各次实例后 (recurrence.py)，
+        再用扫描线一次找出所有重叠 (intervals.find_overlaps)，不为每个日程单独发请求
+        :param proposed: [{"summary", "start_time", "end_time", "event_id" (可选)}]，
+                         时间为秒级时间戳或接口格式；带 event_id 时 (改期) 不与该日程自身比较
+        :param calendar_ids: 参与比较的日历，默认为默认日历
+        :return: [{"index", "summary", "overlap_start", "overlap_end", "existing", "other"}]，按 index 排序；
+                 existing 为 False 时 other 为同一批中的另一个日程 {"index", "summary"}，
+                 为 True 时 other 为已有日程的原始 JSON (附带 calendar_id)
+        """
+        proposed = list(proposed)
+        span = proposed_span(proposed)
+        if span is None:
+            return []
+        calendar_ids = calendar_ids or [self.resolve_calendar_id()]
+        if local:
+            existing = self.agenda(span[0], span[1], calendar_ids, sync=False)
+        else:
+            existing = expand_events(self.iter_events_multi(calendar_ids, *span, page_size=page_size), *span)
+        return match_conflicts(proposed, existing)
+
+    def create_event(self, summary, start_time, end_time, attendees=None, description=None, calendar_id=None,
+                     check_conflicts=False):
         """
         创建日程
         :param summary: 会议主题
         :param start_time: 开始时间戳 (int, 秒)
         :param end_time: 结束时间戳 (int, 秒)
-        :param attendees: 参与人 ID 列表 (list of open_id)。如果为空，默认添加自己。
+        :param attendees: 参与人列表 (open_id / 手机号 / 邮箱)。如果为空，默认添加自己。
         :param description: 会议描述。如果为空，根据主题生成。
         :param calendar_id: 指定在哪个日历创建。如果不填，尝试获取应用的默认日历。
+        :param check_conflicts: 创建前检查与该日历已有日程的时间冲突，有冲突时不创建
         """
         if not self.app_id:
             print("Configuration missing. Please run initialize() first.")
             return
 
         token = self._get_tenant_access_token()
+
+        if check_conflicts:
+            conflicts = self.check_conflicts([{"summary": summary, "start_time": start_time, "end_time": end_time}],
+                                             [calendar_id] if calendar_id else None)
+            if conflicts:
+                for conflict in conflicts:
+                    print(f"Time conflict with {conflict['other'].get('summary')} ({conflict['other'].get('event_id')})")
+                return None
         
         # 1. 默认逻辑：如果没有参与人，添加自己
         if not attendees:
@@ -147,39 +801,20 @@ class FeishuCalendar:
             description = f"会议主题：{summary}\n自动生成的会议日程。"
             
         # 3. 确定 Calendar ID
-        if not calendar_id:
-            # 尝试获取应用的主日历
-            # 注意：使用 tenant_access_token 时，无法直接使用 'primary' 别名，必须指定 ID
-            # 同时也无法直接操作用户的 open_id 对应的日历（除非有特定权限且 ID 格式正确）
-            # 这里尝试获取应用（Bot）自己的日历列表中的第一个
-            calendars = self.list_calendars()
-            if calendars.get("code") == 0:
-                cal_list = calendars.get("data", {}).get("calendar_list", [])
-                if cal_list:
-                    calendar_id = cal_list[0].get("calendar_id")
-                    print(f"Auto-detected calendar_id: {calendar_id}")
-        
-        if not calendar_id:
-             print("Error: Could not determine calendar_id. Please specify one.")
-             return None
-
-        # 创建日程
-        url = f"https://open.feishu.cn/open-apis/calendar/v4/calendars/{calendar_id}/events"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-        
+        # 注意：使用 tenant_access_token 时，无法直接使用 'primary' 别名，必须指定 ID
+        # 未指定时使用应用（Bot）日历列表中的第一个，解析结果缓存在配置文件中，不必每次都拉取日历列表
         payload = {
             "summary": summary,
             "description": description,
-            "start_time": {"timestamp": str(start_time)},
-            "end_time": {"timestamp": str(end_time)},
+            "start_time": event_time(start_time),
+            "end_time": event_time(end_time),
             "need_notification": True
         }
-        
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
+
+        calendar_id, resp_json = self.with_calendar_id(lambda cid: self._post_event(token, cid, payload), calendar_id)
+        if not calendar_id:
+             print("Error: Could not determine calendar_id. Please specify one.")
+             return None
         
         if resp_json.get("code") != 0:
             print(f"Create event failed: {resp_json}")
@@ -193,19 +828,48 @@ class FeishuCalendar:
         
         return event_id
 
-    def _add_attendees(self, token, calendar_id, event_id, attendee_ids):
-        if not attendee_ids:
-            return
-            
-        url = f"https://open.feishu.cn/open-apis/calendar/v4/calendars/{calendar_id}/events/{event_id}/attendees"
+    def _post_event(self, token, calendar_id, payload, idempotency_key=None):
+        """
+        创建日程接口，返回响应 JSON (不打印)
+        :param idempotency_key: 幂等键，相同幂等键的请求只会创建一个日程；传入后超时 / 5xx 会自动重试
+        """
+        url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json; charset=utf-8"
         }
+        params = {"idempotency_key": idempotency_key} if idempotency_key else None
+        resp_json = get_transport().post(url, headers=headers, params=params, json=payload,
+                                         idempotent=bool(idempotency_key)).json()
+        if resp_json.get("code") == 0:
+            self._index_events(calendar_id, [resp_json.get("data", {}).get("event")])
+        return resp_json
+
+    def _add_attendees(self, token, calendar_id, event_id, attendee_ids):
+        try:
+            resp_json = self._post_attendees(token, calendar_id, event_id, attendee_ids)
+        except IdentityNotFoundError as e:
+            print(f"Add attendees failed: {e}")
+            return
+        if resp_json is None:
+            return
         
+        if resp_json.get("code") != 0:
+            print(f"Add attendees failed: {resp_json}")
+        else:
+            print(f"Added {len(attendee_ids)} attendees.")
+
+    def _post_attendees(self, token, calendar_id, event_id, attendee_ids):
+        """
+        添加参与人接口，返回响应 JSON；没有有效参与人时返回 None (不打印)
+        手机号 / 邮箱先批量解析为 open_id，通讯录中找不到的邮箱作为外部参与人邀请
+        """
         attendees_payload = []
-        for uid in attendee_ids:
-            if uid:  # Ensure uid is not None or empty
+        for uid in self.resolve_user_ids(attendee_ids or [], keep_unresolved_emails=True):
+            if "@" in uid:
+                # 邮箱 (如 ICS 中的 ATTENDEE) 作为外部参与人邀请
+                attendees_payload.append({"type": "third_party", "third_party_email": uid})
+            else:
                 attendees_payload.append({
                     "type": "user",
                     "user_id_type": "open_id",
@@ -213,24 +877,29 @@ class FeishuCalendar:
                 })
         
         if not attendees_payload:
-            return
+            return None
             
+        url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event_id}/attendees"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
         payload = {
             "attendees": attendees_payload
         }
         
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            print(f"Add attendees failed: {resp_json}")
-        else:
-            print(f"Added {len(attendee_ids)} attendees.")
+        response = get_transport().post(url, headers=headers, json=payload)
+        return response.json()
 
 if __name__ == "__main__":
     # 简单的命令行交互用于测试/初始化
     assistant = FeishuCalendar()
     if not assistant.app_id:
         assistant.initialize()
+    elif "--refresh-calendars" in sys.argv:
+        calendar_list = assistant.refresh_calendars()
+        if calendar_list is not None:
+            for name, calendar_id in assistant.config.get("calendars", {}).items():
+                print(f"{name}: {calendar_id}")
     else:
         print("Feishu Calendar is configured.")
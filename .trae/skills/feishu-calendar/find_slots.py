@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+查找多人共同空闲时段
+用法: python3 find_slots.py <open_id|手机号|邮箱> [...] [--duration 60] [--days 7] [--count 3]
+                            [--work-hours 09:00-18:00] [--any-time] [--weekends] [--no-self] [--create "会议主题"]
+
+并发查询所有参与人的忙闲，合并忙碌区间后在工作时间内找出前 N 个共同空闲时段；
+--create 时直接在第一个时段创建日程并邀请所有参与人。
+"""
+
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar
+from intervals import WEEKDAYS
+
+def find_slots(attendees, duration=60, days=7, count=3, work_hours=("09:00", "18:00"), weekends=False,
+               include_self=True, create=None):
+    """查找共同空闲时段，可选在第一个时段创建日程"""
+    assistant = FeishuCalendar()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+
+    try:
+        open_ids = assistant.resolve_user_ids(attendees)
+        if include_self and assistant.open_id:
+            open_ids.append(assistant.open_id)
+        open_ids = list(dict.fromkeys(open_ids))
+
+        now = int(time.time())
+        started = time.time()
+        slots = assistant.find_common_free_slots(
+            open_ids, duration, now, now + days * 24 * 3600, count,
+            work_hours=work_hours, weekdays=tuple(range(7)) if weekends else WEEKDAYS)
+
+        print(f"👥 {len(open_ids)} 位参与人, 时长 {duration} 分钟, 未来 {days} 天 "
+              f"(查询耗时 {time.time() - started:.2f}s)")
+        print("-" * 70)
+        if not slots:
+            print("📭 没有找到共同空闲时段，可以尝试 --days 扩大范围或 --any-time 不限工作时间")
+            return False
+        for i, (start, end) in enumerate(slots, 1):
+            start_dt = datetime.fromtimestamp(start)
+            print(f"{i:2d}. 🕐 {start_dt.strftime('%Y-%m-%d (%a) %H:%M')} - "
+                  f"{datetime.fromtimestamp(end).strftime('%H:%M')}")
+
+        if create:
+            start, end = slots[0]
+            event_id = assistant.create_event(create, start, end, attendees=open_ids)
+            if not event_id:
+                print("❌ 创建失败")
+                return False
+            print(f"✅ 已在第一个时段创建日程: {event_id}")
+        return True
+
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="查找多人共同空闲时段")
+    parser.add_argument("attendees", nargs="+", help="参与人 open_id、手机号或邮箱")
+    parser.add_argument("--duration", type=int, default=60, help="会议时长 (分钟，默认 60)")
+    parser.add_argument("--days", type=int, default=7, help="搜索未来几天 (默认 7)")
+    parser.add_argument("--count", type=int, default=3, help="返回的时段数 (默认 3)")
+    parser.add_argument("--work-hours", default="09:00-18:00", help="工作时间 (默认 09:00-18:00)")
+    parser.add_argument("--any-time", action="store_true", help="不限制工作时间")
+    parser.add_argument("--weekends", action="store_true", help="包括周末")
+    parser.add_argument("--no-self", action="store_true", help="不把自己计入参与人")
+    parser.add_argument("--create", metavar="SUMMARY", help="在第一个空闲时段创建日程")
+
+    args = parser.parse_args()
+    work_hours = None if args.any_time else tuple(args.work_hours.split("-", 1))
+    success = find_slots(args.attendees, args.duration, args.days, args.count, work_hours, args.weekends,
+                         not args.no_self, args.create)
+    sys.exit(0 if success else 1)
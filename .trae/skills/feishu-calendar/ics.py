@@ -0,0 +1,241 @@
+"""
+iCalendar (.ics) 读写
+
+读取时逐行流式解析 VEVENT，每解析完一个日程就返回，不会把整个文件读入内存：
+- 处理折行 (RFC 5545 3.1) 与转义字符
+- DTSTART / DTEND 支持 UTC (…Z)、带 TZID 的本地时间、浮动时间 (按本机时区) 与全天日期 (VALUE=DATE)
+- 没有 DTEND 时使用 DURATION，二者都没有时全天日程为 1 天、其余为 0
+写入时 IcsWriter 逐个输出 VEVENT (按 75 字节折行)，配合 FeishuCalendar.iter_events 按页导出
+"""
+
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+_DURATION = re.compile(r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+def unfold_lines(fileobj):
+    """合并折行：以空格或 Tab 开头的行是上一行的延续"""
+    current = None
+    for raw in fileobj:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_line(line):
+    """
+    "DTSTART;TZID=Asia/Shanghai:20260211T090000" -> ("DTSTART", {"TZID": "Asia/Shanghai"}, "20260211T090000")
+    """
+    head, _, value = line.partition(":")
+    # 参数值可能带引号并包含冒号，重新按引号外的第一个冒号切分
+    if '"' in head:
+        in_quote = False
+        for i, ch in enumerate(line):
+            if ch == '"':
+                in_quote = not in_quote
+            elif ch == ":" and not in_quote:
+                head, value = line[:i], line[i + 1:]
+                break
+    parts = head.split(";")
+    params = {}
+    for part in parts[1:]:
+        key, _, val = part.partition("=")
+        params[key.upper()] = val.strip('"')
+    return parts[0].upper(), params, value
+
+
+def unescape(value):
+    return (value.replace("\\n", "\n").replace("\\N", "\n")
+            .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def parse_datetime(value, params):
+    """
+    :return: (秒级时间戳, 是否全天)
+    """
+    if params.get("VALUE") == "DATE" or (len(value) == 8 and value.isdigit()):
+        return int(datetime.strptime(value, "%Y%m%d").timestamp()), True
+    if value.endswith("Z"):
+        dt = datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+        return int(dt.timestamp()), False
+    dt = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    tzid = params.get("TZID")
+    if tzid and ZoneInfo is not None:
+        try:
+            dt = dt.replace(tzinfo=ZoneInfo(tzid))
+        except Exception:
+            pass  # 未知时区按本机时区处理
+    return int(dt.timestamp()), False
+
+
+def parse_duration(value):
+    """ISO 8601 时长 (如 PT1H30M、P1D) 转为秒"""
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid DURATION: {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    total = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0),
+                      minutes=int(minutes or 0), seconds=int(seconds or 0)).total_seconds()
+    return -int(total) if sign == "-" else int(total)
+
+
+def iter_ics_events(fileobj):
+    """
+    逐个返回 VEVENT:
+    {"uid", "summary", "description", "location", "start_time", "end_time", "all_day", "attendees", "rrule", "raw"}
+    attendees 为 ATTENDEE 的值 (去掉 mailto: 前缀)，raw 为原始属性列表 [(name, params, value)]
+    """
+    event = None
+    depth = 0
+    for line in unfold_lines(fileobj):
+        if not line:
+            continue
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and event is None:
+                event = {"raw": []}
+                depth = 0
+            elif event is not None:
+                depth += 1  # VEVENT 内嵌的 VALARM 等
+            continue
+        if name == "END":
+            if event is not None and depth:
+                depth -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield _build_event(event)
+                event = None
+            continue
+        if event is not None and not depth:
+            event["raw"].append((name, params, value))
+    if event is not None:
+        raise ValueError("Unterminated VEVENT at end of file")
+
+
+def _build_event(event):
+    props = {}
+    attendees = []
+    for name, params, value in event["raw"]:
+        if name == "ATTENDEE":
+            attendees.append(re.sub(r"(?i)^mailto:", "", value))
+        elif name not in props:
+            props[name] = (params, value)
+
+    if "DTSTART" not in props:
+        raise ValueError(f"VEVENT without DTSTART: {props.get('UID', ({}, ''))[1]}")
+    start_ts, all_day = parse_datetime(props["DTSTART"][1], props["DTSTART"][0])
+    if "DTEND" in props:
+        end_ts, _ = parse_datetime(props["DTEND"][1], props["DTEND"][0])
+    elif "DURATION" in props:
+        end_ts = start_ts + parse_duration(props["DURATION"][1])
+    else:
+        end_ts = start_ts + (86400 if all_day else 0)
+
+    def text(key):
+        return unescape(props[key][1]) if key in props else None
+
+    return {
+        "uid": text("UID"),
+        "summary": text("SUMMARY"),
+        "description": text("DESCRIPTION"),
+        "location": text("LOCATION"),
+        "start_time": start_ts,
+        "end_time": end_ts,
+        "all_day": all_day,
+        "attendees": attendees,
+        "rrule": props["RRULE"][1] if "RRULE" in props else None,
+        "raw": event["raw"],
+    }
+
+
+# --- 写入 ---
+
+def escape(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line):
+    """按 RFC 5545 折行：每行不超过 75 字节，续行以空格开头，不拆开 UTF-8 多字节字符"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        if size + width > limit:
+            parts.append(current)
+            current, size, limit = "", 0, 74  # 续行开头的空格占 1 字节
+        current += ch
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(timestamp):
+    return datetime.fromtimestamp(int(timestamp), timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+class IcsWriter:
+    """
+    逐个写入 VEVENT：
+    with IcsWriter(f) as writer:
+        writer.write_event(feishu_event)
+    """
+
+    def __init__(self, fileobj, calendar_name=None):
+        self.fileobj = fileobj
+        self.calendar_name = calendar_name
+        self.count = 0
+
+    def __enter__(self):
+        self._write("BEGIN:VCALENDAR")
+        self._write("VERSION:2.0")
+        self._write("PRODID:-//skillCreator//feishu-calendar//CN")
+        self._write("CALSCALE:GREGORIAN")
+        if self.calendar_name:
+            self._write(f"X-WR-CALNAME:{escape(self.calendar_name)}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._write("END:VCALENDAR")
+
+    def _write(self, line):
+        self.fileobj.write(fold_line(line))
+
+    def write_event(self, event):
+        """写入一个飞书日程 (日程列表接口返回的 JSON)，全天日程写为 VALUE=DATE，其余统一写为 UTC 时间"""
+        self._write("BEGIN:VEVENT")
+        self._write(f"UID:{event.get('event_id')}")
+        self._write(f"DTSTAMP:{format_utc(time.time())}")
+        for name, key in (("DTSTART", "start_time"), ("DTEND", "end_time")):
+            value = event.get(key) or {}
+            if value.get("date"):
+                self._write(f"{name};VALUE=DATE:{value['date'].replace('-', '')}")
+            elif value.get("timestamp"):
+                self._write(f"{name}:{format_utc(value['timestamp'])}")
+        self._write(f"SUMMARY:{escape(event.get('summary') or '')}")
+        if event.get("description"):
+            self._write(f"DESCRIPTION:{escape(event['description'])}")
+        location = (event.get("location") or {}).get("name")
+        if location:
+            self._write(f"LOCATION:{escape(location)}")
+        if event.get("recurrence"):
+            self._write(f"RRULE:{event['recurrence']}")
+        self._write("END:VEVENT")
+        self.count += 1
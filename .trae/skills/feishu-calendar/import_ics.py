@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+从 .ics 文件导入日程到飞书日历
+用法: python3 import_ics.py <input.ics> [--calendar 名称] [--workers 8] [--checkpoint 路径] [--notify]
+
+逐个读取 VEVENT 并发创建，进度写入 checkpoint 文件 (默认 <input.ics>.manifest.jsonl)；
+中断后重新运行同一命令会从断点继续，已导入的日程不会重复创建。
+默认不给参与人发送通知，--notify 时发送。
+"""
+
+import sys
+import os
+import argparse
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar
+from event_import import DEFAULT_WORKERS
+
+def import_calendar(path, calendar=None, workers=DEFAULT_WORKERS, checkpoint=None, notify=False):
+    """导入 ICS 文件中的日程"""
+    assistant = FeishuCalendar()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+
+    try:
+        calendar_id = assistant.resolve_calendar_id(calendar)
+        if not calendar_id:
+            print(f"❌ 没有找到日历: {calendar or '默认日历'}")
+            return False
+
+        print(f"📅 日历: {calendar_id}")
+        print(f"📄 断点文件: {checkpoint or path + '.manifest.jsonl'}")
+        stats = assistant.import_ics(path, calendar_id, workers, checkpoint, notify)
+        print("-" * 70)
+        print(f"✅ 导入 {stats['created']} 个, 补加参与人 {stats['attendees_retried']} 个, "
+              f"跳过已导入 {stats['skipped']} 个, 失败 {stats['failed']} 个, 耗时 {stats['seconds']}s")
+        if stats["failed"]:
+            print("💡 重新运行同一命令，只会重试失败的日程")
+        return not stats["failed"]
+
+    except Exception as e:
+        print(f"❌ 导入失败: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="从 .ics 文件导入日程到飞书日历")
+    parser.add_argument("input", help=".ics 文件")
+    parser.add_argument("--calendar", help="日历名称或 calendar_id (默认使用默认日历)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"并发数 (默认 {DEFAULT_WORKERS})")
+    parser.add_argument("--checkpoint", help="断点文件路径 (默认 <input>.manifest.jsonl)")
+    parser.add_argument("--notify", action="store_true", help="给参与人发送通知")
+
+    args = parser.parse_args()
+    success = import_calendar(args.input, args.calendar, max(1, args.workers), args.checkpoint, args.notify)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,152 @@
+"""
+忙闲区间计算
+
+多人的忙碌时段合并为一个按开始时间排序、互不重叠的区间表 (BusyIndex)，
+查询某段时间是否空闲、下一个空闲时刻都用二分查找完成，找 N 个共同空闲时段不需要两两比较。
+一批日程的冲突检测 (find_overlaps) 用排序 + 扫描线一次完成，同样不需要两两比较。
+所有时间均为秒级时间戳。
+"""
+
+import bisect
+import heapq
+from datetime import datetime, timedelta
+
+DEFAULT_WORK_HOURS = ("09:00", "18:00")
+WEEKDAYS = (0, 1, 2, 3, 4)  # 周一到周五
+DEFAULT_SLOT_STEP = 15 * 60  # 候选时段的起点按 15 分钟对齐
+
+
+def merge_intervals(intervals):
+    """合并重叠或相接的区间，返回按开始时间排序的 [(start, end)]"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class BusyIndex:
+    """有序、不重叠的忙碌区间表"""
+
+    def __init__(self, intervals=()):
+        merged = merge_intervals(intervals)
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def add(self, start, end):
+        """插入一个忙碌区间，与相邻区间合并"""
+        if end <= start:
+            return
+        # 与 [start, end] 重叠或相接的区间下标范围 [lo, hi)
+        lo = bisect.bisect_left(self.ends, start)
+        hi = bisect.bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def conflict(self, start, end):
+        """返回与 [start, end) 重叠的第一个忙碌区间，没有时返回 None"""
+        i = bisect.bisect_right(self.ends, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def is_free(self, start, end):
+        return self.conflict(start, end) is None
+
+
+def find_overlaps(proposed, existing=()):
+    """
+    扫描线找出所有时间重叠：proposed 内部两两之间，以及 proposed 与 existing 之间 (existing 内部的重叠不报告)
+    区间按开始时间排序后依次扫描，用按结束时间排序的堆维护「仍在进行」的区间，
+    复杂度 O(n log n + k)，k 为重叠数
+    :param proposed: [(start, end, key)]，区间为左闭右开，首尾相接不算重叠
+    :param existing: [(start, end, key)]
+    :return: [(proposed_key, other_key, overlap_start, overlap_end)]，other_key 来自 proposed 或 existing；
+             两个都来自 proposed 时 proposed_key 为开始较早的一个
+    """
+    items = [(start, end, True, key) for start, end, key in proposed if end > start]
+    items += [(start, end, False, key) for start, end, key in existing if end > start]
+    # 开始时间相同时先扫描 proposed，保证 proposed_key 总是来自 proposed
+    items.sort(key=lambda item: (item[0], not item[2]))
+
+    active = {True: [], False: []}  # 是否 proposed -> [(end, 序号, start, key)]
+    overlaps = []
+    for seq, (start, end, is_proposed, key) in enumerate(items):
+        for heap in active.values():
+            while heap and heap[0][0] <= start:
+                heapq.heappop(heap)
+        # 堆中剩下的区间都满足 other_start <= start < other_end，与当前区间必然重叠
+        for other_end, _, other_start, other_key in active[True]:
+            overlaps.append((other_key, key, start, min(end, other_end)))
+        if is_proposed:
+            for other_end, _, other_start, other_key in active[False]:
+                overlaps.append((key, other_key, start, min(end, other_end)))
+        heapq.heappush(active[is_proposed], (end, seq, start, key))
+    return overlaps
+
+
+def _parse_clock(value):
+    hour, _, minute = value.partition(":")
+    return int(hour), int(minute or 0)
+
+
+def work_windows(start_ts, end_ts, work_hours=DEFAULT_WORK_HOURS, weekdays=WEEKDAYS):
+    """
+    按本地时区逐天生成 [start_ts, end_ts) 内的工作时间窗口 (start, end)
+    :param work_hours: ("09:00", "18:00")
+    :param weekdays: 允许的星期 (0 为周一)
+    """
+    (h1, m1), (h2, m2) = _parse_clock(work_hours[0]), _parse_clock(work_hours[1])
+    day = datetime.fromtimestamp(start_ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    while int(day.timestamp()) < end_ts:
+        if day.weekday() in weekdays:
+            window_start = max(int(day.replace(hour=h1, minute=m1).timestamp()), start_ts)
+            window_end = min(int(day.replace(hour=h2, minute=m2).timestamp()), end_ts)
+            if window_start < window_end:
+                yield window_start, window_end
+        day += timedelta(days=1)
+
+
+def find_free_slots(busy, start_ts, end_ts, duration, count=3, work_hours=DEFAULT_WORK_HOURS,
+                    weekdays=WEEKDAYS, step=DEFAULT_SLOT_STEP):
+    """
+    在工作时间内查找前 count 个长度为 duration (秒) 的空闲时段，互不重叠
+    :param busy: BusyIndex 或 [(start, end)]
+    :param work_hours: 为 None 时不限制工作时间 (全天可用)
+    :param step: 时段起点对齐的粒度 (秒)
+    :return: [(start, end)]
+    """
+    if not isinstance(busy, BusyIndex):
+        busy = BusyIndex(busy)
+    windows = work_windows(start_ts, end_ts, work_hours, weekdays) if work_hours else [(start_ts, end_ts)]
+
+    def align(ts):
+        return -(-ts // step) * step if step else ts
+
+    slots = []
+    for window_start, window_end in windows:
+        t = align(window_start)
+        while t + duration <= window_end:
+            blocked = busy.conflict(t, t + duration)
+            if blocked is None:
+                slots.append((t, t + duration))
+                if len(slots) >= count:
+                    return slots
+                t = align(t + duration)
+            else:
+                t = align(blocked[1])
+    return slots
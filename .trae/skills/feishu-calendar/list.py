@@ -1,103 +1,125 @@
 #!/usr/bin/env python3
 """
 列出飞书日程
-用法: python3 list.py [days]
+用法: python3 list.py [days] [--page-size 500] [--sort] [--local [--no-sync]] [--calendar 名称 ...] [--all-calendars]
+
+按页拉取并逐条打印，日程再多也只在内存中保留一页；--sort 时先取完全部日程再按开始时间排序输出。
+--local 先增量同步 (只拉取有变化的日程，见 sync.py)，再从本地日程库按时间查询；--no-sync 跳过同步。
+重复日程在本地按 RRULE 展开为各次实例 (见 recurrence.py)，查询几个月也不需要逐个实例请求接口。
+--calendar (可重复) / --all-calendars 同时列出多个日历 (含共享、订阅日历)：各日历并发拉取，
+按开始时间归并为一个日程表，耗时约等于单个日历。
 """
 
 import sys
 import os
 import time
-import requests
-from datetime import datetime
+import heapq
+import argparse
 
 # 获取当前脚本所在目录并添加到 sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
-from feishu_client import FeishuCalendar
+from feishu_client import FeishuCalendar, EVENT_PAGE_SIZE, event_start_key
+from event_store import EventStore
+from recurrence import stored_agenda
+from event_format import print_event
+
+def local_events(assistant, calendar_ids, start, end, sync=True, page_size=EVENT_PAGE_SIZE):
+    """
+    增量同步后从本地日程库查询，重复日程展开为各次实例，结果已按开始时间排序
+    :param calendar_ids: 为空时使用默认日历；多个日历的查询结果按开始时间归并
+    """
+    store = EventStore()
+
+    def query(calendar_id):
+        for event in stored_agenda(store, calendar_id, start, end):
+            event.setdefault("calendar_id", calendar_id)
+            yield event
+
+    try:
+        streams = []
+        for calendar_id in calendar_ids or [None]:
+            if sync:
+                calendar_id = assistant.sync_events(store, calendar_id, page_size=page_size)["calendar_id"]
+            else:
+                calendar_id = calendar_id or assistant.resolve_calendar_id()
+                if store.last_synced_at(calendar_id) is None:
+                    print(f"⚠️  本地日程库尚未同步 {calendar_id}，请先运行: python3 sync.py")
+            streams.append(query(calendar_id))
+        yield from heapq.merge(*streams, key=event_start_key)
+    finally:
+        store.close()
 
-def list_events(days=7):
+def list_events(days=7, page_size=EVENT_PAGE_SIZE, sort=False, local=False, sync=True, calendars=None,
+                all_calendars=False):
     """列出未来几天的日程"""
     assistant = FeishuCalendar()
-    
+
     if not assistant.app_id:
         print("❌ 未配置，请先运行: python3 feishu_client.py")
         return False
-    
+
     try:
-        token = assistant._get_tenant_access_token()
-        
-        # 获取日历信息
-        calendars = assistant.list_calendars()
-        if calendars.get("code") != 0:
-            print(f"❌ 获取日历失败")
-            return False
-            
-        calendar_list = calendars.get("data", {}).get("calendar_list", [])
-        if not calendar_list:
+        # 日历 ID 与名称来自配置中缓存的日历列表，缓存缺失时才会请求接口
+        calendar_ids = assistant.resolve_calendar_ids(calendars) if calendars or all_calendars else None
+        calendar_id = calendar_ids[0] if calendar_ids else assistant.resolve_calendar_id()
+        if not calendar_id:
             print("❌ 没有找到日历")
             return False
-            
-        calendar_id = calendar_list[0].get("calendar_id")
-        calendar_name = calendar_list[0].get("summary", "默认日历")
-        
-        print(f"📅 日历: {calendar_name}")
+        names = assistant.calendar_names()
+        multi = len(calendar_ids or []) > 1
+
+        if multi:
+            print(f"📅 日历: {len(calendar_ids)} 个 ({', '.join(names.get(cid, cid) for cid in calendar_ids)})")
+        else:
+            print(f"📅 日历: {names.get(calendar_id, '默认日历')}")
         print(f"📆 未来 {days} 天日程:")
-        print("-" * 70)
-        
+        print("-" * 70, flush=True)
+
         # 获取时间范围
         now = int(time.time())
         future = now + (days * 24 * 3600)
-        
-        # 获取日程列表
-        url = f"https://open.feishu.cn/open-apis/calendar/v4/calendars/{calendar_id}/events?start_time={now}&end_time={future}"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-        
-        response = requests.get(url, headers=headers)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            print(f"❌ 获取日程失败: {resp_json.get('msg', '未知错误')}")
-            return False
-            
-        events = resp_json.get("data", {}).get("event_list", [])
-        
-        if not events:
+
+        errors = {}
+        if local:
+            events = local_events(assistant, calendar_ids, now, future, sync, page_size)
+        elif multi:
+            events = assistant.iter_events_multi(calendar_ids, now, future, page_size=page_size, errors=errors)
+        else:
+            events = assistant.iter_events(now, future, page_size=page_size,
+                                           calendar_id=calendar_id if calendar_ids else None)
+        if sort and not local and not multi:
+            events = sorted(events, key=event_start_key)
+
+        count = 0
+        # 重复日程中被取消的某一次实例也会出现在列表中
+        events = (event for event in events if event.get("status") != "cancelled")
+        for count, event in enumerate(events, 1):
+            calendar = names.get(event.get("calendar_id"), event.get("calendar_id")) if multi else None
+            print_event(count, event, calendar)
+
+        if not count:
             print("📭 暂无日程")
-            return True
-            
-        # 按时间排序
-        events.sort(key=lambda x: int(x.get("start_time", {}).get("timestamp", 0)))
-        
-        for i, event in enumerate(events, 1):
-            event_id = event.get("event_id")
-            summary = event.get("summary", "无标题")
-            start_ts = int(event.get("start_time", {}).get("timestamp", 0))
-            end_ts = int(event.get("end_time", {}).get("timestamp", 0))
-            description = event.get("description", "")
-            
-            start_dt = datetime.fromtimestamp(start_ts)
-            end_dt = datetime.fromtimestamp(end_ts)
-            
-            # 标记周末
-            is_weekend = "🏖️ " if start_dt.weekday() >= 5 else ""
-            
-            print(f"{is_weekend}{i:2d}. 📝 {summary}")
-            print(f"    📅 {start_dt.strftime('%m月%d日 %H:%M')} - {end_dt.strftime('%H:%M')}")
-            print(f"    🆔 {event_id}")
-            if description:
-                print(f"    📋 {description[:50]}{'...' if len(description) > 50 else ''}")
-            print()
-        
+        for cid, error in errors.items():
+            print(f"⚠️  日历 {names.get(cid, cid)} 读取失败: {error}")
+
         return True
-        
+
     except Exception as e:
         print(f"❌ 错误: {e}")
         return False
 
 if __name__ == "__main__":
-    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
-    success = list_events(days)
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="列出飞书日程")
+    parser.add_argument("days", nargs="?", type=int, default=7, help="未来天数 (默认 7)")
+    parser.add_argument("--page-size", type=int, default=EVENT_PAGE_SIZE, help=f"每页条数 (默认 {EVENT_PAGE_SIZE})")
+    parser.add_argument("--sort", action="store_true", help="取完全部日程后按开始时间排序输出")
+    parser.add_argument("--local", action="store_true", help="增量同步后从本地日程库查询 (结果按时间排序)")
+    parser.add_argument("--no-sync", action="store_true", help="与 --local 一起使用，不联网，直接查询本地日程库")
+    parser.add_argument("--calendar", action="append", help="日历名称或 calendar_id，可重复 (默认使用默认日历)")
+    parser.add_argument("--all-calendars", action="store_true", help="列出全部日历 (含共享、订阅日历) 的日程")
+
+    args = parser.parse_args()
+    success = list_events(args.days, args.page_size, args.sort, args.local, not args.no_sync, args.calendar,
+                          args.all_calendars)
+    sys.exit(0 if success else 1)
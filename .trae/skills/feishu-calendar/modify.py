@@ -7,13 +7,14 @@
 import sys
 import os
 import time
-import requests
 from datetime import datetime, timedelta
 
 # 获取当前脚本所在目录并添加到 sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 from feishu_client import FeishuCalendar
+from http_transport import get_transport
+from api_base import FEISHU_API_BASE
 
 def modify_event(event_id, summary=None, date_time=None, duration=None, description=None):
     """修改日程事件"""
@@ -26,28 +27,20 @@ def modify_event(event_id, summary=None, date_time=None, duration=None, descript
     try:
         token = assistant._get_tenant_access_token()
         
-        # 获取日历ID
-        calendars = assistant.list_calendars()
-        if calendars.get("code") != 0:
-            print(f"❌ 获取日历失败")
-            return False
-            
-        calendar_list = calendars.get("data", {}).get("calendar_list", [])
-        if not calendar_list:
-            print("❌ 没有找到日历")
-            return False
-            
-        calendar_id = calendar_list[0].get("calendar_id")
-        
-        # 先获取当前日程信息
-        get_url = f"https://open.feishu.cn/open-apis/calendar/v4/calendars/{calendar_id}/events/{event_id}"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json; charset=utf-8"
         }
         
-        get_resp = requests.get(get_url, headers=headers)
-        current_event = get_resp.json()
+        # 先获取当前日程信息 (calendar_id 使用配置中缓存的默认日历)
+        def get_event(calendar_id):
+            get_url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event_id}"
+            return get_transport().get(get_url, headers=headers).json()
+        
+        calendar_id, current_event = assistant.with_calendar_id(get_event)
+        if not calendar_id:
+            print("❌ 没有找到日历")
+            return False
         
         if current_event.get("code") != 0:
             print(f"❌ 获取当前日程失败: {current_event.get('msg', '未知错误')}")
@@ -79,8 +72,8 @@ def modify_event(event_id, summary=None, date_time=None, duration=None, descript
             update_data["end_time"] = {"timestamp": str(end_time)}
         
         # 更新日程
-        update_url = f"https://open.feishu.cn/open-apis/calendar/v4/calendars/{calendar_id}/events/{event_id}"
-        response = requests.patch(update_url, headers=headers, json=update_data)
+        update_url = f"{FEISHU_API_BASE}/calendar/v4/calendars/{calendar_id}/events/{event_id}"
+        response = get_transport().patch(update_url, headers=headers, json=update_data)
         resp_json = response.json()
         
         if resp_json.get("code") != 0:
@@ -88,6 +81,7 @@ def modify_event(event_id, summary=None, date_time=None, duration=None, descript
             return False
             
         print(f"✅ 修改成功: {event_id}")
+        assistant._index_events(calendar_id, [resp_json.get("data", {}).get("event")])
         
         # 显示修改后的信息
         if summary:
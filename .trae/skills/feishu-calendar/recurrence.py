@@ -0,0 +1,348 @@
+"""
+重复日程 (RRULE) 的本地展开
+
+飞书日程的 recurrence 字段是 RFC 5545 的 RRULE (如 "FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,WE")。
+expand_events() 在给定时间窗口内按规则生成每一次实例，服务端报告的例外实例 (修改或取消了其中一次) 代替对应的生成结果，
+列出几个月的日程表、计算忙闲时不需要逐个实例请求接口。
+
+- 支持 FREQ=DAILY/WEEKLY/MONTHLY/YEARLY 以及 INTERVAL、COUNT、UNTIL、BYDAY (含 1MO / -1FR 序号)、BYMONTHDAY、BYMONTH、WKST；
+  含其他规则部分 (BYSETPOS、BYYEARDAY、BYWEEKNO、BYHOUR 等) 的日程无法展开，原样返回主日程
+- 实例按日程的时区 (start_time.timezone) 计算，夏令时切换前后保持同一本地时刻；全天日程按本地日期计算
+- 没有 COUNT 时直接跳到窗口所在的周期开始生成，很早以前创建的每日例会也不需要从第一次逐个推算
+"""
+
+import calendar
+import re
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9：按本地时区计算
+    ZoneInfo = None
+
+from event_store import event_time, event_timestamp
+
+WEEKDAY_CODES = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+SUPPORTED_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "BYMONTHDAY", "BYMONTH", "WKST"}
+# 每个重复日程最多展开的实例数，避免没有结束条件且不限窗口时无限生成
+MAX_INSTANCES = 5000
+# 连续没有候选实例的周期数上限 (如 BYMONTH=2;BYMONTHDAY=30 永远不会出现)
+MAX_EMPTY_PERIODS = 1000
+
+_BYDAY = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+class UnsupportedRule(ValueError):
+    """RRULE 含有无法在本地展开的部分"""
+
+
+def _int_list(value):
+    return [int(item) for item in (value or "").split(",") if item.strip()]
+
+
+def parse_rrule(rule):
+    """
+    "FREQ=WEEKLY;BYDAY=MO,WE" (可带 "RRULE:" 前缀) -> dict
+    :raise UnsupportedRule: 规则含不支持的部分
+    """
+    text = rule.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+    parts = {}
+    for item in text.split(";"):
+        if item.strip():
+            key, _, value = item.partition("=")
+            parts[key.strip().upper()] = value.strip()
+
+    freq = parts.get("FREQ", "").upper()
+    unsupported = set(parts) - SUPPORTED_PARTS
+    if unsupported or freq not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        raise UnsupportedRule(f"Unsupported RRULE: {rule}")
+    byday = []
+    for token in parts.get("BYDAY", "").upper().split(","):
+        if not token.strip():
+            continue
+        match = _BYDAY.match(token.strip())
+        if not match:
+            raise UnsupportedRule(f"Unsupported RRULE: {rule}")
+        byday.append((int(match.group(1)) if match.group(1) else None, WEEKDAY_CODES[match.group(2)]))
+    if freq == "YEARLY" and byday and not parts.get("BYMONTH"):
+        # 「一年中的第 N 个周一」这类规则不常见，不支持
+        raise UnsupportedRule(f"Unsupported RRULE: {rule}")
+
+    return {
+        "freq": freq,
+        "interval": max(1, int(parts.get("INTERVAL") or 1)),
+        "count": int(parts["COUNT"]) if parts.get("COUNT") else None,
+        "until": parts.get("UNTIL") or None,
+        "byday": byday,
+        "bymonthday": _int_list(parts.get("BYMONTHDAY")),
+        "bymonth": _int_list(parts.get("BYMONTH")),
+        "wkst": WEEKDAY_CODES.get(parts.get("WKST", "MO").upper(), 0),
+    }
+
+
+def _event_tz(value):
+    """日程时间中的时区，没有或无法识别时返回 None (按本地时区计算)"""
+    name = (value or {}).get("timezone")
+    if name and ZoneInfo:
+        try:
+            return ZoneInfo(name)
+        except Exception:
+            pass
+    return None
+
+
+def _from_ts(ts, tz):
+    return datetime.fromtimestamp(ts, tz) if tz else datetime.fromtimestamp(ts)
+
+
+def _parse_until(value, tz):
+    """UNTIL 转为秒级时间戳 (包含该时刻)；只有日期时包含当天"""
+    value = value.upper()
+    if value.endswith("Z"):
+        return int(datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).timestamp())
+    if "T" in value:
+        dt = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    else:
+        dt = datetime.strptime(value, "%Y%m%d") + timedelta(days=1, seconds=-1)
+    return int((dt.replace(tzinfo=tz) if tz else dt).timestamp())
+
+
+def _month_days(year, month, rule, default_day):
+    """某个月中符合 BYMONTHDAY / BYDAY 的日期 (已排序)"""
+    days_in_month = calendar.monthrange(year, month)[1]
+    weekdays = {weekday for _, weekday in rule["byday"]}
+    if rule["bymonthday"]:
+        days = [d if d > 0 else days_in_month + d + 1 for d in rule["bymonthday"]]
+        days = [d for d in days if 1 <= d <= days_in_month]
+        if weekdays:
+            days = [d for d in days if calendar.weekday(year, month, d) in weekdays]
+    elif rule["byday"]:
+        days = []
+        for n, weekday in rule["byday"]:
+            matching = [d for d in range(1, days_in_month + 1) if calendar.weekday(year, month, d) == weekday]
+            if n is None:
+                days += matching
+            elif 0 < abs(n) <= len(matching):
+                days.append(matching[n - 1 if n > 0 else n])
+    else:
+        # 没有这一天的月份 (如 31 号) 跳过
+        days = [default_day] if default_day <= days_in_month else []
+    return sorted(set(days))
+
+
+def _periods(rule, dtstart, skip_to):
+    """
+    按 FREQ / INTERVAL 逐个周期返回 (周期开始, [候选开始时间])，候选已排序
+    :param skip_to: 不为 None 时从包含该时刻的周期开始 (没有 COUNT 时用于跳过窗口之前的周期)
+    """
+    freq, interval = rule["freq"], rule["interval"]
+    weekdays = {weekday for _, weekday in rule["byday"]}
+
+    def skip(elapsed):
+        return max(0, elapsed // interval * interval) if skip_to is not None else 0
+
+    if freq == "DAILY":
+        k = skip((skip_to.date() - dtstart.date()).days) if skip_to is not None else 0
+        while True:
+            day = dtstart + timedelta(days=k)
+            ok = ((not rule["bymonth"] or day.month in rule["bymonth"])
+                  and (not weekdays or day.weekday() in weekdays)
+                  and (not rule["bymonthday"] or day.day in _month_days(day.year, day.month, rule, day.day)))
+            yield day, [day] if ok else []
+            k += interval
+
+    elif freq == "WEEKLY":
+        week_start = dtstart - timedelta(days=(dtstart.weekday() - rule["wkst"]) % 7)
+        offsets = sorted((weekday - rule["wkst"]) % 7 for weekday in (weekdays or {dtstart.weekday()}))
+        k = skip((skip_to.date() - week_start.date()).days // 7) if skip_to is not None else 0
+        while True:
+            base = week_start + timedelta(weeks=k)
+            candidates = [base + timedelta(days=offset) for offset in offsets]
+            yield base, [dt for dt in candidates if not rule["bymonth"] or dt.month in rule["bymonth"]]
+            k += interval
+
+    elif freq == "MONTHLY":
+        first = dtstart.year * 12 + dtstart.month - 1
+        k = skip(skip_to.year * 12 + skip_to.month - 1 - first) if skip_to is not None else 0
+        while True:
+            year, month = divmod(first + k, 12)
+            month += 1
+            base = dtstart.replace(year=year, month=month, day=1)
+            if rule["bymonth"] and month not in rule["bymonth"]:
+                yield base, []
+            else:
+                yield base, [base.replace(day=d) for d in _month_days(year, month, rule, dtstart.day)]
+            k += interval
+
+    else:  # YEARLY
+        k = skip(skip_to.year - dtstart.year) if skip_to is not None else 0
+        while True:
+            year = dtstart.year + k
+            base = dtstart.replace(year=year, month=1, day=1)
+            candidates = []
+            for month in rule["bymonth"] or [dtstart.month]:
+                candidates += [base.replace(month=month, day=d)
+                               for d in _month_days(year, month, rule, dtstart.day)]
+            yield base, sorted(candidates)
+            k += interval
+
+
+def iter_instances(start_ts, end_ts, rule, tz=None, window_start=None, window_end=None, all_day=False):
+    """
+    生成与窗口 [window_start, window_end) 有交集的实例 (开始, 结束) 秒级时间戳
+    :param start_ts: 第一次实例 (DTSTART) 的开始时间戳，DTSTART 总是第一次实例并计入 COUNT
+    :param end_ts: 第一次实例的结束时间戳，各实例时长相同 (全天日程为相同天数)
+    :param rule: parse_rrule() 的结果
+    :param tz: 计算本地时刻使用的时区，None 为本地时区
+    """
+    dtstart = _from_ts(start_ts, tz)
+    duration = max(0, end_ts - start_ts)
+    days = round(duration / 86400)
+    until = _parse_until(rule["until"], tz) if rule["until"] else None
+    count = rule["count"]
+    skip_to = None
+    if count is None and window_start is not None and window_start - duration > start_ts:
+        skip_to = _from_ts(window_start - duration, tz)
+
+    def instance(dt):
+        begin = int(dt.timestamp())
+        # 全天日程按日期加天数，避免夏令时切换当天的 23 / 25 小时
+        end = int((dt + timedelta(days=days)).timestamp()) if all_day else begin + duration
+        return begin, end
+
+    def in_window(begin, end):
+        return (window_start is None or end > window_start) and (window_end is None or begin < window_end)
+
+    produced = 1
+    emitted = 0
+    first = instance(dtstart)
+    if in_window(*first):
+        emitted += 1
+        yield first
+    empty = 0
+    for period_start, candidates in _periods(rule, dtstart, skip_to):
+        if window_end is not None and int(period_start.timestamp()) >= window_end:
+            return
+        empty = 0 if candidates else empty + 1
+        if empty > MAX_EMPTY_PERIODS:
+            return
+        for dt in candidates:
+            begin, end = instance(dt)
+            if begin <= start_ts:
+                continue
+            if until is not None and begin > until:
+                return
+            if count is not None:
+                if produced >= count:
+                    return
+                produced += 1
+            if window_end is not None and begin >= window_end:
+                return
+            if in_window(begin, end):
+                emitted += 1
+                yield begin, end
+                if emitted >= MAX_INSTANCES:
+                    return
+
+
+def instance_id(master_id, start_ts):
+    """重复日程实例的 event_id：主日程 ID 去掉 "_0" 后缀，再加上该次的原始开始时间戳 (与飞书的实例 ID 格式一致)"""
+    base = master_id[:-2] if master_id.endswith("_0") else master_id
+    return f"{base}_{start_ts}"
+
+
+def original_start(event):
+    """例外实例原本的开始时间戳 (original_time 字段，或 event_id 的时间戳后缀)，无法确定时返回 None"""
+    if event.get("original_time"):
+        return int(event["original_time"])
+    suffix = (event.get("event_id") or "").rpartition("_")[2]
+    return int(suffix) if suffix.isdigit() and suffix != "0" else None
+
+
+def _overlaps(event, start_ts, end_ts):
+    start = event_timestamp(event.get("start_time"))
+    end = event_timestamp(event.get("end_time"))
+    if start is None or end is None:
+        return True
+    return (start_ts is None or end > start_ts) and (end_ts is None or start < end_ts)
+
+
+def expand_master(master, start_ts=None, end_ts=None):
+    """
+    按 RRULE 生成主日程在窗口内的实例 (主日程 JSON 的副本)
+    实例的 event_id 为 instance_id()，recurring_event_id 指向主日程，去掉 recurrence 字段
+    :raise UnsupportedRule: 规则无法展开
+    """
+    rule = parse_rrule(master["recurrence"])
+    start_value = master.get("start_time") or {}
+    end_value = master.get("end_time") or {}
+    all_day = bool(start_value.get("date")) and not start_value.get("timestamp")
+    first_start = event_timestamp(start_value)
+    first_end = event_timestamp(end_value)
+    if first_start is None:
+        raise UnsupportedRule(f"Recurring event without start time: {master.get('event_id')}")
+    tz = None if all_day else _event_tz(start_value)
+    for begin, end in iter_instances(first_start, first_end or first_start, rule, tz, start_ts, end_ts, all_day):
+        instance = {k: v for k, v in master.items() if k != "recurrence"}
+        instance.update(
+            event_id=instance_id(master["event_id"], begin),
+            recurring_event_id=master["event_id"],
+            is_exception=False,
+            start_time=dict({k: v for k, v in start_value.items() if k not in ("date", "timestamp")},
+                            **event_time(begin, all_day)),
+            end_time=dict({k: v for k, v in end_value.items() if k not in ("date", "timestamp")},
+                          **event_time(end, all_day)),
+        )
+        yield instance
+
+
+def expand_events(events, start_ts=None, end_ts=None):
+    """
+    展开重复日程，返回与窗口 [start_ts, end_ts) 有交集的日程 (按开始时间排序)
+    - 普通日程原样返回，已取消的日程 (含取消的某一次实例) 不返回
+    - 重复日程的主日程替换为窗口内按 RRULE 生成的各次实例；规则无法展开时原样返回主日程
+    - events 中已有的实例 (服务端返回的例外，或已展开的实例) 代替对应的生成实例，即使它被改到了窗口之外
+    """
+    masters = []
+    others = []
+    for event in events:
+        if event.get("recurrence") and not event.get("recurring_event_id"):
+            masters.append(event)
+        else:
+            others.append(event)
+
+    overridden = set()
+    for event in others:
+        if event.get("event_id"):
+            overridden.add(event["event_id"])
+        original = original_start(event)
+        if event.get("recurring_event_id") and original:
+            overridden.add(instance_id(event["recurring_event_id"], original))
+
+    result = [event for event in others if event.get("status") != "cancelled" and _overlaps(event, start_ts, end_ts)]
+    for master in masters:
+        if master.get("status") == "cancelled":
+            continue
+        try:
+            result += [instance for instance in expand_master(master, start_ts, end_ts)
+                       if instance["event_id"] not in overridden]
+        except (UnsupportedRule, ValueError):
+            if _overlaps(master, start_ts, end_ts):
+                result.append(master)
+    result.sort(key=lambda event: event_timestamp(event.get("start_time")) or 0)
+    return result
+
+
+def stored_agenda(store, calendar_id, start_ts, end_ts):
+    """
+    本地日程库 (EventStore) 中与窗口有交集的日程，连同首次开始于窗口之前的重复日程及其例外实例一并展开
+    :return: expand_events() 的结果
+    """
+    events = {}
+    for event in store.query(calendar_id, start_ts, end_ts):
+        events[event["event_id"]] = event
+    for event in store.recurring(calendar_id, end_ts):
+        events.setdefault(event["event_id"], event)
+    return expand_events(events.values(), start_ts, end_ts)
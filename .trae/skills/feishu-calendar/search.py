@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+在本地日程库中搜索日程 (不访问接口)
+用法: python3 search.py [关键词 ...] [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--days-back N] [--limit 50] [--sync]
+
+关键词需同时出现在标题或描述中 (全文索引，支持中文)；本地库由 sync.py 以及 list.py / create.py / modify.py /
+delete.py 等命令顺带更新，--sync 时先增量同步默认日历。
+"""
+
+import sys
+import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar
+from event_format import print_event
+
+def search_events(text=None, date_from=None, date_to=None, days_back=None, limit=50, sync=False):
+    """搜索本地日程库"""
+    assistant = FeishuCalendar()
+
+    if sync and not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+
+    try:
+        start_time = end_time = None
+        if days_back:
+            start_time = int((datetime.now() - timedelta(days=days_back)).timestamp())
+        if date_from:
+            start_time = int(datetime.strptime(date_from, "%Y-%m-%d").timestamp())
+        if date_to:
+            end_time = int(datetime.strptime(date_to, "%Y-%m-%d").timestamp())
+
+        started = time.perf_counter()
+        events = assistant.search_events(text, start_time, end_time, limit=limit, sync=sync)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        print(f"🔍 {text or '全部日程'}: {len(events)} 个结果 ({elapsed:.1f}ms)")
+        print("-" * 70, flush=True)
+        for i, event in enumerate(events, 1):
+            print_event(i, event)
+        if not events:
+            print("📭 没有找到匹配的日程 (本地库可能尚未同步，可加 --sync)")
+        return True
+
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="在本地日程库中搜索日程")
+    parser.add_argument("keywords", nargs="*", help="关键词 (空格分隔，需全部匹配)")
+    parser.add_argument("--from", dest="date_from", help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="结束日期 YYYY-MM-DD (不含当天)")
+    parser.add_argument("--days-back", type=int, help="只搜索最近 N 天以来的日程")
+    parser.add_argument("--limit", type=int, default=50, help="最多返回条数 (默认 50)")
+    parser.add_argument("--sync", action="store_true", help="搜索前先增量同步默认日历")
+
+    args = parser.parse_args()
+    success = search_events(" ".join(args.keywords) or None, args.date_from, args.date_to, args.days_back,
+                            args.limit, args.sync)
+    sys.exit(0 if success else 1)
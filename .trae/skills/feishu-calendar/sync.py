@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+同步飞书日程到本地日程库
+用法: python3 sync.py [--full] [--page-size 500]
+
+首次运行全量拉取；之后使用 sync_token 只拉取有变化的日程，本地库位于 ~/.feishu_calendar_events.db
+(可通过环境变量 FEISHU_CALENDAR_DB 修改)。同步后可使用 python3 list.py --local 直接从本地查询。
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_client import FeishuCalendar, EVENT_PAGE_SIZE
+from event_store import EventStore
+
+def sync_events(full=False, page_size=EVENT_PAGE_SIZE):
+    """增量 (或全量) 同步日程"""
+    assistant = FeishuCalendar()
+    
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_client.py")
+        return False
+    
+    store = EventStore()
+    try:
+        started = time.time()
+        stats = assistant.sync_events(store, full=full, page_size=page_size)
+        mode = "全量" if stats["full"] else "增量"
+        print(f"✅ {mode}同步完成: 更新 {stats['upserted']} 条, 删除 {stats['deleted']} 条, "
+              f"{stats['pages']} 页, 耗时 {time.time() - started:.2f}s")
+        print(f"📦 本地共 {store.count(stats['calendar_id'])} 条日程 ({store.path})")
+        return True
+        
+    except Exception as e:
+        print(f"❌ 同步失败: {e}")
+        return False
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="同步飞书日程到本地日程库")
+    parser.add_argument("--full", action="store_true", help="忽略 sync_token，重新全量同步")
+    parser.add_argument("--page-size", type=int, default=EVENT_PAGE_SIZE, help=f"每页条数 (默认 {EVENT_PAGE_SIZE})")
+    
+    args = parser.parse_args()
+    success = sync_events(args.full, args.page_size)
+    sys.exit(0 if success else 1)
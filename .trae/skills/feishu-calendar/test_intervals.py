@@ -0,0 +1,154 @@
+"""
+intervals.py 以及冲突检测 (match_conflicts / bulk_create.reject_conflicts) 的单元测试 (不访问接口)：
+python3 -m pytest -q .trae/skills/feishu-calendar
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from intervals import BusyIndex, find_free_slots, find_overlaps, merge_intervals
+from feishu_client import event_interval, match_conflicts
+from bulk_create import reject_conflicts
+from event_format import format_event_time
+
+HOUR = 3600
+
+
+def pairs(overlaps):
+    return sorted((a, b) for a, b, _, _ in overlaps)
+
+
+def test_merge_touching_intervals():
+    assert merge_intervals([(30, 40), (10, 20), (20, 25), (50, 50)]) == [(10, 25), (30, 40)]
+
+
+def test_busy_index_touching_is_free():
+    busy = BusyIndex([(10, 20)])
+    assert busy.is_free(20, 30)
+    assert busy.is_free(0, 10)
+    assert busy.conflict(19, 21) == (10, 20)
+
+
+def test_busy_index_add_merges_neighbours():
+    busy = BusyIndex([(10, 20), (30, 40), (50, 60)])
+    busy.add(20, 30)
+    assert list(busy) == [(10, 40), (50, 60)]
+    busy.add(5, 70)
+    assert list(busy) == [(5, 70)]
+    busy.add(80, 80)
+    assert len(busy) == 1
+
+
+def test_find_overlaps_touching_is_not_overlap():
+    assert find_overlaps([(0, 10, "a"), (10, 20, "b")], [(20, 30, "x")]) == []
+
+
+def test_find_overlaps_chain_reports_each_pair():
+    # a-b、b-c 重叠，a 与 c 不重叠
+    proposed = [(0, 10, "a"), (5, 15, "b"), (12, 20, "c")]
+    overlaps = find_overlaps(proposed)
+    assert pairs(overlaps) == [("a", "b"), ("b", "c")]
+    assert sorted((a, b, s, e) for a, b, s, e in overlaps) == [("a", "b", 5, 10), ("b", "c", 12, 15)]
+
+
+def test_find_overlaps_existing_pairs_not_reported():
+    overlaps = find_overlaps([(5, 6, "p")], [(0, 10, "x"), (2, 8, "y")])
+    assert pairs(overlaps) == [("p", "x"), ("p", "y")]
+
+
+def test_find_overlaps_same_start_keeps_proposed_first():
+    assert pairs(find_overlaps([(0, 10, "p")], [(0, 5, "x")])) == [("p", "x")]
+
+
+def test_find_free_slots_skips_busy_and_touching():
+    day = int(datetime(2026, 11, 2).timestamp())  # 周一
+    busy = [(day + 9 * HOUR, day + 10 * HOUR), (day + 11 * HOUR, day + 17 * HOUR)]
+    slots = find_free_slots(busy, day, day + 86400, HOUR, count=3)
+    assert slots == [(day + 10 * HOUR, day + 11 * HOUR), (day + 17 * HOUR, day + 18 * HOUR)]
+
+
+def test_all_day_end_date_is_exclusive():
+    event = {"start_time": {"date": "2026-11-02"}, "end_time": {"date": "2026-11-03"}}
+    start, end = event_interval(event)
+    assert end - start == 86400
+    assert format_event_time(event) == "11月02日 全天"
+
+    multi_day = {"start_time": {"date": "2026-11-02"}, "end_time": {"date": "2026-11-05"}}
+    assert format_event_time(multi_day) == "11月02日 - 11月04日 全天"
+
+    # 结束日期不晚于开始日期时按一天计算
+    same_day = {"start_time": {"date": "2026-11-02"}, "end_time": {"date": "2026-11-02"}}
+    assert event_interval(same_day) == (start, end)
+    assert format_event_time(same_day) == "11月02日 全天"
+
+
+def test_all_day_conflicts():
+    day = int(datetime(2026, 11, 2).timestamp())
+    all_day = {"event_id": "ad", "summary": "出差", "start_time": {"date": "2026-11-02"},
+               "end_time": {"date": "2026-11-03"}}
+    same_day = {"summary": "会议", "start_time": day + 10 * HOUR, "end_time": day + 11 * HOUR}
+    next_day = {"summary": "早会", "start_time": day + 86400, "end_time": day + 86400 + HOUR}
+    conflicts = match_conflicts([same_day, next_day], [all_day])
+    assert [(c["index"], c["other"]["event_id"]) for c in conflicts] == [(0, "ad")]
+
+
+def test_match_conflicts_ignores_free_and_rescheduled():
+    proposed = [{"event_id": "e1", "summary": "改期", "start_time": 0, "end_time": HOUR}]
+    existing = [{"event_id": "e1", "start_time": {"timestamp": "0"}, "end_time": {"timestamp": str(HOUR)}},
+                {"event_id": "e2", "free_busy_status": "free",
+                 "start_time": {"timestamp": "0"}, "end_time": {"timestamp": str(HOUR)}},
+                {"event_id": "e3", "status": "cancelled",
+                 "start_time": {"timestamp": "0"}, "end_time": {"timestamp": str(HOUR)}}]
+    assert match_conflicts(proposed, existing) == []
+
+
+class FakeCalendar:
+    """只实现 reject_conflicts 用到的 check_conflicts"""
+
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+
+    def check_conflicts(self, events, calendar_ids=None, local=False):
+        return match_conflicts(events, self.existing)
+
+
+def rows_of(*spans):
+    return [(f"k{i}", i + 2, {"summary": name, "start_time": start, "end_time": end})
+            for i, (name, start, end) in enumerate(spans)]
+
+
+def kept(rows):
+    return [event["summary"] for _, _, event in rows]
+
+
+def test_reject_conflicts_chain_keeps_rows_after_rejected_one():
+    # A、B 重叠，B、C 重叠，A、C 不重叠：B 被跳过后不再占用时间，C 保留
+    rows = rows_of(("A", 0, 10), ("B", 5, 15), ("C", 12, 20))
+    assert kept(reject_conflicts(FakeCalendar(), "cal", rows)) == ["A", "C"]
+
+
+def test_reject_conflicts_chain_with_existing_event():
+    # A 与已有日程冲突被跳过，B 只与 A 冲突因而保留，C 与保留的 B 冲突被跳过
+    existing = [{"event_id": "x", "summary": "已有", "start_time": {"timestamp": "0"},
+                 "end_time": {"timestamp": "4"}}]
+    rows = rows_of(("A", 2, 8), ("B", 6, 12), ("C", 11, 14), ("D", 14, 20))
+    assert kept(reject_conflicts(FakeCalendar(existing), "cal", rows)) == ["B", "D"]
+
+
+def test_reject_conflicts_touching_rows_are_kept():
+    rows = rows_of(("A", 0, 10), ("B", 10, 20), ("C", 20, 30))
+    assert kept(reject_conflicts(FakeCalendar(), "cal", rows)) == ["A", "B", "C"]
+
+
+def test_reject_conflicts_created_rows_do_not_conflict_with_themselves(tmp_path):
+    # 上次运行已创建 A (在日历中已经存在)，重新运行时 A 不与自己冲突，与 A 重叠的 B 仍被跳过
+    manifest = tmp_path / "rows.manifest.jsonl"
+    manifest.write_text('{"key": "cal/k0", "row": 2, "status": "created", "event_id": "ev_a"}\n', encoding="utf-8")
+    existing = [{"event_id": "ev_a", "summary": "A", "start_time": {"timestamp": "0"},
+                 "end_time": {"timestamp": "10"}}]
+    rows = rows_of(("A", 0, 10), ("B", 5, 15), ("C", 15, 20))
+    assert kept(reject_conflicts(FakeCalendar(existing), "cal", rows, manifest_path=str(manifest))) == ["A", "C"]
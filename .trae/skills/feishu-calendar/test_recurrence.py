@@ -0,0 +1,185 @@
+"""
+recurrence.py 的单元测试 (不访问接口)：python3 -m pytest -q .trae/skills/feishu-calendar
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from recurrence import expand_events, iter_instances, parse_rrule, UnsupportedRule
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+SHANGHAI = "Asia/Shanghai"
+NEW_YORK = "America/New_York"
+
+
+def ts(text, tz=SHANGHAI):
+    """"2026-11-02 09:00" (指定时区) -> 秒级时间戳"""
+    return int(datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=ZoneInfo(tz)).timestamp())
+
+
+def local(timestamp, tz=SHANGHAI):
+    return datetime.fromtimestamp(timestamp, ZoneInfo(tz)).strftime("%Y-%m-%d %H:%M")
+
+
+def master(rule, start, end, tz=SHANGHAI, event_id="ev_0"):
+    return {"event_id": event_id, "summary": "例会", "recurrence": rule,
+            "start_time": {"timestamp": str(ts(start, tz)), "timezone": tz},
+            "end_time": {"timestamp": str(ts(end, tz)), "timezone": tz}}
+
+
+def starts(events, tz=SHANGHAI):
+    return [local(int(event["start_time"]["timestamp"]), tz) for event in events]
+
+
+@pytest.fixture
+def new_york_local_time():
+    """全天日程按本地时区计算：测试期间把本地时区切到有夏令时的 America/New_York"""
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = NEW_YORK
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+pytestmark = pytest.mark.skipif(ZoneInfo is None, reason="需要 zoneinfo (Python 3.9+)")
+
+
+def test_parse_rrule_prefix_and_ordinals():
+    rule = parse_rrule("RRULE:FREQ=MONTHLY;INTERVAL=2;BYDAY=-1FR,1MO;COUNT=4")
+    assert rule["freq"] == "MONTHLY"
+    assert rule["interval"] == 2
+    assert rule["count"] == 4
+    assert rule["byday"] == [(-1, 4), (1, 0)]
+
+
+@pytest.mark.parametrize("rule", ["FREQ=MONTHLY;BYSETPOS=-1;BYDAY=MO", "FREQ=HOURLY", "FREQ=YEARLY;BYDAY=1MO"])
+def test_parse_rrule_unsupported(rule):
+    with pytest.raises(UnsupportedRule):
+        parse_rrule(rule)
+
+
+def test_count_includes_dtstart():
+    events = expand_events([master("FREQ=DAILY;COUNT=3", "2026-11-02 09:00", "2026-11-02 10:00")])
+    assert starts(events) == ["2026-11-02 09:00", "2026-11-03 09:00", "2026-11-04 09:00"]
+    assert [event["event_id"] for event in events] == [f"ev_{ts(s)}" for s in starts(events)]
+    assert all(event["recurring_event_id"] == "ev_0" and "recurrence" not in event for event in events)
+
+
+def test_count_counts_instances_before_window():
+    # COUNT 从第一次开始计数，窗口之前的实例也占用名额
+    events = expand_events([master("FREQ=DAILY;COUNT=5", "2026-11-02 09:00", "2026-11-02 10:00")],
+                           ts("2026-11-05 00:00"), ts("2026-12-01 00:00"))
+    assert starts(events) == ["2026-11-05 09:00", "2026-11-06 09:00"]
+
+
+def test_until_utc_is_inclusive():
+    # 2026-11-16 09:00 (+08:00) 正好是 UNTIL 时刻，包含在内
+    events = expand_events([master("FREQ=WEEKLY;UNTIL=20261116T010000Z", "2026-11-02 09:00", "2026-11-02 10:00")])
+    assert starts(events) == ["2026-11-02 09:00", "2026-11-09 09:00", "2026-11-16 09:00"]
+
+
+def test_until_date_includes_whole_day():
+    events = expand_events([master("FREQ=DAILY;UNTIL=20261104", "2026-11-02 18:00", "2026-11-02 19:00")])
+    assert starts(events) == ["2026-11-02 18:00", "2026-11-03 18:00", "2026-11-04 18:00"]
+
+
+def test_byday_last_friday():
+    events = expand_events([master("FREQ=MONTHLY;BYDAY=-1FR;COUNT=4", "2026-10-30 15:00", "2026-10-30 16:00")])
+    assert starts(events) == ["2026-10-30 15:00", "2026-11-27 15:00", "2026-12-25 15:00", "2027-01-29 15:00"]
+
+
+def test_byday_first_monday_skips_to_window():
+    # 没有 COUNT 时直接从窗口所在的月份开始
+    events = expand_events([master("FREQ=MONTHLY;BYDAY=1MO", "2020-01-06 10:00", "2020-01-06 11:00")],
+                           ts("2026-11-01 00:00"), ts("2027-01-01 00:00"))
+    assert starts(events) == ["2026-11-02 10:00", "2026-12-07 10:00"]
+
+
+def test_weekly_byday_interval():
+    events = expand_events([master("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=5",
+                                   "2026-11-02 09:00", "2026-11-02 09:30")])
+    assert starts(events) == ["2026-11-02 09:00", "2026-11-04 09:00", "2026-11-16 09:00",
+                              "2026-11-18 09:00", "2026-11-30 09:00"]
+
+
+def test_monthly_31st_skips_short_months():
+    events = expand_events([master("FREQ=MONTHLY;COUNT=3", "2027-01-31 09:00", "2027-01-31 10:00")])
+    assert starts(events) == ["2027-01-31 09:00", "2027-03-31 09:00", "2027-05-31 09:00"]
+
+
+def test_cancelled_and_moved_instances_act_as_exdate():
+    # 飞书用例外实例表示 EXDATE / 单次修改：取消的一次不返回，改期的一次代替原来的生成结果
+    rule = master("FREQ=DAILY;COUNT=4", "2026-11-02 09:00", "2026-11-02 10:00")
+    cancelled = {"event_id": f"ev_{ts('2026-11-03 09:00')}", "recurring_event_id": "ev_0", "status": "cancelled",
+                 "start_time": {"timestamp": str(ts("2026-11-03 09:00"))},
+                 "end_time": {"timestamp": str(ts("2026-11-03 10:00"))}}
+    moved = {"event_id": "ev_moved", "recurring_event_id": "ev_0", "original_time": str(ts("2026-11-04 09:00")),
+             "start_time": {"timestamp": str(ts("2026-11-04 14:00"))},
+             "end_time": {"timestamp": str(ts("2026-11-04 15:00"))}}
+    events = expand_events([rule, cancelled, moved])
+    assert starts(events) == ["2026-11-02 09:00", "2026-11-04 14:00", "2026-11-05 09:00"]
+    assert events[1]["event_id"] == "ev_moved"
+
+
+def test_dst_keeps_local_time():
+    # 2026-11-01 纽约夏令时结束：实例保持当地 09:00，跨越切换的间隔为 7 天零 1 小时
+    events = expand_events([master("FREQ=WEEKLY;COUNT=3", "2026-10-25 09:00", "2026-10-25 10:00", NEW_YORK)])
+    assert starts(events, NEW_YORK) == ["2026-10-25 09:00", "2026-11-01 09:00", "2026-11-08 09:00"]
+    begins = [int(event["start_time"]["timestamp"]) for event in events]
+    assert begins[1] - begins[0] == 7 * 86400 + 3600
+    assert begins[2] - begins[1] == 7 * 86400
+    assert all(int(e["end_time"]["timestamp"]) - int(e["start_time"]["timestamp"]) == 3600 for e in events)
+
+
+def test_dst_spring_forward():
+    # 2027-03-14 纽约进入夏令时
+    begins = list(iter_instances(ts("2027-03-13 09:00", NEW_YORK), ts("2027-03-13 10:00", NEW_YORK),
+                                 parse_rrule("FREQ=DAILY;COUNT=2"), ZoneInfo(NEW_YORK)))
+    assert [local(begin, NEW_YORK) for begin, _ in begins] == ["2027-03-13 09:00", "2027-03-14 09:00"]
+    assert begins[1][0] - begins[0][0] == 86400 - 3600
+
+
+def test_all_day_instances_use_exclusive_end_date(new_york_local_time):
+    # 全天日程结束日期不含 (与飞书一致)，跨夏令时切换的当天也是整一天
+    event = {"event_id": "ad_0", "summary": "值班", "recurrence": "FREQ=DAILY;COUNT=3",
+             "start_time": {"date": "2026-10-31"}, "end_time": {"date": "2026-11-01"}}
+    events = expand_events([event])
+    assert [(e["start_time"]["date"], e["end_time"]["date"]) for e in events] == [
+        ("2026-10-31", "2026-11-01"), ("2026-11-01", "2026-11-02"), ("2026-11-02", "2026-11-03")]
+    assert all("timestamp" not in e["start_time"] for e in events)
+
+
+def test_all_day_window_overlap(new_york_local_time):
+    # 窗口从某天 0 点开始时，前一天的全天实例 (结束于当天 0 点) 不算在内
+    event = {"event_id": "ad_0", "summary": "值班", "recurrence": "FREQ=WEEKLY",
+             "start_time": {"date": "2026-11-02"}, "end_time": {"date": "2026-11-03"}}
+    window_start = int(datetime(2026, 11, 3).timestamp())
+    events = expand_events([event], window_start, window_start + 14 * 86400)
+    assert [e["start_time"]["date"] for e in events] == ["2026-11-09", "2026-11-16"]
+
+
+def test_unsupported_rule_returns_master():
+    event = master("FREQ=MONTHLY;BYSETPOS=-1;BYDAY=MO,TU", "2026-11-02 09:00", "2026-11-02 10:00")
+    assert expand_events([event]) == [event]
+
+
+def test_unbounded_rule_is_capped():
+    events = list(iter_instances(ts("2026-11-02 09:00"), ts("2026-11-02 10:00"), parse_rrule("FREQ=DAILY"),
+                                 ZoneInfo(SHANGHAI)))
+    assert len(events) == 5000
+    assert events[-1][0] - events[0][0] == timedelta(days=4999).total_seconds()
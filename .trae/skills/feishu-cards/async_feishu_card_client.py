@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+
+from feishu_card_client import FeishuCard
+from async_transport import get_async_transport, get_tenant_access_token_async, close_async_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+
+
+@instrument_client
+class AsyncFeishuCard(FeishuCard):
+    """
+    FeishuCard 的 asyncio 版本，方法与同步版本一致，需要 await 调用
+    配置读取与 initialize() 复用同步版本
+    """
+
+    async def _aget_tenant_access_token(self):
+        if self.tenant_access_token and time.time() < self.token_expire_time:
+            return self.tenant_access_token
+
+        token, expire_time = await get_tenant_access_token_async(self.app_id, self.app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
+        return self.tenant_access_token
+
+    async def send_card(self, title, content, receive_id=None, receive_id_type="open_id", card_config=None):
+        """
+        发送富文本卡片消息 (参数同 FeishuCard.send_card)
+        """
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        target_id = receive_id or self.open_id
+        if not target_id:
+            print("Target ID (receive_id) is missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+
+        card_content = {
+            "schema": "2.0",
+            "header": {
+                "title": {
+                    "content": title,
+                    "tag": "plain_text"
+                },
+                "template": "blue"
+            },
+            "body": {
+                "elements": [
+                    {
+                        "tag": "markdown",
+                        "content": content
+                    }
+                ]
+            }
+        }
+
+        if card_config:
+            card_content["config"] = card_config
+
+        url = f"{FEISHU_API_BASE}/im/v1/messages?receive_id_type={receive_id_type}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+        payload = {
+            "receive_id": target_id,
+            "msg_type": "interactive",
+            "content": json.dumps(card_content)
+        }
+
+        response = await get_async_transport().post(url, headers=headers, json=payload)
+        return response.json()
+
+
+if __name__ == "__main__":
+    async def main():
+        client = AsyncFeishuCard()
+        if not client.app_id:
+            print("Feishu Card is not configured. Please run: python3 feishu_card_client.py")
+            return
+        print(await client.send_card("Async Card", "Hello from **AsyncFeishuCard**"))
+        await close_async_transport()
+
+    asyncio.run(main())
@@ -1,13 +1,24 @@
 import json
 import os
+import sys
 import time
-import requests
+
+# 共享运行时 (跨进程 token 缓存、连接池等) 位于 .trae/skills/skill-common
+COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "skill-common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+from token_store import get_token_store
+from http_transport import get_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+from identity_resolver import get_identity_resolver, classify
 
 CONFIG_FILE = os.path.expanduser("~/.feishu_card_config.json")
 DRIVE_CONFIG_FILE = os.path.expanduser("~/.feishu_drive_config.json")
 CALENDAR_CONFIG_FILE = os.path.expanduser("~/.feishu_calendar_config.json")
 TASK_CONFIG_FILE = os.path.expanduser("~/.feishu_task_config.json")
 
+@instrument_client
 class FeishuCard:
     def __init__(self):
         self.config = self._load_config()
@@ -68,7 +79,7 @@ class FeishuCard:
             }
             # 尝试获取 open_id
             try:
-                open_id = self._get_user_id_by_mobile(token, phone)
+                open_id = get_identity_resolver().resolve_one(app_id, token, phone)
                 if open_id:
                     config["open_id"] = open_id
             except:
@@ -91,36 +102,18 @@ class FeishuCard:
         if not app_id or not app_secret:
             raise ValueError("App ID and App Secret are required.")
 
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-        headers = {"Content-Type": "application/json; charset=utf-8"}
-        payload = {
-            "app_id": app_id,
-            "app_secret": app_secret
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            raise Exception(f"Get token failed: {resp_json}")
-            
-        self.tenant_access_token = resp_json.get("tenant_access_token")
-        self.token_expire_time = time.time() + resp_json.get("expire", 7200) - 60
+        # 同一 app_id 的 token 在本机所有 skill 进程间共享，过期前只刷新一次
+        token, expire_time = get_token_store().get_token(app_id, app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
         return self.tenant_access_token
 
-    def _get_user_id_by_mobile(self, token, mobile):
-        url = "https://open.feishu.cn/open-apis/contact/v3/users/batch_get_id?user_id_type=open_id"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-        payload = {"mobiles": [mobile]}
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        if resp_json.get("code") == 0:
-            user_list = resp_json.get("data", {}).get("user_list", [])
-            if user_list:
-                return user_list[0].get("user_id")
-        return None
+    def resolve_user_ids(self, values):
+        """
+        open_id / 手机号 / 邮箱 -> open_id 列表 (批量查询，结果跨进程缓存)
+        :raise IdentityNotFoundError: 有手机号 / 邮箱找不到时
+        """
+        return get_identity_resolver().resolve_open_ids(self.app_id, self._get_tenant_access_token, values)
 
     def send_card(self, title, content, receive_id=None, receive_id_type="open_id", card_config=None):
         """
@@ -128,7 +121,8 @@ class FeishuCard:
         :param title: 卡片标题
         :param content: Markdown 内容
         :param receive_id: 接收者 ID (默认使用配置中的 open_id)
-        :param receive_id_type: 接收者 ID 类型 (open_id, user_id, union_id, email, chat_id)
+        :param receive_id_type: 接收者 ID 类型 (open_id, user_id, union_id, email, chat_id, mobile)
+                                为 open_id / mobile 时，手机号与邮箱先解析为 open_id
         :param card_config: 卡片配置 (字典)
         """
         if not self.app_id:
@@ -140,6 +134,11 @@ class FeishuCard:
             print("Target ID (receive_id) is missing.")
             return
 
+        # 消息接口不支持手机号，手机号 / 邮箱统一换成 open_id (结果在本机缓存)
+        if receive_id_type == "mobile" or (receive_id_type == "open_id" and classify(target_id)[0] != "open_id"):
+            target_id = self.resolve_user_ids([target_id])[0]
+            receive_id_type = "open_id"
+
         token = self._get_tenant_access_token()
         
         # 构造 Card JSON V2
@@ -165,7 +164,7 @@ class FeishuCard:
         if card_config:
             card_content["config"] = card_config
 
-        url = f"https://open.feishu.cn/open-apis/im/v1/messages?receive_id_type={receive_id_type}"
+        url = f"{FEISHU_API_BASE}/im/v1/messages?receive_id_type={receive_id_type}"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -178,7 +177,7 @@ class FeishuCard:
             "content": json.dumps(card_content) # content 必须是 JSON 字符串
         }
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_transport().post(url, headers=headers, json=payload)
         return response.json()
 
 if __name__ == "__main__":
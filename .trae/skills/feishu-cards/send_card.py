@@ -24,7 +24,11 @@ def send_message(title, content, receive_id, receive_id_type, config=None):
         content = content.replace("\\n", "\n")
 
     # 发送卡片
-    result = client.send_card(title, content, receive_id, receive_id_type, config)
+    try:
+        result = client.send_card(title, content, receive_id, receive_id_type, config)
+    except ValueError as e:
+        print(f"❌ 发送失败: {e}")
+        return
     
     if result and result.get("code") == 0:
         print(f"✅ 卡片发送成功")
@@ -36,8 +40,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="发送飞书富文本卡片消息")
     parser.add_argument("title", help="卡片标题")
     parser.add_argument("content", help="卡片内容 (Markdown)")
-    parser.add_argument("--receive_id", help="接收者 ID (默认使用配置中的 OpenID)")
-    parser.add_argument("--receive_id_type", help="接收者 ID 类型 (open_id, user_id, union_id, email, chat_id)", default="open_id")
+    parser.add_argument("--receive_id", help="接收者 ID、手机号或邮箱 (默认使用配置中的 OpenID)")
+    parser.add_argument("--receive_id_type", help="接收者 ID 类型 (open_id, user_id, union_id, email, chat_id, mobile)", default="open_id")
     parser.add_argument("--wide_screen_mode", help="开启宽屏模式", action="store_true")
     
     args = parser.parse_args()
@@ -0,0 +1,246 @@
+import asyncio
+import os
+import time
+
+from feishu_drive_client import FeishuDrive
+from async_transport import get_async_transport, get_tenant_access_token_async, close_async_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+
+# 各类型资源的创建接口 (与 FeishuDrive._create_node 一致)
+CREATE_NODE_ENDPOINTS = {
+    "docx": (f"{FEISHU_API_BASE}/docx/v1/documents", "title"),
+    "sheet": (f"{FEISHU_API_BASE}/sheets/v3/spreadsheets", "title"),
+    "bitable": (f"{FEISHU_API_BASE}/bitable/v1/apps", "name"),
+    "folder": (f"{FEISHU_API_BASE}/drive/v1/files/create_folder", "name"),
+}
+
+
+@instrument_client
+class AsyncFeishuDrive(FeishuDrive):
+    """
+    FeishuDrive 的 asyncio 版本，方法与同步版本一致，需要 await 调用
+    配置读取与 initialize() 复用同步版本
+    """
+
+    async def _aget_tenant_access_token(self):
+        if self.tenant_access_token and time.time() < self.token_expire_time:
+            return self.tenant_access_token
+
+        token, expire_time = await get_tenant_access_token_async(self.app_id, self.app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
+        return self.tenant_access_token
+
+    def _json_headers(self, token):
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+
+    # --- Drive API ---
+
+    async def create_folder(self, name, parent_token=""):
+        """创建文件夹"""
+        return await self._create_node(name, "folder", parent_token)
+
+    async def create_doc(self, name, parent_token=""):
+        """创建文档 (docx)"""
+        return await self._create_node(name, "docx", parent_token)
+
+    async def create_sheet(self, name, parent_token=""):
+        """创建电子表格"""
+        return await self._create_node(name, "sheet", parent_token)
+
+    async def create_bitable(self, name, parent_token=""):
+        """创建多维表格"""
+        return await self._create_node(name, "bitable", parent_token)
+
+    async def _create_node(self, name, type, parent_token=""):
+        """
+        通用创建节点
+        type: folder, docx, sheet, bitable
+        """
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+
+        if type in CREATE_NODE_ENDPOINTS:
+            url, name_field = CREATE_NODE_ENDPOINTS[type]
+            payload = {
+                name_field: name,
+                "folder_token": parent_token if parent_token else ""
+            }
+        else:
+            url = f"{FEISHU_API_BASE}/drive/v1/files"
+            payload = {
+                "name": name,
+                "folder_token": parent_token if parent_token else "",
+                "type": type
+            }
+
+        response = await get_async_transport().post(url, headers=self._json_headers(token), json=payload)
+        try:
+            return response.json()
+        except Exception as e:
+            print(f"Error decoding JSON: {e}")
+            print(f"Response status: {response.status_code}")
+            print(f"Response text: {response.text}")
+            return {"code": -1, "msg": f"JSON Decode Error: {str(e)}", "raw": response.text}
+
+    async def upload_file(self, file_path, parent_token=""):
+        """上传文件"""
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        if not os.path.exists(file_path):
+            print(f"File not found: {file_path}")
+            return
+
+        file_size = os.path.getsize(file_path)
+        file_name = os.path.basename(file_path)
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/drive/v1/files/upload_all"
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+        }
+
+        data = {
+            "file_name": file_name,
+            "parent_type": "explorer",
+            "parent_node": parent_token if parent_token else "",
+            "size": str(file_size)
+        }
+
+        with open(file_path, "rb") as f:
+            response = await get_async_transport().post(url, headers=headers, data=data, files={"file": (file_name, f)})
+        return response.json()
+
+    async def list_files(self, folder_token=""):
+        """列出文件"""
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/drive/v1/files"
+        headers = {
+            "Authorization": f"Bearer {token}",
+        }
+        params = {
+            "folder_token": folder_token if folder_token else ""
+        }
+        response = await get_async_transport().get(url, headers=headers, params=params)
+        return response.json()
+
+    async def delete_file(self, file_token, type="file"):
+        """删除文件"""
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/drive/v1/files/{file_token}"
+        params = {
+            "type": type
+        }
+        response = await get_async_transport().delete(url, headers=self._json_headers(token), params=params)
+        return response.json()
+
+    async def rename_file(self, file_token, new_name, type="file"):
+        """重命名文件"""
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/drive/v1/files/{file_token}"
+        payload = {
+            "name": new_name,
+            "type": type
+        }
+        response = await get_async_transport().patch(url, headers=self._json_headers(token), json=payload)
+        return response.json()
+
+    async def move_file(self, file_token, folder_token, type="file"):
+        """移动文件"""
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/drive/v1/files/{file_token}/move"
+        payload = {
+            "type": type,
+            "folder_token": folder_token
+        }
+        response = await get_async_transport().post(url, headers=self._json_headers(token), json=payload)
+        return response.json()
+
+    async def add_docx_content(self, document_id, content):
+        """
+        向 Docx 文档末尾追加文本内容
+        :param document_id: 文档 Token
+        :param content: 文本内容
+        """
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/docx/v1/documents/{document_id}/blocks/{document_id}/children"
+        payload = {
+            "children": [
+                {
+                    "block_type": 2,
+                    "text": {
+                        "elements": [
+                            {
+                                "text_run": {
+                                    "content": content
+                                }
+                            }
+                        ]
+                    }
+                }
+            ],
+            "index": -1
+        }
+        response = await get_async_transport().post(url, headers=self._json_headers(token), json=payload)
+        return response.json()
+
+    async def add_member_permission(self, token, member_id, member_type="openid", role="full_access", type="file"):
+        """
+        增加协作者权限 (参数同 FeishuDrive.add_member_permission)
+        """
+        if not self.app_id:
+            print("Configuration missing.")
+            return
+
+        access_token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/drive/v1/permissions/{token}/members"
+        payload = {
+            "member_type": member_type,
+            "member_id": member_id,
+            "perm": role
+        }
+        response = await get_async_transport().post(url, headers=self._json_headers(access_token), json=payload,
+                                                    params={"type": type})
+        return response.json()
+
+
+if __name__ == "__main__":
+    async def main():
+        client = AsyncFeishuDrive()
+        if not client.app_id:
+            print("Feishu Drive is not configured. Please run: python3 feishu_drive_client.py")
+            return
+        print(await client.list_files())
+        await close_async_transport()
+
+    asyncio.run(main())
@@ -1,12 +1,23 @@
 import json
 import os
+import sys
 import time
-import requests
 import mimetypes
 
+# 共享运行时 (跨进程 token 缓存、连接池等) 位于 .trae/skills/skill-common
+COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "skill-common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+from token_store import get_token_store
+from http_transport import get_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+from identity_resolver import get_identity_resolver
+
 CONFIG_FILE = os.path.expanduser("~/.feishu_drive_config.json")
 CALENDAR_CONFIG_FILE = os.path.expanduser("~/.feishu_calendar_config.json")
 
+@instrument_client
 class FeishuDrive:
     def __init__(self):
         self.config = self._load_config()
@@ -70,7 +81,7 @@ class FeishuDrive:
             }
             # 尝试获取 open_id
             try:
-                open_id = self._get_user_id_by_mobile(token, phone)
+                open_id = get_identity_resolver().resolve_one(app_id, token, phone)
                 if open_id:
                     config["open_id"] = open_id
             except:
@@ -93,36 +104,18 @@ class FeishuDrive:
         if not app_id or not app_secret:
             raise ValueError("App ID and App Secret are required.")
 
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-        headers = {"Content-Type": "application/json; charset=utf-8"}
-        payload = {
-            "app_id": app_id,
-            "app_secret": app_secret
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            raise Exception(f"Get token failed: {resp_json}")
-            
-        self.tenant_access_token = resp_json.get("tenant_access_token")
-        self.token_expire_time = time.time() + resp_json.get("expire", 7200) - 60
+        # 同一 app_id 的 token 在本机所有 skill 进程间共享，过期前只刷新一次
+        token, expire_time = get_token_store().get_token(app_id, app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
         return self.tenant_access_token
 
-    def _get_user_id_by_mobile(self, token, mobile):
-        url = "https://open.feishu.cn/open-apis/contact/v3/users/batch_get_id?user_id_type=open_id"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-        payload = {"mobiles": [mobile]}
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        if resp_json.get("code") == 0:
-            user_list = resp_json.get("data", {}).get("user_list", [])
-            if user_list:
-                return user_list[0].get("user_id")
-        return None
+    def resolve_user_ids(self, values):
+        """
+        open_id / 手机号 / 邮箱 -> open_id 列表 (批量查询，结果跨进程缓存)
+        :raise IdentityNotFoundError: 有手机号 / 邮箱找不到时
+        """
+        return get_identity_resolver().resolve_open_ids(self.app_id, self._get_tenant_access_token, values)
 
     # --- Drive API ---
 
@@ -175,7 +168,7 @@ class FeishuDrive:
         # 
         # 另一种可能性：URL 末尾有斜杠问题？
         
-        url = "https://open.feishu.cn/open-apis/drive/v1/files/create_folder" if type == "folder" else "https://open.feishu.cn/open-apis/drive/v1/files"
+        url = f"{FEISHU_API_BASE}/drive/v1/files/create_folder" if type == "folder" else f"{FEISHU_API_BASE}/drive/v1/files"
         
         # 尝试去掉 create_folder 的特殊判断，因为 create_folder 是专属接口
         # 但 create doc 用的 url 返回 404，说明 https://open.feishu.cn/open-apis/drive/v1/files 这个 endpoint 不存在或方法不对?
@@ -193,34 +186,34 @@ class FeishuDrive:
         
         # 让我们先试试 Docx 的专用接口
         if type == "docx":
-            url = "https://open.feishu.cn/open-apis/docx/v1/documents"
+            url = f"{FEISHU_API_BASE}/docx/v1/documents"
             payload = {
                 "folder_token": parent_token if parent_token else "",
                 "title": name # Docx 使用 title 而不是 name
             }
         elif type == "sheet":
              # Sheets V3
-             url = "https://open.feishu.cn/open-apis/sheets/v3/spreadsheets"
+             url = f"{FEISHU_API_BASE}/sheets/v3/spreadsheets"
              payload = {
                  "title": name,
                  "folder_token": parent_token if parent_token else ""
              }
         elif type == "bitable":
              # Bitable V1
-             url = "https://open.feishu.cn/open-apis/bitable/v1/apps"
+             url = f"{FEISHU_API_BASE}/bitable/v1/apps"
              payload = {
                  "name": name,
                  "folder_token": parent_token if parent_token else ""
              }
         elif type == "folder":
-             url = "https://open.feishu.cn/open-apis/drive/v1/files/create_folder"
+             url = f"{FEISHU_API_BASE}/drive/v1/files/create_folder"
              payload = {
                 "name": name,
                 "folder_token": parent_token if parent_token else ""
             }
         else:
              # Fallback to drive v1 files (if it works for other types)
-             url = "https://open.feishu.cn/open-apis/drive/v1/files"
+             url = f"{FEISHU_API_BASE}/drive/v1/files"
              payload = {
                 "name": name,
                 "folder_token": parent_token if parent_token else "",
@@ -235,7 +228,7 @@ class FeishuDrive:
         # Log request for debugging
         # print(f"DEBUG: POST {url} payload={payload}")
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_transport().post(url, headers=headers, json=payload)
         try:
             return response.json()
         except Exception as e:
@@ -258,7 +251,7 @@ class FeishuDrive:
         file_name = os.path.basename(file_path)
         
         token = self._get_tenant_access_token()
-        url = "https://open.feishu.cn/open-apis/drive/v1/files/upload_all"
+        url = f"{FEISHU_API_BASE}/drive/v1/files/upload_all"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -272,11 +265,11 @@ class FeishuDrive:
             "size": str(file_size)
         }
         
-        files = {
-            "file": open(file_path, "rb")
-        }
-        
-        response = requests.post(url, headers=headers, data=data, files=files)
+        with open(file_path, "rb") as f:
+            files = {
+                "file": f
+            }
+            response = get_transport().post(url, headers=headers, data=data, files=files)
         return response.json()
 
     def list_files(self, folder_token=""):
@@ -286,7 +279,7 @@ class FeishuDrive:
             return
 
         token = self._get_tenant_access_token()
-        url = "https://open.feishu.cn/open-apis/drive/v1/files"
+        url = f"{FEISHU_API_BASE}/drive/v1/files"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -296,7 +289,7 @@ class FeishuDrive:
             "folder_token": folder_token if folder_token else ""
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = get_transport().get(url, headers=headers, params=params)
         return response.json()
 
     def delete_file(self, file_token, type="file"):
@@ -306,7 +299,7 @@ class FeishuDrive:
             return
 
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/drive/v1/files/{file_token}"
+        url = f"{FEISHU_API_BASE}/drive/v1/files/{file_token}"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -317,7 +310,7 @@ class FeishuDrive:
             "type": type # file, docx, sheet, folder 等
         }
         
-        response = requests.delete(url, headers=headers, params=params)
+        response = get_transport().delete(url, headers=headers, params=params)
         return response.json()
 
     def rename_file(self, file_token, new_name, type="file"):
@@ -331,7 +324,7 @@ class FeishuDrive:
         # PATCH /open-apis/drive/v1/files/:file_token
         
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/drive/v1/files/{file_token}"
+        url = f"{FEISHU_API_BASE}/drive/v1/files/{file_token}"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -347,7 +340,7 @@ class FeishuDrive:
             "type": type
         }
         
-        response = requests.patch(url, headers=headers, json=payload)
+        response = get_transport().patch(url, headers=headers, json=payload)
         return response.json()
 
     def move_file(self, file_token, folder_token, type="file"):
@@ -358,7 +351,7 @@ class FeishuDrive:
             
         # POST /open-apis/drive/v1/files/:file_token/move
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/drive/v1/files/{file_token}/move"
+        url = f"{FEISHU_API_BASE}/drive/v1/files/{file_token}/move"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -370,7 +363,7 @@ class FeishuDrive:
             "folder_token": folder_token
         }
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_transport().post(url, headers=headers, json=payload)
         return response.json()
 
     def add_docx_content(self, document_id, content):
@@ -390,7 +383,7 @@ class FeishuDrive:
         # POST /open-apis/docx/v1/documents/:document_id/blocks/:block_id/children
         # 如果 block_id 使用 document_id，通常表示添加到文档末尾
         
-        url = f"https://open.feishu.cn/open-apis/docx/v1/documents/{document_id}/blocks/{document_id}/children"
+        url = f"{FEISHU_API_BASE}/docx/v1/documents/{document_id}/blocks/{document_id}/children"
         
         headers = {
             "Authorization": f"Bearer {token}",
@@ -417,7 +410,7 @@ class FeishuDrive:
             "index": -1 # -1 表示添加到末尾
         }
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_transport().post(url, headers=headers, json=payload)
         return response.json()
 
     def add_member_permission(self, token, member_id, member_type="openid", role="full_access", type="file"):
@@ -438,7 +431,7 @@ class FeishuDrive:
         # Drive V1 Permission API: POST /open-apis/drive/v1/permissions/:token/members
         # 注意：不同类型的资源可能需要不同的 type 参数，但 V1 Permission 接口通常是通用的，通过 type 参数指定资源类型
         
-        url = f"https://open.feishu.cn/open-apis/drive/v1/permissions/{token}/members"
+        url = f"{FEISHU_API_BASE}/drive/v1/permissions/{token}/members"
         
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -451,7 +444,7 @@ class FeishuDrive:
             "perm": role
         }
         
-        response = requests.post(url, headers=headers, json=payload, params={"type": type})
+        response = get_transport().post(url, headers=headers, json=payload, params={"type": type})
         return response.json()
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+import asyncio
+import time
+
+from feishu_task_client import FeishuTask, TASK_PAGE_SIZE, BULK_WORKERS
+from async_transport import get_async_transport, get_tenant_access_token_async, close_async_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+
+
+@instrument_client
+class AsyncFeishuTask(FeishuTask):
+    """
+    FeishuTask 的 asyncio 版本，方法与同步版本一致，需要 await 调用
+    配置读取与 initialize() 复用同步版本
+    """
+
+    async def _aget_tenant_access_token(self):
+        if self.tenant_access_token and time.time() < self.token_expire_time:
+            return self.tenant_access_token
+
+        token, expire_time = await get_tenant_access_token_async(self.app_id, self.app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
+        return self.tenant_access_token
+
+    async def create_task(self, summary, description=None, due_timestamp=None, members=None, client_token=None):
+        """
+        创建任务 (参数同 FeishuTask.create_task)
+        """
+        if not self.app_id:
+            print("Configuration missing. Please run initialize() first.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/task/v2/tasks"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+
+        payload = {
+            "summary": summary
+        }
+
+        if description:
+            payload["description"] = description
+
+        if due_timestamp:
+            payload["due"] = {
+                "timestamp": str(due_timestamp),
+                "is_all_day": False
+            }
+
+        # 如果没有指定成员，默认添加自己为负责人
+        if not members:
+            members = [{"id": self.open_id, "type": "user", "role": "assignee"}]
+
+        if members:
+            payload["members"] = members
+
+        if client_token:
+            payload["client_token"] = client_token
+
+        response = await get_async_transport().post(url, headers=headers, json=payload, idempotent=bool(client_token))
+        return self._index_result(response.json())
+
+    async def bulk_create_tasks(self, *args, **kwargs):
+        """
+        批量创建任务 (参数同 FeishuTask.bulk_create_tasks)，在线程池中使用同步客户端执行
+        """
+        return await asyncio.to_thread(FeishuTask().bulk_create_tasks, *args, **kwargs)
+
+    async def sync_tasks(self, *args, **kwargs):
+        """
+        同步本地任务库 (参数同 FeishuTask.sync_tasks)，在线程池中使用同步客户端执行
+        """
+        return await asyncio.to_thread(FeishuTask().sync_tasks, *args, **kwargs)
+
+    async def query_tasks(self, *args, **kwargs):
+        """
+        查询本地任务库 (参数同 FeishuTask.query_tasks)
+        """
+        return await asyncio.to_thread(FeishuTask().query_tasks, *args, **kwargs)
+
+    async def list_tasks(self, page_size=20, page_token=None, task_list_type=None):
+        """
+        列出任务 (参数同 FeishuTask.list_tasks)
+        """
+        if not self.app_id:
+            print("Configuration missing. Please run initialize() first.")
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/task/v2/tasks"
+        headers = {
+            "Authorization": f"Bearer {token}",
+        }
+        params = {
+            "page_size": page_size,
+            "user_id_type": "open_id"
+        }
+        if page_token:
+            params["page_token"] = page_token
+
+        if task_list_type:
+            params["type"] = task_list_type
+
+        response = await get_async_transport().get(url, headers=headers, params=params)
+        return response.json()
+
+    async def iter_tasks(self, type=None, page_size=TASK_PAGE_SIZE, prefetch=True):
+        """
+        逐条返回任务的异步生成器 (参数同 FeishuTask.iter_tasks)，用法: async for task in client.iter_tasks(...)
+        """
+        if not self.app_id:
+            raise ValueError("Configuration missing. Please run initialize() first.")
+
+        def fetch(page_token=None):
+            coro = self.list_tasks(page_size, page_token, type)
+            return asyncio.ensure_future(coro) if prefetch else coro
+
+        pending = fetch()
+        try:
+            while pending is not None:
+                resp_json = await pending
+                if not resp_json or resp_json.get("code") != 0:
+                    raise Exception(f"List tasks failed: {resp_json}")
+                data = resp_json.get("data", {})
+                page_token = data.get("page_token")
+                pending = fetch(page_token) if data.get("has_more") and page_token else None
+                for task in data.get("items") or []:
+                    yield task
+        finally:
+            if pending is not None:
+                if prefetch:
+                    pending.cancel()
+                else:
+                    pending.close()
+
+    async def get_task(self, task_guid):
+        """
+        获取任务详情
+        """
+        if not self.app_id:
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+        }
+        response = await get_async_transport().get(url, headers=headers)
+        return response.json()
+
+    async def complete_task(self, task_guid):
+        """
+        完成任务
+        """
+        if not self.app_id:
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+
+        current_ts = int(time.time() * 1000)
+        payload = {
+            "task": {
+                "completed_at": str(current_ts)
+            },
+            "update_fields": ["completed_at"]
+        }
+
+        response = await get_async_transport().patch(url, headers=headers, json=payload)
+        return self._index_result(response.json())
+
+    async def update_task(self, task_guid, summary=None, description=None, due_timestamp=None, skip_unchanged=False):
+        """
+        更新任务信息 (skip_unchanged 同 FeishuTask.update_task)
+        """
+        if not self.app_id:
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+
+        task_data = {}
+        update_fields = []
+
+        if summary:
+            task_data["summary"] = summary
+            update_fields.append("summary")
+
+        if description:
+            task_data["description"] = description
+            update_fields.append("description")
+
+        if due_timestamp:
+            task_data["due"] = {
+                "timestamp": str(due_timestamp),
+                "is_all_day": False
+            }
+            update_fields.append("due")
+
+        if not update_fields:
+            return None
+
+        if skip_unchanged:
+            task_data, unchanged = self._drop_unchanged(task_guid, task_data)
+            if unchanged is not None:
+                return unchanged
+            update_fields = list(task_data)
+
+        payload = {
+            "task": task_data,
+            "update_fields": update_fields
+        }
+
+        response = await get_async_transport().patch(url, headers=headers, json=payload)
+        return self._index_result(response.json())
+
+    async def delete_task(self, task_guid):
+        """
+        删除任务
+        """
+        if not self.app_id:
+            return
+
+        token = await self._aget_tenant_access_token()
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+        }
+        response = await get_async_transport().delete(url, headers=headers)
+        resp_json = response.json()
+        if resp_json.get("code") == 0:
+            self._index_tasks(deleted=[task_guid])
+        return resp_json
+
+    async def complete_tasks(self, tasks, workers=BULK_WORKERS):
+        """
+        批量完成任务 (参数同 FeishuTask.complete_tasks)
+        """
+        return await self._apply_concurrently(lambda task: self.complete_task(task["guid"]), tasks, workers)
+
+    async def update_tasks(self, tasks, summary=None, description=None, due_timestamp=None, workers=BULK_WORKERS,
+                           skip_unchanged=False):
+        """
+        批量修改任务 (参数同 FeishuTask.update_tasks)
+        """
+        async def update(task):
+            changes = {"summary": summary, "description": description, "due_timestamp": due_timestamp}
+            changes.update({k: v for k, v in (task.get("changes") or {}).items() if k in changes and v})
+            if not any(changes.values()):
+                raise ValueError("No fields to update")
+            return await self.update_task(task["guid"], skip_unchanged=skip_unchanged, **changes)
+
+        return await self._apply_concurrently(update, tasks, workers)
+
+    async def delete_tasks(self, tasks, workers=BULK_WORKERS):
+        """
+        批量删除任务 (参数同 FeishuTask.delete_tasks)
+        """
+        return await self._apply_concurrently(lambda task: self.delete_task(task["guid"]), tasks, workers)
+
+    async def _apply_concurrently(self, func, tasks, workers):
+        """同时最多 workers 个请求，按输入顺序返回结果 (格式同 FeishuTask._apply_concurrently)"""
+        if not self.app_id:
+            raise ValueError("Configuration missing. Please run initialize() first.")
+        semaphore = asyncio.Semaphore(max(1, workers))
+
+        async def run(task):
+            result = {"guid": task.get("guid"), "summary": task.get("summary"), "ok": True, "error": None,
+                      "unchanged": False}
+            try:
+                async with semaphore:
+                    resp_json = await func(task)
+                if not resp_json or resp_json.get("code") != 0:
+                    result.update(ok=False, error=f"{(resp_json or {}).get('code')}: {(resp_json or {}).get('msg')}")
+                else:
+                    result["unchanged"] = bool(resp_json.get("unchanged"))
+            except Exception as e:
+                result.update(ok=False, error=str(e))
+            return result
+
+        tasks = [{"guid": task} if isinstance(task, str) else task for task in tasks]
+        return await asyncio.gather(*[run(task) for task in tasks])
+
+
+if __name__ == "__main__":
+    async def main():
+        assistant = AsyncFeishuTask()
+        if not assistant.app_id:
+            print("Feishu Task is not configured. Please run: python3 feishu_task_client.py")
+            return
+        print(await assistant.list_tasks())
+        await close_async_transport()
+
+    asyncio.run(main())
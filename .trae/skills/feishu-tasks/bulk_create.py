@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+批量创建飞书任务 (CSV / JSON)
+用法: python3 bulk_create.py <tasks.csv|tasks.json|tasks.jsonl> [--workers 8] [--manifest 路径] [--batch-id 标识] [--dry-run]
+
+- 任务由固定大小的线程池并发创建，所有负责人在创建前一次批量解析
+- 每行带确定的幂等键 (client_token)：请求超时后自动重试，重新运行也不会产生重复任务
+- 每行的结果追加写入清单文件 (默认 <输入文件>.manifest.jsonl)，中断后重新运行只处理未完成 / 失败的行
+
+CSV 表头 (除 summary 外均可省略):
+    id,summary,description,due,assignees
+    id: 行的稳定标识 (可选)；没有时按行的内容识别，插入 / 删除行或调整顺序后其他行仍对应同一个任务
+    due: "YYYY-MM-DD HH:MM"、"YYYY-MM-DD"、ISO 8601 或时间戳
+    assignees: 以 ; 分隔的 open_id、手机号或邮箱 (默认自己)
+JSON: 以上字段组成的对象数组 (或每行一个对象)，assignees 可以是列表
+"""
+
+import argparse
+import sys
+import os
+from datetime import datetime
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from feishu_task_client import FeishuTask
+from task_import import DEFAULT_WORKERS, iter_input
+
+def bulk_create(path, workers=DEFAULT_WORKERS, manifest_path=None, batch_id=None, dry_run=False):
+    """批量创建任务，返回是否全部成功"""
+    if dry_run:
+        count = 0
+        for count, (key, row, task) in enumerate(iter_input(path), 1):
+            due = datetime.fromtimestamp(task["due"] / 1000).strftime("%Y-%m-%d %H:%M") if task["due"] else "-"
+            print(f"{row:4}. 📝 {task['summary']}  ⏰ {due}  👥 {len(task['assignees']) or '自己'}")
+        print(f"🔍 共 {count} 个任务 (dry-run，未创建)")
+        return True
+
+    assistant = FeishuTask()
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_task_client.py")
+        return False
+
+    manifest_path = manifest_path or f"{path}.manifest.jsonl"
+    print(f"📄 清单: {manifest_path}")
+    stats = assistant.bulk_create_tasks(path, manifest_path, workers, batch_id)
+
+    print("-" * 70)
+    print(f"✅ 新建 {stats['created']} 个, 跳过已完成 {stats['skipped']} 个, "
+          f"失败 {stats['failed']} 个, 耗时 {stats['seconds']}s")
+    if stats["failed"]:
+        print("💡 修正后重新运行同一命令，只会重试失败的行 (沿用同一幂等键，不会重复创建)")
+    return not stats["failed"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量创建飞书任务 (CSV / JSON)")
+    parser.add_argument("file", help="CSV、JSON 或 JSON Lines 文件")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"并发数 (默认 {DEFAULT_WORKERS})")
+    parser.add_argument("--manifest", help="结果清单路径 (默认 <file>.manifest.jsonl)")
+    parser.add_argument("--batch-id", help="参与计算幂等键的批次标识 (默认为文件的绝对路径)")
+    parser.add_argument("--dry-run", action="store_true", help="只解析并打印，不创建")
+
+    args = parser.parse_args()
+    try:
+        success = bulk_create(args.file, max(1, args.workers), args.manifest, args.batch_id, args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"❌ 错误: {e}")
+        success = False
+    sys.exit(0 if success else 1)
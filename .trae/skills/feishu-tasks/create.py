@@ -10,8 +10,8 @@ sys.path.append(current_dir)
 
 from feishu_task_client import FeishuTask
 
-def create_task(summary, description=None, due_time=None):
-    """创建任务"""
+def create_task(summary, description=None, due_time=None, assignees=None):
+    """创建任务，assignees 为负责人 open_id / 手机号 / 邮箱列表 (默认自己)"""
     assistant = FeishuTask()
     
     if not assistant.app_id:
@@ -28,7 +28,16 @@ def create_task(summary, description=None, due_time=None):
             print("❌ 时间格式错误，请使用 'YYYY-MM-DD HH:MM'")
             return False
 
-    result = assistant.create_task(summary, description=description, due_timestamp=due_timestamp)
+    members = None
+    if assignees:
+        try:
+            members = [{"id": open_id, "type": "user", "role": "assignee"}
+                       for open_id in assistant.resolve_user_ids(assignees)]
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
+
+    result = assistant.create_task(summary, description=description, due_timestamp=due_timestamp, members=members)
     
     if result and result.get("code") == 0:
         task = result.get("data", {}).get("task", {})
@@ -44,7 +53,8 @@ if __name__ == "__main__":
     parser.add_argument("summary", help="任务标题")
     parser.add_argument("--desc", help="任务描述", default=None)
     parser.add_argument("--due", help="截止时间 (YYYY-MM-DD HH:MM)", default=None)
+    parser.add_argument("--assignee", action="append", help="负责人 open_id、手机号或邮箱，可重复 (默认自己)")
     
     args = parser.parse_args()
     
-    create_task(args.summary, args.desc, args.due)
+    create_task(args.summary, args.desc, args.due, args.assignee)
@@ -7,6 +7,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from feishu_task_client import FeishuTask
+from task_batch import add_batch_arguments, is_batch, select_targets, run_batch
 
 def delete_task(task_guid):
     """删除任务"""
@@ -25,10 +26,32 @@ def delete_task(task_guid):
         print(f"❌ 删除失败: {result}")
         return False
 
+def delete_tasks(args):
+    """批量删除任务 (多个 guid、--from-file 或过滤条件)"""
+    assistant = FeishuTask()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_task_client.py")
+        return False
+
+    try:
+        targets = select_targets(assistant, args)
+        return run_batch(targets, "删除", assistant.delete_tasks, args)
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="删除飞书任务")
-    parser.add_argument("guid", help="任务 GUID")
+    parser.add_argument("guid", nargs="*", help="任务 GUID (可多个)")
+    add_batch_arguments(parser)
     
     args = parser.parse_args()
     
-    delete_task(args.guid)
+    if is_batch(args):
+        success = delete_tasks(args)
+    elif args.guid:
+        success = delete_task(args.guid[0])
+    else:
+        parser.error("请指定任务 GUID、--from-file 或过滤条件")
+    sys.exit(0 if success else 1)
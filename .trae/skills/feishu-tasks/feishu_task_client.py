@@ -1,10 +1,34 @@
+import contextvars
 import json
 import os
+import sys
+import threading
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
+
+# 共享运行时 (跨进程 token 缓存、连接池等) 位于 .trae/skills/skill-common
+COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "skill-common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+from token_store import get_token_store
+from http_transport import get_transport
+from api_base import FEISHU_API_BASE
+from metrics import instrument_client
+from identity_resolver import get_identity_resolver
+from task_import import DEFAULT_WORKERS as IMPORT_WORKERS, iter_input, import_tasks
+from task_store import TaskStore, task_version, diff_task
 
 CONFIG_FILE = os.path.expanduser("~/.feishu_task_config.json")
+# 遍历任务列表时的每页条数 (接口上限 100)
+TASK_PAGE_SIZE = 100
+# 批量完成 / 修改 / 删除任务时的并发数 (实际速率仍受 skill-common 调度器的 task QPS 限制)
+BULK_WORKERS = 8
+# update_task(skip_unchanged=True) 使用的本地快照有效期 (秒)：超过这段时间未从接口确认过的任务照常发送 PATCH
+TASK_SNAPSHOT_TTL = int(os.environ.get("FEISHU_TASK_SNAPSHOT_TTL", 3600))
+# 创建 / 修改 / 完成 / 删除任务时顺带写入本地任务库，供 query_tasks 离线查询 (FEISHU_TASK_INDEX=0 关闭)
+TASK_INDEX_ENABLED = os.environ.get("FEISHU_TASK_INDEX", "1").lower() not in ("0", "off", "false", "no")
 
+@instrument_client
 class FeishuTask:
     def __init__(self):
         self.config = self._load_config()
@@ -13,6 +37,7 @@ class FeishuTask:
         self.open_id = self.config.get("open_id")
         self.tenant_access_token = None
         self.token_expire_time = 0
+        self._local = threading.local()  # 每个线程各自的本地任务库连接
 
     def _load_config(self):
         if os.path.exists(CONFIG_FILE):
@@ -43,7 +68,7 @@ class FeishuTask:
         # 验证并获取 open_id
         try:
             token = self._get_tenant_access_token(app_id, app_secret)
-            open_id = self._get_user_id_by_mobile(token, phone)
+            open_id = get_identity_resolver().resolve_one(app_id, token, phone)
             
             if not open_id:
                 print("Failed to get Open ID. Please check the phone number.")
@@ -73,56 +98,34 @@ class FeishuTask:
         if not app_id or not app_secret:
             raise ValueError("App ID and App Secret are required.")
 
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
-        headers = {"Content-Type": "application/json; charset=utf-8"}
-        payload = {
-            "app_id": app_id,
-            "app_secret": app_secret
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            raise Exception(f"Get token failed: {resp_json}")
-            
-        self.tenant_access_token = resp_json.get("tenant_access_token")
-        self.token_expire_time = time.time() + resp_json.get("expire", 7200) - 60 # 提前60秒过期
+        # 同一 app_id 的 token 在本机所有 skill 进程间共享，过期前只刷新一次
+        token, expire_time = get_token_store().get_token(app_id, app_secret)
+        self.tenant_access_token = token
+        self.token_expire_time = expire_time
         return self.tenant_access_token
 
-    def _get_user_id_by_mobile(self, token, mobile):
-        url = "https://open.feishu.cn/open-apis/contact/v3/users/batch_get_id?user_id_type=open_id"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-        payload = {
-            "mobiles": [mobile]
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        resp_json = response.json()
-        
-        if resp_json.get("code") != 0:
-            raise Exception(f"Get user id failed: {resp_json}")
-            
-        user_list = resp_json.get("data", {}).get("user_list", [])
-        if user_list and user_list[0].get("user_id"):
-            return user_list[0].get("user_id")
-        return None
+    def resolve_user_ids(self, values):
+        """
+        open_id / 手机号 / 邮箱 -> open_id 列表 (批量查询，结果跨进程缓存)
+        :raise IdentityNotFoundError: 有手机号 / 邮箱找不到时
+        """
+        return get_identity_resolver().resolve_open_ids(self.app_id, self._get_tenant_access_token, values)
 
-    def create_task(self, summary, description=None, due_timestamp=None, members=None):
+    def create_task(self, summary, description=None, due_timestamp=None, members=None, client_token=None):
         """
         创建任务
         :param summary: 任务标题
         :param description: 任务描述
         :param due_timestamp: 截止时间戳（毫秒级 int 或 str）
-        :param members: 成员列表 [{"id": "ou_xxx", "type": "user"}]
+        :param members: 成员列表 [{"id": "ou_xxx", "type": "user", "role": "assignee"}]，手机号 / 邮箱先用 resolve_user_ids 转换
+        :param client_token: 幂等键，相同 client_token 的请求只会创建一个任务；传入后超时 / 5xx 会自动重试
         """
         if not self.app_id:
             print("Configuration missing. Please run initialize() first.")
             return
 
         token = self._get_tenant_access_token()
-        url = "https://open.feishu.cn/open-apis/task/v2/tasks"
+        url = f"{FEISHU_API_BASE}/task/v2/tasks"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json; charset=utf-8"
@@ -148,8 +151,25 @@ class FeishuTask:
         if members:
             payload["members"] = members
 
-        response = requests.post(url, headers=headers, json=payload)
-        return response.json()
+        if client_token:
+            payload["client_token"] = client_token
+
+        # 带幂等键时服务端会去重，重放请求不会产生重复任务
+        response = get_transport().post(url, headers=headers, json=payload, idempotent=bool(client_token))
+        return self._index_result(response.json())
+
+    def bulk_create_tasks(self, path, manifest_path=None, workers=IMPORT_WORKERS, batch_id=None):
+        """
+        从 CSV / JSON 文件批量创建任务 (见 task_import.py)
+        每行带确定的幂等键，超时自动重试不会产生重复任务；结果追加写入清单，重新运行只处理未完成的行
+        :param manifest_path: 清单路径，默认 <path>.manifest.jsonl
+        :param batch_id: 参与计算幂等键的批次标识，默认为文件的绝对路径
+        :return: {"created", "skipped", "failed", "seconds"}
+        """
+        if not self.app_id:
+            raise ValueError("Configuration missing. Please run initialize() first.")
+        return import_tasks(self, list(iter_input(path)), manifest_path or f"{path}.manifest.jsonl",
+                            batch_id or os.path.abspath(path), workers)
 
     def list_tasks(self, page_size=20, page_token=None, task_list_type=None):
         """
@@ -161,7 +181,7 @@ class FeishuTask:
             return
 
         token = self._get_tenant_access_token()
-        url = "https://open.feishu.cn/open-apis/task/v2/tasks"
+        url = f"{FEISHU_API_BASE}/task/v2/tasks"
         headers = {
             "Authorization": f"Bearer {token}",
         }
@@ -175,9 +195,115 @@ class FeishuTask:
         if task_list_type:
             params["type"] = task_list_type
             
-        response = requests.get(url, headers=headers, params=params)
+        response = get_transport().get(url, headers=headers, params=params)
         return response.json()
 
+    def iter_tasks(self, type=None, page_size=TASK_PAGE_SIZE, prefetch=True):
+        """
+        逐条返回任务的生成器，按 page_token / has_more 自动翻页取完全部任务
+        :param type: 任务类型，如 "created", "assigned" 等 (同 list_tasks 的 task_list_type)
+        :param prefetch: 拿到一页后立即在后台请求下一页，调用方处理当前页时下一页已在路上
+        :raise Exception: 接口返回错误时
+        """
+        if not self.app_id:
+            raise ValueError("Configuration missing. Please run initialize() first.")
+
+        pool = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        context = contextvars.copy_context()
+
+        def fetch(page_token=None):
+            if pool is None:
+                return self.list_tasks(page_size, page_token, type)
+            # 后台请求在指标中归属到调用方法
+            return pool.submit(context.copy().run, self.list_tasks, page_size, page_token, type)
+
+        try:
+            pending = fetch()
+            while pending is not None:
+                resp_json = pending.result() if pool else pending
+                if not resp_json or resp_json.get("code") != 0:
+                    raise Exception(f"List tasks failed: {resp_json}")
+                data = resp_json.get("data", {})
+                page_token = data.get("page_token")
+                pending = fetch(page_token) if data.get("has_more") and page_token else None
+                for task in data.get("items") or []:
+                    yield task
+        finally:
+            if pool:
+                # 调用方提前停止遍历时不再等待已发出的预取请求
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def sync_tasks(self, store=None, page_size=TASK_PAGE_SIZE):
+        """
+        把任务列表同步到本地 SQLite 任务库 (task_store.TaskStore)
+        任务接口不支持按更新时间增量拉取：翻页取完列表 (预取下一页)，只写入 updated_at 变化的任务；
+        完整取完后，本地有而列表中没有的任务删除。中途失败时本地数据保持不变
+        :return: {"fetched", "upserted", "unchanged", "deleted", "seconds"}
+        """
+        store = store or self._task_store()
+        started = time.time()
+        versions = store.versions()
+        seen = set()
+        changed = []
+        for task in self.iter_tasks(page_size=page_size):
+            guid = task.get("guid")
+            if not guid:
+                continue
+            seen.add(guid)
+            if guid not in versions or versions[guid] != task_version(task):
+                changed.append(task)
+
+        with store.transaction():
+            upserted = store.upsert(changed)
+            store.touch(seen.difference(task["guid"] for task in changed))
+            deleted = store.delete([guid for guid in versions if guid not in seen])
+            store.set_synced()
+        return {"fetched": len(seen), "upserted": upserted, "unchanged": len(seen) - upserted,
+                "deleted": deleted, "seconds": round(time.time() - started, 2)}
+
+    def query_tasks(self, status=None, due_from=None, due_to=None, completed_from=None, completed_to=None,
+                    creator=None, member=None, role=None, text=None, limit=None, sync=False):
+        """
+        在本地任务库中过滤任务，不访问接口 (参数见 TaskStore.query，时间为毫秒时间戳)
+        本地库由 sync_tasks 以及创建 / 修改 / 完成 / 删除任务时顺带写入；sync=True 时先同步
+        :param creator: 创建人，open_id / 手机号 / 邮箱 (后两者经 resolve_user_ids 转换，结果有缓存)
+        :param member: 成员，同上
+        :return: 任务列表 (与接口返回的格式相同)
+        """
+        store = self._task_store()
+        if sync:
+            self.sync_tasks(store)
+        if creator:
+            creator = self.resolve_user_ids([creator])[0]
+        if member:
+            member = self.resolve_user_ids([member])[0]
+        return list(store.query(status, due_from, due_to, completed_from, completed_to, creator, member, role,
+                                text, limit))
+
+    def _task_store(self):
+        store = getattr(self._local, "task_store", None)
+        if store is None:
+            store = self._local.task_store = TaskStore()
+        return store
+
+    def _index_tasks(self, tasks=(), deleted=()):
+        """把接口返回的任务写入本地任务库 / 删除；写入失败不影响接口调用"""
+        if not TASK_INDEX_ENABLED or not (tasks or deleted):
+            return
+        try:
+            store = self._task_store()
+            with store.transaction():
+                store.upsert(tasks)
+                store.delete(deleted)
+        except Exception:
+            pass
+
+    def _index_result(self, resp_json):
+        """创建 / 修改接口的返回中带有最新的任务，顺带写入本地任务库"""
+        if resp_json and resp_json.get("code") == 0 and (resp_json.get("data") or {}).get("task"):
+            self._index_tasks([resp_json["data"]["task"]])
+        return resp_json
+
     def get_task(self, task_guid):
         """
         获取任务详情
@@ -186,11 +312,11 @@ class FeishuTask:
             return
             
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/task/v2/tasks/{task_guid}"
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
         headers = {
             "Authorization": f"Bearer {token}",
         }
-        response = requests.get(url, headers=headers)
+        response = get_transport().get(url, headers=headers)
         return response.json()
 
     def complete_task(self, task_guid):
@@ -201,7 +327,7 @@ class FeishuTask:
             return
             
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/task/v2/tasks/{task_guid}"
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json; charset=utf-8"
@@ -216,18 +342,21 @@ class FeishuTask:
             "update_fields": ["completed_at"]
         }
         
-        response = requests.patch(url, headers=headers, json=payload)
-        return response.json()
+        response = get_transport().patch(url, headers=headers, json=payload)
+        return self._index_result(response.json())
 
-    def update_task(self, task_guid, summary=None, description=None, due_timestamp=None):
+    def update_task(self, task_guid, summary=None, description=None, due_timestamp=None, skip_unchanged=False):
         """
         更新任务信息
+        :param skip_unchanged: 与本地任务库中的快照 (TASK_SNAPSHOT_TTL 内从接口确认过) 比较，只发送真正变化的字段；
+                               全部字段都没有变化时不发请求，返回 {"code": 0, "msg": "unchanged", "unchanged": True,
+                               "data": {"task": 快照}}。没有可用快照时照常发送
         """
         if not self.app_id:
             return
             
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/task/v2/tasks/{task_guid}"
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json; charset=utf-8"
@@ -253,14 +382,37 @@ class FeishuTask:
             
         if not update_fields:
             return None
+
+        if skip_unchanged:
+            task_data, unchanged = self._drop_unchanged(task_guid, task_data)
+            if unchanged is not None:
+                return unchanged
+            update_fields = list(task_data)
             
         payload = {
             "task": task_data,
             "update_fields": update_fields
         }
         
-        response = requests.patch(url, headers=headers, json=payload)
-        return response.json()
+        response = get_transport().patch(url, headers=headers, json=payload)
+        return self._index_result(response.json())
+
+    def _drop_unchanged(self, task_guid, task_data):
+        """
+        :return: (变化的字段, None)；全部未变化时为 ({}, 不发请求时返回的响应)
+        """
+        snapshot = None
+        if TASK_INDEX_ENABLED:
+            try:
+                snapshot = self._task_store().get(task_guid, max_age=TASK_SNAPSHOT_TTL)
+            except Exception:
+                snapshot = None
+        if snapshot is None:
+            return task_data, None
+        changed = diff_task(snapshot, task_data)
+        if changed:
+            return changed, None
+        return {}, {"code": 0, "msg": "unchanged", "unchanged": True, "data": {"task": snapshot}}
 
 
     def delete_task(self, task_guid):
@@ -271,12 +423,75 @@ class FeishuTask:
             return
 
         token = self._get_tenant_access_token()
-        url = f"https://open.feishu.cn/open-apis/task/v2/tasks/{task_guid}"
+        url = f"{FEISHU_API_BASE}/task/v2/tasks/{task_guid}"
         headers = {
             "Authorization": f"Bearer {token}",
         }
-        response = requests.delete(url, headers=headers)
-        return response.json()
+        response = get_transport().delete(url, headers=headers)
+        resp_json = response.json()
+        if resp_json.get("code") == 0:
+            self._index_tasks(deleted=[task_guid])
+        return resp_json
+
+    def complete_tasks(self, tasks, workers=BULK_WORKERS):
+        """
+        批量完成任务，并发发出 PATCH
+        :param tasks: 任务 guid 或任务 JSON (如 query_tasks 的结果) 的列表
+        :return: [{"guid", "summary", "ok", "error", "unchanged"}]，顺序与输入一致
+        """
+        return self._apply_concurrently(lambda task: self.complete_task(task["guid"]), tasks, workers)
+
+    def update_tasks(self, tasks, summary=None, description=None, due_timestamp=None, workers=BULK_WORKERS,
+                     skip_unchanged=False):
+        """
+        批量修改任务，并发发出 PATCH
+        :param tasks: 任务 guid 或任务 JSON 的列表；任务 JSON 可带 "changes": {"summary", "description", "due_timestamp"}
+                      逐个指定修改内容，覆盖统一的 summary / description / due_timestamp
+        :param skip_unchanged: 同 update_task，与快照相同的任务不发请求 (结果中 unchanged 为 True)
+        :return: [{"guid", "summary", "ok", "error", "unchanged"}]
+        """
+        def update(task):
+            changes = {"summary": summary, "description": description, "due_timestamp": due_timestamp}
+            changes.update({k: v for k, v in (task.get("changes") or {}).items() if k in changes and v})
+            if not any(changes.values()):
+                raise ValueError("No fields to update")
+            return self.update_task(task["guid"], skip_unchanged=skip_unchanged, **changes)
+
+        return self._apply_concurrently(update, tasks, workers)
+
+    def delete_tasks(self, tasks, workers=BULK_WORKERS):
+        """
+        批量删除任务，并发发出 DELETE
+        :return: [{"guid", "summary", "ok", "error", "unchanged"}]
+        """
+        return self._apply_concurrently(lambda task: self.delete_task(task["guid"]), tasks, workers)
+
+    def _apply_concurrently(self, func, tasks, workers):
+        """
+        在线程池中对每个任务执行 func(task) -> 响应 JSON，按输入顺序返回结果
+        请求速率由 http_transport 的调度器统一限制，遇到频控会自动退避重试
+        """
+        if not self.app_id:
+            raise ValueError("Configuration missing. Please run initialize() first.")
+
+        def run(task):
+            result = {"guid": task.get("guid"), "summary": task.get("summary"), "ok": True, "error": None,
+                      "unchanged": False}
+            try:
+                resp_json = func(task)
+                if not resp_json or resp_json.get("code") != 0:
+                    result.update(ok=False, error=f"{(resp_json or {}).get('code')}: {(resp_json or {}).get('msg')}")
+                else:
+                    result["unchanged"] = bool(resp_json.get("unchanged"))
+            except Exception as e:
+                result.update(ok=False, error=str(e))
+            return result
+
+        tasks = [{"guid": task} if isinstance(task, str) else task for task in tasks]
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tasks) or 1))) as pool:
+            # 每个任务使用调用方上下文的副本，请求在指标中归属到调用方法
+            return list(pool.map(lambda task: context.copy().run(run, task), tasks))
 
 if __name__ == "__main__":
     assistant = FeishuTask()
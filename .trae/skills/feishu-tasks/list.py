@@ -2,54 +2,70 @@ import argparse
 import sys
 import os
 import time
-from datetime import datetime
 
 # 获取当前脚本所在目录并添加到 sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from feishu_task_client import FeishuTask
+from feishu_task_client import FeishuTask, TASK_PAGE_SIZE
+from task_format import print_task
 
-def list_tasks(limit=20, type_filter=None):
+def list_tasks(limit=20, type_filter=None, list_all=False, page_size=TASK_PAGE_SIZE):
     """列出任务"""
     assistant = FeishuTask()
     
     if not assistant.app_id:
         print("❌ 未配置，请先运行: python3 feishu_task_client.py")
         return False
+
+    if list_all:
+        return list_all_tasks(assistant, type_filter, page_size)
         
     result = assistant.list_tasks(page_size=limit, task_list_type=type_filter)
     
     if result and result.get("code") == 0:
-        items = result.get("data", {}).get("items", [])
+        data = result.get("data", {})
+        items = data.get("items", [])
         if not items:
             print("📭 没有找到任务")
             return True
             
         print(f"📋 找到 {len(items)} 个任务:")
         for item in items:
-            summary = item.get("summary", "无标题")
-            guid = item.get("guid")
-            completed_at = item.get("completed_at", "0")
-            status = "✅" if completed_at != "0" else "TODO"
-            
-            due_info = ""
-            if item.get("due"):
-                ts = int(item.get("due").get("timestamp", 0)) / 1000
-                dt = datetime.fromtimestamp(ts)
-                due_info = f" (截止: {dt.strftime('%Y-%m-%d %H:%M')})"
-                
-            print(f"[{status}] {guid} - {summary}{due_info}")
+            print_task(item)
+        if data.get("has_more"):
+            print("… 还有更多任务，使用 --all 列出全部")
         return True
     else:
         print(f"❌ 获取列表失败: {result}")
         return False
 
+def list_all_tasks(assistant, type_filter=None, page_size=TASK_PAGE_SIZE):
+    """翻页列出全部任务，边取边输出 (下一页在输出当前页时预取)"""
+    started = time.perf_counter()
+    count = 0
+    try:
+        for count, item in enumerate(assistant.iter_tasks(type=type_filter, page_size=page_size), 1):
+            print_task(item)
+    except Exception as e:
+        print(f"❌ 获取列表失败 (已列出 {count} 个): {e}")
+        return False
+
+    if not count:
+        print("📭 没有找到任务")
+    else:
+        print(f"📋 共 {count} 个任务 ({time.perf_counter() - started:.2f}s)")
+    return True
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="列出飞书任务")
     parser.add_argument("limit", type=int, nargs="?", default=20, help="显示数量 (默认 20)")
     parser.add_argument("--type", help="任务类型 (created/assigned/completed/deleted/followed)", default=None)
+    parser.add_argument("--all", dest="list_all", action="store_true", help="自动翻页列出全部任务 (忽略数量)")
+    parser.add_argument("--page-size", type=int, default=TASK_PAGE_SIZE,
+                        help=f"--all 时每页条数 (默认 {TASK_PAGE_SIZE})")
     
     args = parser.parse_args()
     
-    list_tasks(args.limit, args.type)
+    success = list_tasks(args.limit, args.type, args.list_all, args.page_size)
+    sys.exit(0 if success else 1)
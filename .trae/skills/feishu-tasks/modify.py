@@ -8,8 +8,16 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from feishu_task_client import FeishuTask
+from task_batch import add_batch_arguments, is_batch, select_targets, run_batch
 
-def modify_task(task_guid, summary=None, description=None, due_time=None, complete=False):
+def parse_due(due_time):
+    """YYYY-MM-DD HH:MM -> 毫秒时间戳；格式错误时抛出 ValueError"""
+    try:
+        return int(datetime.strptime(due_time, "%Y-%m-%d %H:%M").timestamp() * 1000) if due_time else None
+    except ValueError:
+        raise ValueError("时间格式错误，请使用 'YYYY-MM-DD HH:MM'")
+
+def modify_task(task_guid, summary=None, description=None, due_time=None, complete=False, skip_unchanged=False):
     """修改任务"""
     assistant = FeishuTask()
     
@@ -27,18 +35,19 @@ def modify_task(task_guid, summary=None, description=None, due_time=None, comple
         # 这里假设可以同时进行
         
     if summary or description or due_time:
-        due_timestamp = None
-        if due_time:
-            try:
-                dt = datetime.strptime(due_time, "%Y-%m-%d %H:%M")
-                due_timestamp = int(dt.timestamp() * 1000)
-            except ValueError:
-                print("❌ 时间格式错误，请使用 'YYYY-MM-DD HH:MM'")
-                return False
+        try:
+            due_timestamp = parse_due(due_time)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return False
                 
-        result = assistant.update_task(task_guid, summary=summary, description=description, due_timestamp=due_timestamp)
+        result = assistant.update_task(task_guid, summary=summary, description=description, due_timestamp=due_timestamp,
+                                       skip_unchanged=skip_unchanged)
         
-        if result and result.get("code") == 0:
+        if result and result.get("unchanged"):
+            print(f"⏭️ 没有变化，跳过: {task_guid}")
+            return True
+        elif result and result.get("code") == 0:
             print(f"✏️ 更新成功: {task_guid}")
             task = result.get("data", {}).get("task", {})
             print(f"   新标题: {task.get('summary')}")
@@ -53,14 +62,61 @@ def modify_task(task_guid, summary=None, description=None, due_time=None, comple
 
     return True
 
+def modify_tasks(args):
+    """批量修改 / 完成任务 (多个 guid、--from-file 或过滤条件)"""
+    assistant = FeishuTask()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_task_client.py")
+        return False
+
+    try:
+        due_timestamp = parse_due(args.due)
+        targets = select_targets(assistant, args)
+        has_changes = bool(args.summary or args.desc or due_timestamp)
+        updates = [t for t in targets if has_changes or t.get("changes")]
+        if not updates and not args.complete:
+            print("⚠️ 未指定任何修改内容")
+            return False
+        action = "完成" if args.complete and not updates else ("修改并完成" if args.complete else "修改")
+
+        def apply(targets, workers):
+            results = []
+            if updates:
+                results += assistant.update_tasks(updates, args.summary, args.desc, due_timestamp, workers,
+                                                  args.skip_unchanged)
+            if args.complete:
+                # 修改失败的任务不再标记完成；同一任务的两次结果合并为一条
+                merged = {r["guid"]: r for r in results}
+                pending = [t for t in targets if merged.get(t["guid"], {"ok": True})["ok"]]
+                for result in assistant.complete_tasks(pending, workers):
+                    merged[result["guid"]] = result
+                results = [merged[t["guid"]] for t in targets]
+            return results
+
+        return run_batch(targets if args.complete else updates, action, apply, args)
+
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="修改飞书任务")
-    parser.add_argument("guid", help="任务 GUID")
+    parser.add_argument("guid", nargs="*", help="任务 GUID (可多个)")
     parser.add_argument("--summary", help="新任务标题", default=None)
     parser.add_argument("--desc", help="新任务描述", default=None)
     parser.add_argument("--due", help="新截止时间 (YYYY-MM-DD HH:MM)", default=None)
     parser.add_argument("--complete", action="store_true", help="标记任务为完成")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="与本地任务库中的快照比较，只发送变化的字段，没有变化的任务不发请求")
+    add_batch_arguments(parser)
     
     args = parser.parse_args()
     
-    modify_task(args.guid, args.summary, args.desc, args.due, args.complete)
+    if is_batch(args):
+        success = modify_tasks(args)
+    elif args.guid:
+        success = modify_task(args.guid[0], args.summary, args.desc, args.due, args.complete, args.skip_unchanged)
+    else:
+        parser.error("请指定任务 GUID、--from-file 或过滤条件")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+在本地任务库中查询任务 (不访问任务接口)
+用法: python3 query.py [关键词 ...] [--status todo|done|overdue] [--due-from YYYY-MM-DD] [--due-to YYYY-MM-DD]
+                       [--completed-days N] [--creator 用户] [--member 用户 [--role assignee]] [--limit 50] [--sync]
+
+本地库由 sync.py 以及 create.py / modify.py / delete.py 等命令顺带更新，--sync 时先同步。
+示例：
+    python3 query.py --status overdue                 # 逾期未完成
+    python3 query.py --status done --completed-days 7 # 最近 7 天完成的
+    python3 query.py --member 13800000000 --role assignee --due-to 2026-11-01
+"""
+
+import sys
+import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_task_client import FeishuTask
+from task_store import STATUSES
+from task_format import print_task
+
+def date_ms(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").timestamp() * 1000) if value else None
+
+def add_filter_arguments(parser):
+    """本地任务库的过滤条件 (query.py 与 modify.py / delete.py 的批量模式共用)"""
+    parser.add_argument("--status", choices=STATUSES, help="todo / done / overdue (未完成且已过截止时间)")
+    parser.add_argument("--due-from", help="截止日期不早于 YYYY-MM-DD")
+    parser.add_argument("--due-to", help="截止日期早于 YYYY-MM-DD (不含当天)")
+    parser.add_argument("--completed-days", type=int, help="最近 N 天内完成的任务")
+    parser.add_argument("--creator", help="创建人 open_id、手机号或邮箱")
+    parser.add_argument("--member", help="成员 open_id、手机号或邮箱")
+    parser.add_argument("--role", choices=("assignee", "follower"), help="与 --member 一起使用，只看该角色")
+    parser.add_argument("--sync", action="store_true", help="查询前先同步任务列表")
+
+def has_filter(args):
+    return any([args.status, args.due_from, args.due_to, args.completed_days, args.creator, args.member])
+
+def filter_tasks(assistant, args, text=None, limit=None):
+    """按 add_filter_arguments 解析出的条件查询本地任务库"""
+    completed_from = None
+    if args.completed_days:
+        completed_from = int((datetime.now() - timedelta(days=args.completed_days)).timestamp() * 1000)
+    return assistant.query_tasks(args.status, date_ms(args.due_from), date_ms(args.due_to), completed_from, None,
+                                 args.creator, args.member, args.role, text, limit, args.sync)
+
+def query_tasks(args):
+    """查询本地任务库"""
+    assistant = FeishuTask()
+
+    if (args.sync or args.creator or args.member) and not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_task_client.py")
+        return False
+
+    try:
+        started = time.perf_counter()
+        tasks = filter_tasks(assistant, args, " ".join(args.keywords) or None, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        print(f"🔍 {len(tasks)} 个任务 ({elapsed:.1f}ms)")
+        print("-" * 70, flush=True)
+        for task in tasks:
+            print_task(task)
+        if not tasks:
+            print("📭 没有找到匹配的任务 (本地库可能尚未同步，可加 --sync)")
+        return True
+
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="在本地任务库中查询任务")
+    parser.add_argument("keywords", nargs="*", help="标题 / 描述关键词 (空格分隔，需全部匹配)")
+    add_filter_arguments(parser)
+    parser.add_argument("--limit", type=int, default=50, help="最多返回条数 (默认 50)")
+
+    args = parser.parse_args()
+    success = query_tasks(args)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+同步飞书任务到本地任务库
+用法: python3 sync.py [--page-size 100]
+
+翻页取完任务列表 (预取下一页)，只写入 updated_at 变化的任务，列表中已不存在的任务从本地删除；
+本地库位于 ~/.feishu_tasks.db (可通过环境变量 FEISHU_TASK_DB 修改)。同步后可使用 python3 query.py 离线查询。
+"""
+
+import sys
+import os
+import argparse
+
+# 获取当前脚本所在目录并添加到 sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+from feishu_task_client import FeishuTask, TASK_PAGE_SIZE
+from task_store import TaskStore
+
+def sync_tasks(page_size=TASK_PAGE_SIZE):
+    """同步任务列表到本地"""
+    assistant = FeishuTask()
+
+    if not assistant.app_id:
+        print("❌ 未配置，请先运行: python3 feishu_task_client.py")
+        return False
+
+    store = TaskStore()
+    try:
+        stats = assistant.sync_tasks(store, page_size=page_size)
+        print(f"✅ 同步完成: 共 {stats['fetched']} 个任务, 更新 {stats['upserted']} 个, "
+              f"未变化 {stats['unchanged']} 个, 删除 {stats['deleted']} 个, 耗时 {stats['seconds']}s")
+        print(f"📦 本地共 {store.count()} 个任务 ({store.path})")
+        return True
+
+    except Exception as e:
+        print(f"❌ 同步失败: {e}")
+        return False
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="同步飞书任务到本地任务库")
+    parser.add_argument("--page-size", type=int, default=TASK_PAGE_SIZE, help=f"每页条数 (默认 {TASK_PAGE_SIZE})")
+
+    args = parser.parse_args()
+    success = sync_tasks(args.page_size)
+    sys.exit(0 if success else 1)
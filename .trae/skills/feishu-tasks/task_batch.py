@@ -0,0 +1,101 @@
+"""
+modify.py / delete.py 的批量模式
+
+目标任务来自多个 guid、--from-file 文件 (见 task_import.read_targets)，或本地任务库的过滤条件 (见 query.py)；
+先列出将要处理的任务，确认后并发执行 (速率受 skill-common 调度器的 task QPS 限制)，逐个报告结果。
+"""
+
+import sys
+import time
+
+from feishu_task_client import BULK_WORKERS
+from task_import import read_targets
+from query import add_filter_arguments, has_filter, filter_tasks
+
+
+def add_batch_arguments(parser):
+    parser.add_argument("--from-file", help="目标任务文件：每行一个 guid，或带 guid 列的 CSV / JSON，\"-\" 为标准输入")
+    parser.add_argument("--text", help="与过滤条件一起使用：标题 / 描述关键词")
+    add_filter_arguments(parser)
+    parser.add_argument("--dry-run", action="store_true", help="只列出目标任务，不修改")
+    parser.add_argument("--yes", "-y", action="store_true", help="跳过确认")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS, help=f"并发数 (默认 {BULK_WORKERS})")
+
+
+def is_batch(args):
+    return len(args.guid) > 1 or bool(args.from_file) or has_filter(args) or bool(args.text)
+
+
+def select_targets(assistant, args):
+    """
+    :return: 目标任务列表 ({"guid", "summary", "changes"?} 或本地任务库中的任务 JSON)
+    """
+    targets = [{"guid": guid} for guid in args.guid]
+    if args.from_file:
+        targets += read_targets(args.from_file)
+    if has_filter(args) or args.text:
+        targets += filter_tasks(assistant, args, args.text)
+
+    # 去重，并用本地任务库补上标题便于预览
+    store = assistant._task_store()
+    unique = {}
+    for target in targets:
+        if target["guid"] not in unique:
+            if not target.get("summary"):
+                target["summary"] = (store.get(target["guid"]) or {}).get("summary")
+            unique[target["guid"]] = target
+    return list(unique.values())
+
+
+def confirm(prompt, stdin_used=False):
+    """
+    读取确认输入；标准输入已被 --from-file - 读完或不是终端时改从 /dev/tty 读取
+    :return: 输入的内容，没有可用的终端时为 None
+    """
+    if not stdin_used and sys.stdin.isatty():
+        return input(prompt)
+    try:
+        with open("/dev/tty", "r+") as tty:
+            tty.write(prompt)
+            tty.flush()
+            return tty.readline()
+    except OSError:
+        return None
+
+
+def run_batch(targets, action, func, args):
+    """
+    预览、确认后执行 func(targets, workers) -> [{"guid", "summary", "ok", "error", "unchanged"}]
+    :return: 是否全部成功
+    """
+    if not targets:
+        print("📭 没有匹配的任务")
+        return True
+    print(f"🔍 共 {len(targets)} 个任务，将{action}:")
+    print("-" * 70)
+    for i, target in enumerate(targets, 1):
+        print(f"{i:3d}. {target['guid']} - {target.get('summary') or ''}")
+    print("-" * 70)
+    if args.dry_run:
+        print("🔍 dry-run，未做任何修改")
+        return True
+    if not args.yes:
+        answer = confirm(f"确认{action}以上 {len(targets)} 个任务? [y/N] ", args.from_file == "-")
+        if answer is None:
+            print("❌ 标准输入已用于读取目标任务 (或不是终端)，无法确认；确认无误后加 --yes 执行")
+            return False
+        if answer.strip().lower() not in ("y", "yes"):
+            print("已取消")
+            return False
+
+    started = time.time()
+    results = func(targets, max(1, args.workers))
+    failed = [r for r in results if not r["ok"]]
+    for result in failed:
+        name = f"{result['summary']} ({result['guid']})" if result["summary"] else result["guid"]
+        print(f"❌ {name}: {result['error']}")
+    unchanged = sum(1 for r in results if r["ok"] and r.get("unchanged"))
+    skipped = f", 没有变化跳过 {unchanged} 个" if unchanged else ""
+    print(f"✅ {action}成功 {len(results) - len(failed) - unchanged} 个{skipped}, 失败 {len(failed)} 个, "
+          f"耗时 {time.time() - started:.2f}s")
+    return not failed
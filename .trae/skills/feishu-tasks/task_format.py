@@ -0,0 +1,20 @@
+"""
+任务的终端输出格式 (list.py / query.py 共用)
+"""
+
+from datetime import datetime
+
+
+def print_task(item):
+    summary = item.get("summary", "无标题")
+    guid = item.get("guid")
+    completed_at = item.get("completed_at", "0")
+    status = "✅" if completed_at != "0" else "TODO"
+
+    due_info = ""
+    if item.get("due"):
+        ts = int(item.get("due").get("timestamp", 0)) / 1000
+        dt = datetime.fromtimestamp(ts)
+        due_info = f" (截止: {dt.strftime('%Y-%m-%d %H:%M')})"
+
+    print(f"[{status}] {guid} - {summary}{due_info}", flush=True)
@@ -0,0 +1,225 @@
+"""
+批量创建任务 (bulk_create.py 与 FeishuTask.bulk_create_tasks 共用)，以及读取批量修改 / 删除的目标任务 (read_targets)
+
+- 任务由固定大小的线程池并发创建，所有负责人 (手机号 / 邮箱) 在创建前一次批量解析
+- 每行带确定的幂等键 (client_token，由批次标识与行内容计算)：超时 / 5xx 时传输层可以安全重试，
+  重新运行时失败的行沿用同一个 client_token，上次其实已经创建成功的任务也不会重复
+- 每行的结果追加写入清单 (见 skill-common/journal.py)，中断后重新运行会跳过已完成的行
+"""
+
+import contextvars
+import csv
+import hashlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from identity_resolver import get_identity_resolver
+from journal import RowKeys, load_manifest, Manifest
+
+DEFAULT_WORKERS = 8
+
+
+def parse_due(value):
+    """
+    截止时间 -> 毫秒级时间戳
+    支持 "YYYY-MM-DD HH:MM"、"YYYY-MM-DD" (当天 00:00)、ISO 8601 以及秒级 / 毫秒级时间戳
+    """
+    if value in (None, ""):
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        ts = int(value)
+        return ts if ts >= 10 ** 12 else ts * 1000
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return int(datetime.strptime(value, fmt).timestamp() * 1000)
+        except ValueError:
+            pass
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def _task(item, line_no):
+    item = {str(k).strip().lower(): v for k, v in item.items() if k}
+    summary = str(item.get("summary") or "").strip()
+    if not summary:
+        raise ValueError(f"第 {line_no} 行缺少 summary")
+    assignees = item.get("assignees") or item.get("assignee") or []
+    if isinstance(assignees, str):
+        assignees = assignees.split(";")
+    return {
+        "summary": summary,
+        "description": str(item.get("description") or "").strip() or None,
+        "due": parse_due(item.get("due")),
+        "assignees": [str(a).strip() for a in assignees if str(a).strip()],
+    }, str(item.get("id") or "").strip()
+
+
+def read_csv(path):
+    keys = RowKeys()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for line_no, row in enumerate(csv.DictReader(f), 2):
+            task, row_id = _task({k: (v or "").strip() for k, v in row.items() if k}, line_no)
+            yield keys.key(task, row_id), line_no, task
+
+
+def read_json(path):
+    """JSON 数组，或每行一个对象的 JSON Lines"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        items = enumerate(json.loads(text), 1)
+    else:
+        items = ((n, json.loads(line)) for n, line in enumerate(text.splitlines(), 1) if line.strip())
+    keys = RowKeys()
+    for index, item in items:
+        if not isinstance(item, dict):
+            raise ValueError(f"第 {index} 项不是对象")
+        task, row_id = _task(item, index)
+        yield keys.key(task, row_id), index, task
+
+
+def iter_input(path):
+    """
+    读取任务文件 (CSV / JSON / JSON Lines)
+    :return: 生成器 (key, 行号, task)，task 为 {"summary", "description", "due" (毫秒), "assignees"}
+    """
+    if path.lower().endswith((".json", ".jsonl")):
+        return read_json(path)
+    return read_csv(path)
+
+
+def read_targets(path):
+    """
+    读取批量完成 / 修改 / 删除的目标任务 (modify.py / delete.py 的 --from-file)
+    - 纯文本：每行一个 guid (行首第一个词，# 开头的行忽略)；"-" 从标准输入读取
+    - CSV：guid 列必填，summary / description / due 列为该行的修改内容
+    - JSON：guid 字符串数组，或带 guid 及修改内容的对象数组 (也可以是 JSON Lines)
+    :return: [{"guid", "changes": {"summary", "description", "due_timestamp"}}]
+    """
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            text = f.read()
+
+    stripped = text.lstrip()
+    if path.lower().endswith((".json", ".jsonl")) or stripped.startswith(("[", "{")):
+        if stripped.startswith("["):
+            items = json.loads(text)
+        else:
+            items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    elif path.lower().endswith(".csv"):
+        items = [{k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                 for row in csv.DictReader(text.splitlines())]
+    else:
+        items = [line.split()[0] for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+
+    targets = []
+    for index, item in enumerate(items, 1):
+        if isinstance(item, str):
+            targets.append({"guid": item.strip(), "changes": {}})
+            continue
+        guid = str((item or {}).get("guid") or "").strip()
+        if not guid:
+            raise ValueError(f"第 {index} 项缺少 guid")
+        changes = {
+            "summary": str(item.get("summary") or "").strip() or None,
+            "description": str(item.get("description") or "").strip() or None,
+            "due_timestamp": parse_due(item.get("due")),
+        }
+        targets.append({"guid": guid, "changes": {k: v for k, v in changes.items() if v}})
+    return targets
+
+
+def client_token(batch_id, key):
+    """行的幂等键：同一批次中同一行 (内容不变) 总是得到同一个 client_token"""
+    return hashlib.sha1(f"{batch_id}|{key}".encode("utf-8")).hexdigest()
+
+
+def resolve_assignees(client, rows):
+    """
+    一次批量解析所有行的负责人
+    :return: {原始值: open_id 或 None (找不到)}
+    """
+    values = {value for _, _, task in rows for value in task["assignees"]}
+    if not values:
+        return {}
+    return get_identity_resolver().resolve(client.app_id, client._get_tenant_access_token, values)
+
+
+def create_one(client, key, row, task, open_ids, token):
+    """创建一个任务，返回清单记录"""
+    record = {"key": key, "row": row, "summary": task["summary"], "guid": None,
+              "status": "failed", "client_token": token, "error": None}
+
+    missing = [value for value in task["assignees"] if not open_ids.get(value)]
+    if missing:
+        record["error"] = f"User not found: {', '.join(missing)}"
+        return record
+    members = [{"id": open_id, "type": "user", "role": "assignee"}
+               for open_id in dict.fromkeys(open_ids[value] for value in task["assignees"])] or None
+
+    resp_json = client.create_task(task["summary"], description=task["description"], due_timestamp=task["due"],
+                                   members=members, client_token=token)
+    if not resp_json or resp_json.get("code") != 0:
+        record["error"] = f"{(resp_json or {}).get('code')}: {(resp_json or {}).get('msg')}"
+        return record
+    record.update(guid=resp_json.get("data", {}).get("task", {}).get("guid"), status="created")
+    return record
+
+
+def import_tasks(client, rows, manifest_path, batch_id, workers=DEFAULT_WORKERS):
+    """
+    并发创建 rows 中的任务
+    :param client: FeishuTask
+    :param rows: 可迭代的 (key, 行号, task)
+    :param manifest_path: 清单文件，已完成的行会跳过
+    :param batch_id: 批次标识，参与计算 client_token
+    :return: {"created", "skipped", "failed", "seconds"}
+    """
+    previous = load_manifest(manifest_path)
+    stats = {"created": 0, "skipped": 0, "failed": 0}
+    pending = []
+    for key, row, task in rows:
+        prev = previous.get(key)
+        if prev and prev.get("status") == "created":
+            stats["skipped"] += 1
+        else:
+            pending.append((key, row, task))
+
+    started = time.time()
+    open_ids = resolve_assignees(client, pending)
+    manifest = Manifest(manifest_path)
+    stats_lock = threading.Lock()
+
+    def run(key, row, task):
+        token = client_token(batch_id, key)
+        try:
+            record = create_one(client, key, row, task, open_ids, token)
+        except Exception as e:
+            record = {"key": key, "row": row, "summary": task["summary"], "guid": None,
+                      "status": "failed", "client_token": token, "error": str(e)}
+        manifest.write(record)
+        with stats_lock:
+            if record["status"] == "created":
+                stats["created"] += 1
+            else:
+                stats["failed"] += 1
+                print(f"❌ 第 {row} 行 {task['summary']}: {record['error']}", flush=True)
+            done = stats["created"] + stats["failed"]
+            if done % 50 == 0:
+                print(f"⏳ 已处理 {done} 个任务, {time.time() - started:.1f}s", flush=True)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for key, row, task in pending:
+                # 带上调用方的上下文，工作线程中的请求在指标中归属到调用方 (如 FeishuTask.bulk_create_tasks)
+                pool.submit(contextvars.copy_context().run, run, key, row, task)
+    finally:
+        manifest.close()
+    stats["seconds"] = round(time.time() - started, 2)
+    return stats
@@ -0,0 +1,249 @@
+"""
+本地任务库 (SQLite)
+
+FeishuTask.sync_tasks() 把任务列表镜像到本地，「哪些任务逾期了」「本周完成了哪些」这类查询直接读磁盘：
+- tasks 表按 guid 存储任务，状态、截止时间、完成时间、创建人均有索引，原始 JSON 保存在 data 列
+- task_members 表保存任务成员 (id, role)，按成员过滤时走索引
+- sync_state 表记录每种列表 (scope) 上次同步的时间
+- 任务接口没有按更新时间增量拉取的参数，同步时仍需翻页取完列表，但只写入 updated_at 变化的任务；
+  完整取完列表后，本地有而列表中没有的任务视为已删除
+- FeishuTask 在创建、修改、完成、删除任务时也会顺带写入；synced_at 为最近一次从接口确认该任务的时间，
+  update_task(skip_unchanged=True) 以足够新的记录为快照，只发送真正变化的字段
+- 使用 WAL 模式，同步写入时其他进程仍可读取
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+TASK_DB_FILE = os.path.expanduser(os.environ.get("FEISHU_TASK_DB", "~/.feishu_tasks.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    guid TEXT PRIMARY KEY,
+    summary TEXT,
+    description TEXT,
+    status TEXT,
+    due_ts INTEGER,
+    completed_ts INTEGER,
+    created_ts INTEGER,
+    updated_ts INTEGER,
+    creator_id TEXT,
+    data TEXT NOT NULL,
+    synced_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (status, due_ts);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed_ts);
+CREATE INDEX IF NOT EXISTS idx_tasks_creator ON tasks (creator_id);
+CREATE TABLE IF NOT EXISTS task_members (
+    guid TEXT NOT NULL,
+    member_id TEXT NOT NULL,
+    role TEXT,
+    PRIMARY KEY (guid, member_id, role)
+);
+CREATE INDEX IF NOT EXISTS idx_task_members ON task_members (member_id, role);
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    synced_at INTEGER
+);
+"""
+
+# 可按状态过滤的取值；overdue 为未完成且已过截止时间
+STATUSES = ("todo", "done", "overdue")
+
+
+def _ms(value):
+    """接口中的毫秒时间戳字符串 -> int，"0" / 空为 None"""
+    try:
+        value = int(value or 0)
+    except (TypeError, ValueError):
+        return None
+    return value or None
+
+
+def task_version(task):
+    """任务的 updated_at (毫秒)，同步时与本地记录比较，判断任务是否变化"""
+    return _ms(task.get("updated_at"))
+
+
+def task_row(task):
+    """接口返回的任务 -> tasks 表的一行"""
+    completed_ts = _ms(task.get("completed_at"))
+    return (
+        task["guid"],
+        task.get("summary"),
+        task.get("description"),
+        "done" if completed_ts or task.get("status") == "done" else "todo",
+        _ms((task.get("due") or {}).get("timestamp")),
+        completed_ts,
+        _ms(task.get("created_at")),
+        task_version(task),
+        (task.get("creator") or {}).get("id"),
+        json.dumps(task, ensure_ascii=False),
+        int(time.time()),
+    )
+
+
+def diff_task(snapshot, task_data):
+    """
+    与快照比较，只保留真正变化的字段
+    :param task_data: PATCH 请求中的 task 字段，如 {"summary": ..., "due": {"timestamp": ..., "is_all_day": False}}
+    :return: 变化的字段 (dict)，没有变化时为空
+    """
+    changed = {}
+    for field, value in task_data.items():
+        current = snapshot.get(field)
+        if field == "due" and current:
+            same = (str(current.get("timestamp")) == str(value.get("timestamp"))
+                    and bool(current.get("is_all_day")) == bool(value.get("is_all_day")))
+        else:
+            same = current == value
+        if not same:
+            changed[field] = value
+    return changed
+
+
+class TaskStore:
+    def __init__(self, path=TASK_DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        os.chmod(path, 0o600)
+
+    def close(self):
+        self.conn.close()
+
+    def transaction(self):
+        """
+        with store.transaction(): ... 期间的修改一起提交，出错时全部回滚
+        """
+        return _Transaction(self.conn)
+
+    # --- 同步 ---
+
+    def last_synced_at(self, scope="all"):
+        row = self.conn.execute("SELECT synced_at FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return row["synced_at"] if row else None
+
+    def set_synced(self, scope="all"):
+        self.conn.execute("INSERT OR REPLACE INTO sync_state (scope, synced_at) VALUES (?, ?)",
+                          (scope, int(time.time())))
+
+    def versions(self):
+        """{guid: updated_ts}，同步时据此跳过未变化的任务"""
+        return {row["guid"]: row["updated_ts"] for row in self.conn.execute("SELECT guid, updated_ts FROM tasks")}
+
+    def upsert(self, tasks):
+        """按 guid 覆盖写入一批任务 (连同成员)，返回写入数"""
+        rows = [task_row(task) for task in tasks if task and task.get("guid")]
+        if not rows:
+            return 0
+        guids = [(row[0],) for row in rows]
+        members = [
+            (task["guid"], member["id"], member.get("role"))
+            for task in tasks if task and task.get("guid")
+            for member in task.get("members") or [] if member.get("id")
+        ]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO tasks (guid, summary, description, status, due_ts, completed_ts, created_ts, "
+            "updated_ts, creator_id, data, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.executemany("DELETE FROM task_members WHERE guid = ?", guids)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO task_members (guid, member_id, role) VALUES (?, ?, ?)", members)
+        return len(rows)
+
+    def touch(self, guids):
+        """同步时内容未变化的任务，只更新 synced_at (快照仍然可信)"""
+        now = int(time.time())
+        self.conn.executemany("UPDATE tasks SET synced_at = ? WHERE guid = ?", [(now, guid) for guid in guids])
+
+    def delete(self, guids):
+        """删除一批任务，返回删除数"""
+        params = [(guid,) for guid in guids]
+        if not params:
+            return 0
+        self.conn.executemany("DELETE FROM task_members WHERE guid = ?", params)
+        before = self.conn.total_changes
+        self.conn.executemany("DELETE FROM tasks WHERE guid = ?", params)
+        return self.conn.total_changes - before
+
+    # --- 查询 ---
+
+    def query(self, status=None, due_from=None, due_to=None, completed_from=None, completed_to=None,
+              creator=None, member=None, role=None, text=None, limit=None, now_ms=None):
+        """
+        按条件过滤本地任务，时间均为毫秒时间戳，区间为 [from, to)
+        :param status: "todo" / "done" / "overdue" (未完成且截止时间早于 now_ms)
+        :param creator: 创建人 open_id
+        :param member: 成员 open_id，可配合 role ("assignee" / "follower") 只看某种角色
+        :param text: 标题或描述包含的关键词 (空格分隔，需全部匹配)
+        :return: 生成器，任务原始 JSON；有截止时间的按截止时间排序，其余按创建时间排在后面
+        """
+        sql = "SELECT t.data FROM tasks t"
+        where = []
+        params = []
+        if member:
+            sql += " JOIN task_members m ON m.guid = t.guid AND m.member_id = ?"
+            params.append(member)
+            if role:
+                sql += " AND m.role = ?"
+                params.append(role)
+        if status == "overdue":
+            where.append("t.status = 'todo' AND t.due_ts < ?")
+            params.append(now_ms if now_ms is not None else int(time.time() * 1000))
+        elif status:
+            where.append("t.status = ?")
+            params.append(status)
+        for column, lower, upper in (("due_ts", due_from, due_to), ("completed_ts", completed_from, completed_to)):
+            if lower is not None:
+                where.append(f"t.{column} >= ?")
+                params.append(lower)
+            if upper is not None:
+                where.append(f"t.{column} < ?")
+                params.append(upper)
+        if creator:
+            where.append("t.creator_id = ?")
+            params.append(creator)
+        for term in (text or "").split():
+            where.append("(t.summary LIKE ? OR t.description LIKE ?)")
+            params += [f"%{term}%"] * 2
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY t.guid" if member and not role else ""
+        sql += " ORDER BY t.due_ts IS NULL, t.due_ts, t.created_ts"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield json.loads(row["data"])
+
+    def get(self, guid, max_age=None):
+        """
+        :param max_age: 秒，只返回在这段时间内从接口确认过的任务 (用作修改前比较的快照)，否则返回 None
+        """
+        sql = "SELECT data FROM tasks WHERE guid = ?"
+        params = [guid]
+        if max_age is not None:
+            sql += " AND synced_at >= ?"
+            params.append(int(time.time()) - max_age)
+        row = self.conn.execute(sql, params).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # IMMEDIATE：开始时即获取写锁，避免两个同步进程交错写入
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,12 @@
+"""
+开放平台接口地址
+
+默认指向线上飞书开放平台与火山方舟，设置环境变量后可指向本地 mock 服务 (见 benchmarks/mock_feishu_server.py)：
+- FEISHU_API_BASE: 默认 https://open.feishu.cn/open-apis
+- ARK_API_BASE: 默认 https://ark.cn-beijing.volces.com/api/v3
+"""
+
+import os
+
+FEISHU_API_BASE = os.environ.get("FEISHU_API_BASE", "https://open.feishu.cn/open-apis").rstrip("/")
+ARK_API_BASE = os.environ.get("ARK_API_BASE", "https://ark.cn-beijing.volces.com/api/v3").rstrip("/")
@@ -0,0 +1,287 @@
+"""
+共享的异步 HTTP 传输层 (基于 aiohttp)
+
+供 AsyncFeishuCalendar / AsyncFeishuTask / AsyncFeishuDrive / AsyncFeishuCard / AsyncVolcengineVision 使用：
+- 同一事件循环内所有异步客户端共用一个 aiohttp.ClientSession (连接池 + keep-alive)
+- tenant_access_token 与同步客户端共用 token_store 的跨进程缓存，
+  同一 app_id 在一个事件循环内只会有一个协程去刷新
+- 与同步传输层共用 request_scheduler 的令牌桶与退避重试策略，并同样记录 metrics、使用 response_cache；
+  token 失效时同样换用新 token 重放一次
+
+依赖: pip install aiohttp
+"""
+
+import asyncio
+import json
+import os
+import time
+import weakref
+from urllib.parse import urlencode
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from http_transport import DEFAULT_TIMEOUT, swap_authorization
+from request_scheduler import get_scheduler, rewind_files
+from token_store import get_token_store
+from metrics import record_request
+from response_cache import get_response_cache, cache_key
+
+# 连接池总大小 / 每个 host 的最大并发连接数
+DEFAULT_ASYNC_LIMIT = int(os.environ.get("SKILL_ASYNC_HTTP_LIMIT", 1000))
+DEFAULT_ASYNC_LIMIT_PER_HOST = int(os.environ.get("SKILL_ASYNC_HTTP_LIMIT_PER_HOST", 200))
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+
+class AsyncHTTPError(Exception):
+    """HTTP 状态码 >= 400 (对应 requests 的 raise_for_status)"""
+
+    def __init__(self, status_code, url, body):
+        super().__init__(f"{status_code} Error for url: {url}")
+        self.status_code = status_code
+        self.url = url
+        self.body = body
+
+
+class AsyncResponse:
+    """与 requests.Response 用法相近的响应对象，body 已完整读取"""
+
+    def __init__(self, status_code, headers, content, url):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise AsyncHTTPError(self.status_code, self.url, self.text)
+
+
+def _estimate_body_size(json_body, data, files):
+    """aiohttp 不暴露最终的请求体，按参数估算发送字节数 (multipart 不含分隔符开销)"""
+    size = 0
+    if json_body is not None:
+        size += len(json.dumps(json_body).encode("utf-8"))
+    if isinstance(data, dict):
+        size += len(urlencode(data).encode("utf-8"))
+    elif isinstance(data, (bytes, str)):
+        size += len(data)
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        try:
+            size += os.fstat(fileobj.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            pass
+    return size
+
+
+class AsyncHttpTransport:
+    def __init__(self, limit=DEFAULT_ASYNC_LIMIT, limit_per_host=DEFAULT_ASYNC_LIMIT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT):
+        """
+        :param limit: 连接池总连接数上限
+        :param limit_per_host: 每个 host 的并发连接数上限
+        :param timeout: 默认超时，单个数字 (总超时) 或 (connect, read) 元组
+        :param keepalive_timeout: 空闲连接保留时间 (秒)
+        """
+        if aiohttp is None:
+            raise ImportError("Async clients require aiohttp. Please run: pip install aiohttp")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._loop = None
+
+    def _get_session(self):
+        # ClientSession 绑定在创建它的事件循环上，切换事件循环时重建
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    def _client_timeout(self, timeout):
+        if isinstance(timeout, (tuple, list)):
+            connect, read = timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=timeout)
+
+    async def request(self, method, url, params=None, json=None, data=None, files=None, headers=None,
+                      timeout=None, idempotent=None, cache=True):
+        """
+        发送请求，参数与 requests 保持一致
+        :param files: {"field": file_obj 或 (filename, file_obj)}，与 data 一起以 multipart/form-data 发送
+        :param idempotent: 请求是否可安全重放。默认按 HTTP 方法判断 (POST 视为不可重放，5xx 不重试)
+        :param cache: 启用了 response_cache 时，GET 请求是否使用缓存
+        """
+        response_cache = get_response_cache()
+        send_args = (method, url, params, json, data, files, headers, timeout, idempotent)
+        if response_cache is None:
+            return await self._send_with_retries(*send_args)
+
+        if method.upper() != "GET":
+            try:
+                return await self._send_with_retries(*send_args)
+            finally:
+                response_cache.invalidate(url)
+
+        key = cache_key(url, params, headers)
+        if cache:
+            cached = response_cache.get(key)
+            if cached:
+                status, cached_headers, content = cached
+                cached_headers["X-Skill-Cache"] = "HIT"
+                return AsyncResponse(status, cached_headers, content, url)
+        response = await self._send_with_retries(*send_args)
+        response_cache.put(key, url, response.status_code, response.headers, response.content)
+        return response
+
+    async def _send_with_retries(self, method, url, params, json, data, files, headers, timeout, idempotent):
+        """按调度器限流发送，限流 / 5xx / 网络错误时退避重试"""
+        headers = swap_authorization(headers) or headers
+        scheduler = get_scheduler()
+        bucket = scheduler.bucket_for(url)
+        started = time.perf_counter()
+        attempt = 0
+        token_refreshed = False
+        while True:
+            await bucket.acquire_async()
+            try:
+                response = await self._send(method, url, params, json, data, files, headers, timeout)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= scheduler.max_retries or not scheduler.is_idempotent(method, idempotent):
+                    record_request(method, url, started, retries=attempt, error=type(e).__name__)
+                    raise
+                delay = scheduler.retry_delay(attempt)
+            else:
+                if not token_refreshed and scheduler.is_token_invalid(response.content):
+                    token_refreshed = True
+                    # 刷新需要持有跨进程文件锁，放到线程中执行以免阻塞事件循环
+                    new_headers = await asyncio.get_running_loop().run_in_executor(
+                        None, lambda: swap_authorization(headers, refresh=True))
+                    if new_headers:
+                        headers = new_headers
+                        rewind_files(files)
+                        continue
+                if attempt >= scheduler.max_retries or \
+                        not scheduler.should_retry(method, response.status_code, response.content, idempotent):
+                    record_request(method, url, started, response.status_code, response.content,
+                                   _estimate_body_size(json, data, files), attempt)
+                    return response
+                delay = scheduler.retry_delay(attempt, response.headers)
+                if scheduler.is_throttled(response.status_code, response.content):
+                    bucket.pause(delay)
+            await asyncio.sleep(delay)
+            rewind_files(files)
+            attempt += 1
+
+    async def _send(self, method, url, params, json, data, files, headers, timeout):
+        session = self._get_session()
+        if files:
+            # FormData 只能发送一次，每次重试都重新构造
+            form = aiohttp.FormData()
+            for key, value in (data or {}).items():
+                form.add_field(key, str(value))
+            for key, value in files.items():
+                filename, fileobj = value if isinstance(value, tuple) else (os.path.basename(getattr(value, "name", key)), value)
+                form.add_field(key, fileobj, filename=filename)
+            data = form
+
+        async with session.request(
+            method, url,
+            params=params,
+            json=json,
+            data=data,
+            headers=headers,
+            timeout=self._client_timeout(timeout or self.timeout)
+        ) as resp:
+            content = await resp.read()
+            return AsyncResponse(resp.status, dict(resp.headers), content, str(resp.url))
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url, **kwargs):
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+_default_async_transport = None
+
+
+def get_async_transport():
+    """进程内共享的异步传输层单例"""
+    global _default_async_transport
+    if _default_async_transport is None:
+        _default_async_transport = AsyncHttpTransport()
+    return _default_async_transport
+
+
+def configure_async_transport(**kwargs):
+    """
+    使用新的参数创建共享异步传输层 (参数同 AsyncHttpTransport)
+    旧的 session 需由调用方在事件循环内 await close_async_transport() 关闭
+    """
+    global _default_async_transport
+    _default_async_transport = AsyncHttpTransport(**kwargs)
+    return _default_async_transport
+
+
+async def close_async_transport():
+    """在事件循环结束前调用，释放连接池"""
+    if _default_async_transport is not None:
+        await _default_async_transport.close()
+
+
+# 每个事件循环、每个 app_id 一把锁，保证并发协程只触发一次 token 刷新
+_refresh_locks = weakref.WeakKeyDictionary()
+
+
+async def get_tenant_access_token_async(app_id, app_secret):
+    """
+    异步获取 tenant_access_token (与同步客户端共用 token_store 缓存)
+    :return: (token, expire_at)
+    """
+    if not app_id or not app_secret:
+        raise ValueError("App ID and App Secret are required.")
+
+    store = get_token_store()
+    cached = store.peek(app_id, app_secret)
+    if cached:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    locks = _refresh_locks.setdefault(loop, {})
+    lock = locks.setdefault(app_id, asyncio.Lock())
+    async with lock:
+        cached = store.peek(app_id)
+        if cached:
+            return cached
+        # 刷新需要持有跨进程文件锁，放到线程中执行以免阻塞事件循环 (约两小时一次)
+        return await loop.run_in_executor(None, store.get_token, app_id, app_secret)
@@ -0,0 +1,56 @@
+"""
+skill_daemon 与 skill_run 之间的通信协议
+
+Unix domain socket 上每个连接一问一答，消息为单行 JSON (以换行结尾)：
+- 请求: {"command": "run", "script": 脚本绝对路径, "argv": [...], "cwd": 工作目录}
+       {"command": "ping"} / {"command": "shutdown"}
+- 响应: {"ok": true, "stdout": ..., "stderr": ..., "exit_code": 0, ...}
+
+本模块只依赖标准库，shim 导入它不会拖慢启动。
+"""
+
+import json
+import os
+import socket
+
+SOCKET_PATH = os.environ.get("SKILL_DAEMON_SOCKET", os.path.expanduser("~/.trae_skill_daemon.sock"))
+LOG_FILE = os.path.expanduser("~/.trae_skill_daemon.log")
+CONNECT_TIMEOUT = 0.5
+
+
+def send_message(sock, message):
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def recv_message(sock):
+    buffer = bytearray()
+    while not buffer.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+    if not buffer:
+        return None
+    return json.loads(buffer.decode("utf-8"))
+
+
+def request(message, socket_path=SOCKET_PATH, timeout=None):
+    """
+    向 daemon 发送一条请求并等待响应
+    daemon 未运行时返回 None (调用方应回退到进程内执行)
+    """
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError, socket.timeout):
+            return None
+        # 连接建立后等待脚本执行完成，不设超时 (或使用调用方指定的超时)
+        sock.settimeout(timeout)
+        send_message(sock, message)
+        return recv_message(sock)
+    finally:
+        sock.close()
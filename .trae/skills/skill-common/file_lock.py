@@ -0,0 +1,30 @@
+"""
+跨进程文件锁 (token_store、response_cache 等共享的本地文件缓存使用)
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为仅进程内加锁
+    fcntl = None
+
+
+class FileLock:
+    """基于 fcntl.flock 的跨进程互斥锁"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
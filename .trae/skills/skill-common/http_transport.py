@@ -0,0 +1,187 @@
+"""
+共享的 HTTP 传输层 (连接池 + keep-alive + 默认超时)
+
+所有 Skill 客户端都通过 get_transport() 发送请求，而不是直接调用 requests.get/post：
+- 每个 host 维护一个连接池，连续的调用 (如 create_event -> _add_attendees) 复用已建立的 TCP/TLS 连接
+- 统一的默认超时，避免请求无限挂起
+- 可通过 configure_transport() 或环境变量调整连接池大小与超时
+- 每个请求都经过 request_scheduler：按 API 分组限流，限流 / 5xx 时自动退避重试
+- 接口返回 token 失效时，通过 token_store 作废缓存、换用新 token 重放一次请求
+- 每个请求 (含重试) 结束时记录到 metrics：状态码、飞书 code、字节数、重试次数、耗时
+- 启用 response_cache 时，GET 响应在 TTL 内直接从缓存返回，写操作后作废相关资源的缓存
+"""
+
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from request_scheduler import get_scheduler, rewind_files
+from metrics import record_request, body_size
+from response_cache import get_response_cache, cache_key
+
+# (连接超时, 读取超时)，单位秒
+DEFAULT_TIMEOUT = (
+    float(os.environ.get("SKILL_HTTP_CONNECT_TIMEOUT", 5)),
+    float(os.environ.get("SKILL_HTTP_READ_TIMEOUT", 60)),
+)
+# 缓存的 host 连接池个数 / 每个 host 的最大连接数
+DEFAULT_POOL_CONNECTIONS = int(os.environ.get("SKILL_HTTP_POOL_CONNECTIONS", 10))
+DEFAULT_POOL_MAXSIZE = int(os.environ.get("SKILL_HTTP_POOL_MAXSIZE", 20))
+
+
+class HttpTransport:
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 timeout=DEFAULT_TIMEOUT):
+        """
+        :param pool_connections: 缓存的 host 连接池个数
+        :param pool_maxsize: 每个 host 连接池保留的最大连接数 (并发请求超过时会临时新建连接)
+        :param timeout: 默认超时，单个数字或 (connect, read) 元组
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, idempotent=None, cache=True, **kwargs):
+        """
+        发送请求，参数同 requests.Session.request
+        :param idempotent: 请求是否可安全重放。默认按 HTTP 方法判断 (POST 视为不可重放，5xx 不重试)
+        :param cache: 启用了 response_cache 时，GET 请求是否使用缓存
+        """
+        response_cache = get_response_cache()
+        if response_cache is None:
+            return self._send(method, url, idempotent, kwargs)
+
+        if method.upper() != "GET":
+            try:
+                return self._send(method, url, idempotent, kwargs)
+            finally:
+                response_cache.invalidate(url)
+
+        key = cache_key(url, kwargs.get("params"), kwargs.get("headers"))
+        if cache:
+            cached = response_cache.get(key)
+            if cached:
+                return _cached_response(url, *cached)
+        response = self._send(method, url, idempotent, kwargs)
+        response_cache.put(key, url, response.status_code, response.headers, response.content)
+        return response
+
+    def _send(self, method, url, idempotent, kwargs):
+        """按调度器限流发送，限流 / 5xx / 网络错误时退避重试"""
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs["headers"] = swap_authorization(kwargs.get("headers")) or kwargs.get("headers")
+        scheduler = get_scheduler()
+        bucket = scheduler.bucket_for(url)
+        started = time.perf_counter()
+        attempt = 0
+        token_refreshed = False
+        while True:
+            bucket.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= scheduler.max_retries or not scheduler.is_idempotent(method, idempotent):
+                    record_request(method, url, started, retries=attempt, error=type(e).__name__)
+                    raise
+                delay = scheduler.retry_delay(attempt)
+            else:
+                if not token_refreshed and scheduler.is_token_invalid(response.content):
+                    # 只换一次 token：新 token 仍被拒绝时原样返回
+                    token_refreshed = True
+                    headers = swap_authorization(kwargs.get("headers"), refresh=True)
+                    if headers:
+                        kwargs["headers"] = headers
+                        rewind_files(kwargs.get("files"))
+                        continue
+                if attempt >= scheduler.max_retries or \
+                        not scheduler.should_retry(method, response.status_code, response.content, idempotent):
+                    record_request(method, url, started, response.status_code, response.content,
+                                   body_size(response.request.body), attempt)
+                    return response
+                delay = scheduler.retry_delay(attempt, response.headers)
+                if scheduler.is_throttled(response.status_code, response.content):
+                    bucket.pause(delay)
+            time.sleep(delay)
+            rewind_files(kwargs.get("files"))
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def swap_authorization(headers, refresh=False):
+    """
+    把请求头中的 Bearer token 换成 token_store 中的新 token
+    :param refresh: True 表示接口刚判定该 token 失效，先作废缓存并重新获取
+    :return: 新的请求头；没有 token 或无需替换时返回 None
+    """
+    auth = (headers or {}).get("Authorization") or ""
+    if not auth.startswith("Bearer "):
+        return None
+    # token_store 依赖本模块，在用到时再导入
+    from token_store import get_token_store
+    token = auth[len("Bearer "):]
+    store = get_token_store()
+    new_token = store.refresh_invalid(token) if refresh else store.current(token)
+    if not new_token or new_token == token:
+        return None
+    headers = dict(headers)
+    headers["Authorization"] = f"Bearer {new_token}"
+    return headers
+
+
+def _cached_response(url, status, headers, content):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.headers["X-Skill-Cache"] = "HIT"
+    response._content = content
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+_default_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """进程内共享的传输层单例"""
+    global _default_transport
+    if _default_transport is None:
+        with _transport_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport()
+    return _default_transport
+
+
+def configure_transport(**kwargs):
+    """
+    使用新的参数重建共享传输层 (参数同 HttpTransport)
+    例如: configure_transport(pool_maxsize=50, timeout=(3, 30))
+    """
+    global _default_transport
+    with _transport_lock:
+        old = _default_transport
+        _default_transport = HttpTransport(**kwargs)
+    if old is not None:
+        old.close()
+    return _default_transport
@@ -0,0 +1,213 @@
+"""
+手机号 / 邮箱 -> open_id 解析 (批量 + 跨进程缓存)
+
+所有飞书 Skill 客户端 (calendar 参与人、tasks 成员、drive 共享、cards 接收者) 通过本模块解析用户：
+- 未命中缓存的手机号与邮箱合并为 contact/v3/users/batch_get_id 请求，每次最多 50 个手机号 + 50 个邮箱
+- 结果缓存在 ~/.feishu_identity_cache.json (按 app_id 区分，open_id 在不同应用下不同)，默认 7 天；
+  查无此人的结果缓存 1 小时，避免反复查询
+- 写入时持有文件锁并合并其他进程的结果，使用临时文件 + os.replace
+TTL 可通过环境变量 FEISHU_IDENTITY_CACHE_TTL / FEISHU_IDENTITY_NEGATIVE_TTL (秒) 调整。
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+from api_base import FEISHU_API_BASE
+from file_lock import FileLock
+from http_transport import get_transport
+
+IDENTITY_CACHE_FILE = os.path.expanduser("~/.feishu_identity_cache.json")
+IDENTITY_CACHE_TTL = int(os.environ.get("FEISHU_IDENTITY_CACHE_TTL", 7 * 24 * 3600))
+NEGATIVE_CACHE_TTL = int(os.environ.get("FEISHU_IDENTITY_NEGATIVE_TTL", 3600))
+BATCH_GET_ID_URL = f"{FEISHU_API_BASE}/contact/v3/users/batch_get_id"
+# batch_get_id 单次请求的上限
+MAX_BATCH_SIZE = 50
+
+_MOBILE = re.compile(r"^\+?\d{7,15}$")
+
+
+def classify(value):
+    """
+    :return: ("mobile" | "email" | "open_id", 规范化后的值)
+    手机号去掉空格与连字符；其余既不是手机号也不是邮箱的值视为 open_id 原样返回
+    """
+    value = value.strip()
+    if "@" in value:
+        return "email", value.lower()
+    compact = re.sub(r"[\s-]", "", value)
+    if _MOBILE.match(compact):
+        return "mobile", compact
+    return "open_id", value
+
+
+class IdentityNotFoundError(ValueError):
+    """部分手机号 / 邮箱在通讯录中找不到"""
+
+    def __init__(self, values):
+        super().__init__(f"User not found: {', '.join(values)}")
+        self.values = values
+
+
+class IdentityResolver:
+    def __init__(self, path=IDENTITY_CACHE_FILE, ttl=IDENTITY_CACHE_TTL, negative_ttl=NEGATIVE_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = {}  # app_id -> {"mobile:138...": {"open_id": ..., "expire_at": ...}}
+        self._thread_lock = threading.Lock()
+
+    def resolve(self, app_id, token, values):
+        """
+        批量解析
+        :param token: tenant_access_token，或返回 token 的函数 (全部命中缓存时不会调用)
+        :return: {原始值: open_id 或 None (查无此人)}，open_id 原样映射到自身
+        """
+        result = {}
+        pending = {}  # 缓存键 -> [原始值]
+        for value in dict.fromkeys(v for v in values if v):
+            kind, normalized = classify(value)
+            if kind == "open_id":
+                result[value] = value
+                continue
+            key = f"{kind}:{normalized}"
+            entry = self._lookup(app_id, key)
+            if entry is not None:
+                result[value] = entry["open_id"]
+            else:
+                pending.setdefault(key, []).append(value)
+
+        if pending:
+            token = token() if callable(token) else token
+            fetched = self._fetch(token, list(pending))
+            self._store(app_id, fetched)
+            for key, originals in pending.items():
+                for value in originals:
+                    result[value] = fetched.get(key)
+        return result
+
+    def resolve_one(self, app_id, token, value):
+        return self.resolve(app_id, token, [value]).get(value)
+
+    def resolve_open_ids(self, app_id, token, values, keep_unresolved_emails=False):
+        """
+        按输入顺序返回 open_id 列表 (去重)
+        :param keep_unresolved_emails: 通讯录中找不到的邮箱原样保留 (如日程可邀请外部邮箱)，否则视为找不到
+        :raise IdentityNotFoundError: 有手机号 / 邮箱找不到时
+        """
+        values = [v for v in values if v]
+        resolved = self.resolve(app_id, token, values)
+        open_ids = []
+        missing = []
+        for value in values:
+            open_id = resolved.get(value)
+            if open_id is None and keep_unresolved_emails and "@" in value:
+                open_id = value.strip()
+            if open_id is None:
+                missing.append(value)
+            elif open_id not in open_ids:
+                open_ids.append(open_id)
+        if missing:
+            raise IdentityNotFoundError(missing)
+        return open_ids
+
+    def clear(self):
+        with self._thread_lock, FileLock(self.path + ".lock"):
+            self._memory = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    # --- 接口 ---
+
+    def _fetch(self, token, keys):
+        """:return: {缓存键: open_id 或 None}"""
+        mobiles = [k.split(":", 1)[1] for k in keys if k.startswith("mobile:")]
+        emails = [k.split(":", 1)[1] for k in keys if k.startswith("email:")]
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8"
+        }
+        found = {key: None for key in keys}
+        for i in range(0, max(len(mobiles), len(emails)), MAX_BATCH_SIZE):
+            payload = {}
+            if mobiles[i:i + MAX_BATCH_SIZE]:
+                payload["mobiles"] = mobiles[i:i + MAX_BATCH_SIZE]
+            if emails[i:i + MAX_BATCH_SIZE]:
+                payload["emails"] = emails[i:i + MAX_BATCH_SIZE]
+            # 只读查询，可以安全重试
+            response = get_transport().post(BATCH_GET_ID_URL, headers=headers, params={"user_id_type": "open_id"},
+                                            json=payload, idempotent=True)
+            resp_json = response.json()
+            if resp_json.get("code") != 0:
+                raise Exception(f"Get user id failed: {resp_json}")
+            for user in resp_json.get("data", {}).get("user_list") or []:
+                if user.get("mobile"):
+                    key = "mobile:" + classify(user["mobile"])[1]
+                else:
+                    key = "email:" + (user.get("email") or "").lower()
+                if key in found and user.get("user_id"):
+                    found[key] = user["user_id"]
+        return found
+
+    # --- 缓存 ---
+
+    def _lookup(self, app_id, key):
+        entry = self._valid_entry(self._memory.get(app_id, {}).get(key))
+        if entry is None:
+            entries = self._read_file().get(app_id, {})
+            self._memory[app_id] = entries
+            entry = self._valid_entry(entries.get(key))
+        return entry
+
+    def _store(self, app_id, fetched):
+        now = time.time()
+        new_entries = {
+            key: {"open_id": open_id, "expire_at": now + (self.ttl if open_id else self.negative_ttl)}
+            for key, open_id in fetched.items()
+        }
+        with self._thread_lock, FileLock(self.path + ".lock"):
+            # 锁内重新读取，合并其他进程写入的结果
+            cache = self._read_file()
+            cache.setdefault(app_id, {}).update(new_entries)
+            self._write_file(cache)
+            self._memory[app_id] = cache[app_id]
+
+    def _valid_entry(self, entry):
+        if entry and time.time() < entry.get("expire_at", 0):
+            return entry
+        return None
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _write_file(self, cache):
+        # 只保留未过期的条目，避免文件无限增长
+        cache = {
+            app_id: {k: v for k, v in entries.items() if self._valid_entry(v)}
+            for app_id, entries in cache.items()
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.path)
+
+
+_default_resolver = None
+
+
+def get_identity_resolver():
+    """进程内单例，配合文件缓存在进程之间共享解析结果"""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = IdentityResolver()
+    return _default_resolver
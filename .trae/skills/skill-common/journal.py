@@ -0,0 +1,68 @@
+"""
+批量操作的进度清单 (journal)
+
+批量创建日程 (feishu-calendar/event_import.py) 与批量创建任务 (feishu-tasks/task_import.py) 共用：
+每处理完一行立即追加一条 JSON 记录并落盘，中断后重新运行时读取清单，跳过已完成的行。
+同一行以最后一条记录为准，写了一半的行 (进程在写入时被杀) 忽略。
+"""
+
+import collections
+import hashlib
+import json
+import os
+import threading
+
+
+def row_key(prefix, row):
+    """清单中的行标识：输入内容的摘要，输入文件改动后对应行会重新处理"""
+    content = json.dumps(row, sort_keys=True, ensure_ascii=False)
+    return f"{prefix}:{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}"
+
+
+class RowKeys:
+    """
+    按内容为输入文件的各行生成清单标识，不使用行号：在文件中插入 / 删除行后，其余行的标识不变
+    有 id 列时以 id 为前缀；内容 (及 id) 完全相同的行按出现顺序编号 (#2、#3 ...)
+    """
+
+    def __init__(self):
+        self._seen = collections.Counter()
+
+    def key(self, row, row_id=None):
+        key = row_key(f"id:{row_id}" if row_id else "row", row)
+        self._seen[key] += 1
+        count = self._seen[key]
+        return key if count == 1 else f"{key}#{count}"
+
+
+def load_manifest(path):
+    """读取已有清单 -> {key: 最后一条记录}"""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 中断时写了一半的行
+            done[record["key"]] = record
+    return done
+
+
+class Manifest:
+    """追加写入的结果清单，每条记录立即落盘"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,369 @@
+"""
+请求级指标采集与导出
+
+http_transport / async_transport 在每个请求结束时 (含重试) 调用 record_request()，记录：
+- 客户端方法 (如 FeishuCalendar.create_event，脚本直接发出的请求记为脚本名)、HTTP 方法、归一化后的接口路径
+- HTTP 状态码、飞书返回的 code、发送 / 接收字节数、重试次数、总耗时
+指标在进程内聚合为直方图，可导出为 JSON 或 Prometheus 文本格式：
+- 直接运行脚本时设置环境变量 SKILL_METRICS=json|prometheus (可选 SKILL_METRICS_FILE)，退出时输出
+- skill_run.py --metrics json|prometheus
+- skill_daemon.py metrics [--format prometheus] 查看守护进程累计的指标
+
+add_request_hook(fn) 可注册自定义回调，fn 收到每个请求的记录 (dict)。
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+# 延迟直方图的桶上界 (秒)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 当前正在执行的客户端方法，由 instrument_client 设置
+_current_operation = contextvars.ContextVar("skill_operation", default=None)
+
+# 只由小写字母 / 下划线 / 连字符组成的路径段视为固定路径，其余 (calendar_id、event_id、task guid、文件 token 等) 归一化为 :id
+_STATIC_SEGMENT = re.compile(r"^(?:[a-z_-]+|v\d+)$")
+# 飞书响应的 code 字段位于 JSON 开头，只在响应头部查找，避免解析大响应体
+_CODE_PATTERN = re.compile(rb'"code"\s*:\s*(-?\d+)')
+_CODE_SNIFF_BYTES = 256
+
+
+def current_operation():
+    """
+    当前请求所属的客户端方法；脚本直接发出的请求 (如 list.py 调用 get_transport())
+    以 "<skill>/<script.py>" 归类
+    """
+    operation = _current_operation.get()
+    if operation is None and sys.argv and sys.argv[0]:
+        script = os.path.abspath(sys.argv[0])
+        operation = f"{os.path.basename(os.path.dirname(script))}/{os.path.basename(script)}"
+    return operation
+
+
+def _wrap_method(name, func):
+    if inspect.isgeneratorfunction(func):
+        # 生成器在迭代时才发请求，每次取下一项时设置方法名，不影响消费方代码中的请求
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            generator = func(*args, **kwargs)
+            label = name if _current_operation.get() is None else _current_operation.get()
+            try:
+                while True:
+                    reset = _current_operation.set(label)
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        _current_operation.reset(reset)
+                    yield item
+            finally:
+                generator.close()
+        return generator_wrapper
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def async_generator_wrapper(*args, **kwargs):
+            generator = func(*args, **kwargs)
+            label = name if _current_operation.get() is None else _current_operation.get()
+            try:
+                while True:
+                    reset = _current_operation.set(label)
+                    try:
+                        item = await generator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        _current_operation.reset(reset)
+                    yield item
+            finally:
+                await generator.aclose()
+        return async_generator_wrapper
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            # 嵌套调用 (如 create_event 内部调用 list_calendars) 归属到最外层方法
+            if _current_operation.get() is not None:
+                return await func(*args, **kwargs)
+            reset = _current_operation.set(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _current_operation.reset(reset)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_operation.get() is not None:
+            return func(*args, **kwargs)
+        reset = _current_operation.set(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_operation.reset(reset)
+    return wrapper
+
+
+def instrument_client(cls):
+    """
+    类装饰器：为客户端类自身定义的公开方法标记方法名，
+    方法内发出的请求在指标中以 "<类名>.<方法名>" 归类
+    """
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attr):
+            continue
+        setattr(cls, name, _wrap_method(f"{cls.__name__}.{name}", attr))
+    return cls
+
+
+def normalize_endpoint(url):
+    """去掉 host 与查询参数，并把路径中的 ID 替换为 :id"""
+    path = urlparse(url).path
+    return "/".join(s if not s or _STATIC_SEGMENT.match(s) else ":id" for s in path.split("/"))
+
+
+def sniff_code(content):
+    """从响应体开头提取飞书 code，非 JSON 响应返回 None"""
+    if not content:
+        return None
+    match = _CODE_PATTERN.search(content[:_CODE_SNIFF_BYTES])
+    return int(match.group(1)) if match else None
+
+
+class _Series:
+    """同一 (operation, method, endpoint) 的聚合指标"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses = Counter()
+        self.codes = Counter()
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add(self, sample):
+        latency = sample["latency"]
+        self.count += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.statuses[str(sample["status"] or sample["error"] or "unknown")] += 1
+        if sample["code"] is not None:
+            self.codes[str(sample["code"])] += 1
+        if sample["error"] or (sample["status"] or 0) >= 400 or sample["code"]:
+            self.errors += 1
+        self.retries += sample["retries"]
+        self.bytes_sent += sample["bytes_sent"]
+        self.bytes_received += sample["bytes_received"]
+
+    def quantile(self, q):
+        """按直方图线性插值估算分位数 (秒)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.buckets):
+            upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.latency_max
+            if n and seen + n >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / n, self.latency_max)
+            seen += n
+            lower = upper
+        return self.latency_max
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.started_at = time.time()
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, sample):
+        key = (sample["operation"] or "-", sample["method"], sample["endpoint"])
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            series.add(sample)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self.started_at = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            items = sorted(self._series.items(), key=lambda kv: -kv[1].latency_sum)
+            return {
+                "started_at": self.started_at,
+                "requests": [
+                    {
+                        "operation": operation,
+                        "method": method,
+                        "endpoint": endpoint,
+                        "count": s.count,
+                        "errors": s.errors,
+                        "retries": s.retries,
+                        "bytes_sent": s.bytes_sent,
+                        "bytes_received": s.bytes_received,
+                        "latency_ms": {
+                            "avg": round(s.latency_sum / s.count * 1000, 2),
+                            "p50": round(s.quantile(0.5) * 1000, 2),
+                            "p90": round(s.quantile(0.9) * 1000, 2),
+                            "p99": round(s.quantile(0.99) * 1000, 2),
+                            "max": round(s.latency_max * 1000, 2),
+                        },
+                        "status": dict(s.statuses),
+                        "code": dict(s.codes),
+                    }
+                    for (operation, method, endpoint), s in items
+                ]
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP skill_request_duration_seconds Feishu/Ark API request latency including retries.",
+            "# TYPE skill_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self._series.items())
+            for key, s in items:
+                labels = _labels(key)
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), s.buckets):
+                    cumulative += n
+                    lines.append(f'skill_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"skill_request_duration_seconds_sum{{{labels}}} {s.latency_sum:.6f}")
+                lines.append(f"skill_request_duration_seconds_count{{{labels}}} {s.count}")
+
+            lines.append("# HELP skill_requests_total Requests by HTTP status and Feishu code.")
+            lines.append("# TYPE skill_requests_total counter")
+            for key, s in items:
+                labels = _labels(key)
+                for status, n in sorted(s.statuses.items()):
+                    lines.append(f'skill_requests_total{{{labels},status="{_escape(status)}"}} {n}')
+            lines.append("# TYPE skill_response_codes_total counter")
+            for key, s in items:
+                labels = _labels(key)
+                for code, n in sorted(s.codes.items()):
+                    lines.append(f'skill_response_codes_total{{{labels},code="{code}"}} {n}')
+
+            for name, attr in (("skill_request_retries_total", "retries"),
+                               ("skill_request_bytes_sent_total", "bytes_sent"),
+                               ("skill_request_bytes_received_total", "bytes_received")):
+                lines.append(f"# TYPE {name} counter")
+                for key, s in items:
+                    lines.append(f"{name}{{{_labels(key)}}} {getattr(s, attr)}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, format="json"):
+        return self.to_prometheus() if format == "prometheus" else self.to_json()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key):
+    operation, method, endpoint = key
+    return f'operation="{_escape(operation)}",method="{method}",endpoint="{_escape(endpoint)}"'
+
+
+_registry = MetricsRegistry()
+_hooks = []
+
+
+def get_metrics():
+    """进程内共享的指标注册表"""
+    return _registry
+
+
+def add_request_hook(fn):
+    """注册请求回调，fn(sample) 在每个请求结束时调用"""
+    _hooks.append(fn)
+    return fn
+
+
+def remove_request_hook(fn):
+    if fn in _hooks:
+        _hooks.remove(fn)
+
+
+def record_request(method, url, started, status=None, content=None, bytes_sent=0, retries=0, error=None):
+    """
+    由传输层在请求 (含重试) 结束时调用
+    :param started: time.perf_counter() 起始值
+    :param error: 未收到响应时的异常类名
+    """
+    sample = {
+        "operation": current_operation(),
+        "method": method.upper(),
+        "endpoint": normalize_endpoint(url),
+        "status": status,
+        "code": sniff_code(content),
+        "bytes_sent": bytes_sent,
+        "bytes_received": len(content) if content else 0,
+        "retries": retries,
+        "latency": time.perf_counter() - started,
+        "error": error,
+    }
+    _registry.record(sample)
+    for hook in list(_hooks):
+        try:
+            hook(sample)
+        except Exception:
+            pass
+    return sample
+
+
+def body_size(body):
+    """请求体字节数 (requests 的 PreparedRequest.body 可能是 str / bytes / 文件对象)"""
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    try:
+        return os.fstat(body.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def _dump_at_exit():
+    format = os.environ.get("SKILL_METRICS", "").lower()
+    if format not in ("json", "prometheus") or not _registry._series:
+        return
+    output = _registry.export(format)
+    path = os.environ.get("SKILL_METRICS_FILE")
+    if path:
+        with open(os.path.expanduser(path), "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        sys.stderr.write(output)
+
+
+atexit.register(_dump_at_exit)
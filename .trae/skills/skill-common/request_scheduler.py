@@ -0,0 +1,220 @@
+"""
+限流感知的请求调度器
+
+由 http_transport / async_transport 在每次请求前后调用：
+- 按 API 分组 (calendar / task / drive / docx / im / contact / ark ...) 维护令牌桶，控制各组 QPS
+- 遇到限流 (HTTP 429、飞书频控错误码) 或 5xx 时，按带抖动的指数退避自动重试
+- 响应头中带有 x-ogw-ratelimit-reset / Retry-After 时，按服务端给出的时间暂停整个分组
+
+QPS 可通过 configure_scheduler(qps={"calendar": 50}) 或环境变量 SKILL_QPS_<GROUP> (如 SKILL_QPS_CALENDAR=50) 调整。
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# 各 API 分组的默认 QPS (参考飞书开放平台各接口频控，取偏保守的值)，0 表示不限制
+DEFAULT_QPS = {
+    "auth": 10,
+    "calendar": 20,
+    "task": 20,
+    "drive": 5,
+    "docx": 3,
+    "sheets": 5,
+    "bitable": 10,
+    "im": 50,
+    "contact": 20,
+    "ark": 10,
+    "default": 20,
+}
+
+# 飞书频控错误码: 99991400 通用频控，230020 消息发送频控
+THROTTLE_CODES = {99991400, 230020}
+# tenant_access_token 失效的错误码：请求在鉴权时即被拒绝，换用新 token 后任何方法都可以安全重放
+INVALID_TOKEN_CODES = {99991661, 99991663, 99991668}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+DEFAULT_MAX_RETRIES = int(os.environ.get("SKILL_HTTP_MAX_RETRIES", 4))
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+
+# 限流错误的响应体都很小，超过这个大小的响应不再解析 JSON 检查错误码
+_MAX_SNIFF_BYTES = 4096
+
+
+class TokenBucket:
+    """线程安全的令牌桶，rate 为每秒补充的令牌数 (即 QPS)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """预留一个令牌，返回需要等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """服务端要求等待时，暂停整个分组"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RequestScheduler:
+    def __init__(self, qps=None, max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX):
+        """
+        :param qps: 覆盖默认 QPS 的字典，如 {"calendar": 50, "drive": 10}
+        :param max_retries: 限流 / 5xx / 网络错误的最大重试次数
+        """
+        self.qps = dict(DEFAULT_QPS)
+        for group in DEFAULT_QPS:
+            env_value = os.environ.get(f"SKILL_QPS_{group.upper()}")
+            if env_value:
+                self.qps[group] = float(env_value)
+        self.qps.update(qps or {})
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def group_for(self, url):
+        """
+        根据 URL 判断 API 分组
+        https://open.feishu.cn/open-apis/calendar/v4/... -> calendar
+        https://ark.cn-beijing.volces.com/api/v3/...   -> ark
+        """
+        parsed = urlparse(url)
+        if (parsed.hostname or "").startswith("ark.") or parsed.path.endswith("/chat/completions"):
+            return "ark"
+        parts = [p for p in parsed.path.split("/") if p]
+        if "open-apis" in parts:
+            index = parts.index("open-apis")
+            if index + 1 < len(parts) and parts[index + 1] in self.qps:
+                return parts[index + 1]
+        return "default"
+
+    def bucket_for(self, url):
+        group = self.group_for(url)
+        bucket = self._buckets.get(group)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(group)
+                if bucket is None:
+                    bucket = TokenBucket(self.qps.get(group, self.qps["default"]))
+                    self._buckets[group] = bucket
+        return bucket
+
+    def is_idempotent(self, method, idempotent=None):
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in IDEMPOTENT_METHODS
+
+    def is_throttled(self, status_code, content):
+        """HTTP 429 或响应体中的飞书频控错误码"""
+        if status_code == 429:
+            return True
+        return self._feishu_code(content) in THROTTLE_CODES
+
+    def is_token_invalid(self, content):
+        """响应体中的 token 失效错误码"""
+        return self._feishu_code(content) in INVALID_TOKEN_CODES
+
+    def should_retry(self, method, status_code, content, idempotent=None):
+        """
+        限流错误请求未被执行，任何方法都可以安全重试；
+        5xx 只对幂等请求重试 (POST 需调用方显式声明 idempotent=True)
+        """
+        if self.is_throttled(status_code, content):
+            return True
+        return status_code in RETRY_STATUS and self.is_idempotent(method, idempotent)
+
+    def retry_delay(self, attempt, headers=None):
+        """
+        第 attempt 次重试前的等待时间：带抖动的指数退避，
+        若响应头给出了限流重置时间则至少等待到重置
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)
+        reset = self._reset_seconds(headers or {})
+        if reset is not None:
+            delay = max(delay, min(reset, self.backoff_max))
+        return delay
+
+    def _reset_seconds(self, headers):
+        for name in ("x-ogw-ratelimit-reset", "Retry-After"):
+            value = headers.get(name) or headers.get(name.lower())
+            if value:
+                try:
+                    return max(0.0, float(value))
+                except ValueError:
+                    continue
+        return None
+
+    def _feishu_code(self, content):
+        if not content or len(content) > _MAX_SNIFF_BYTES or b'"code"' not in content:
+            return None
+        try:
+            return json.loads(content).get("code")
+        except Exception:
+            return None
+
+
+def rewind_files(files):
+    """重试前把上传文件的读指针移回开头"""
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek"):
+            fileobj.seek(0)
+
+
+_default_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """进程内共享的调度器 (同步与异步传输层共用同一组令牌桶)"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _scheduler_lock:
+            if _default_scheduler is None:
+                _default_scheduler = RequestScheduler()
+    return _default_scheduler
+
+
+def configure_scheduler(**kwargs):
+    """
+    使用新的参数重建共享调度器 (参数同 RequestScheduler)
+    例如: configure_scheduler(qps={"calendar": 50}, max_retries=6)
+    """
+    global _default_scheduler
+    with _scheduler_lock:
+        _default_scheduler = RequestScheduler(**kwargs)
+    return _default_scheduler
@@ -0,0 +1,214 @@
+"""
+读接口响应缓存 (可选，默认关闭)
+
+http_transport / async_transport 在启用后：
+- GET 请求按 (URL + 参数 + 鉴权身份) 缓存成功响应 (HTTP 200 且飞书 code 为 0)，TTL 内直接返回缓存
+- POST / PATCH / DELETE 等写操作发出后，作废同一资源下的缓存
+  (如 create_event / delete_event 作废 calendar/v4/calendars 下的 list_calendars 与日程列表，
+  move_file / delete_file 以及新建文档 / 表格作废 drive/v1/files 下的 list_files)
+- 内存中按 LRU 淘汰；可选持久化到磁盘，供多个进程共享
+
+启用方式：
+- 环境变量 SKILL_RESPONSE_CACHE=memory|disk，SKILL_RESPONSE_CACHE_TTL=60，SKILL_RESPONSE_CACHE_SIZE=512
+- 代码中 configure_response_cache(ttl=60, max_entries=512, persist_path=None)
+单个请求可传入 cache=False 跳过缓存。
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlparse
+
+from api_base import FEISHU_API_BASE
+from file_lock import FileLock
+from metrics import sniff_code
+
+DEFAULT_TTL = float(os.environ.get("SKILL_RESPONSE_CACHE_TTL", 60))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("SKILL_RESPONSE_CACHE_SIZE", 512))
+RESPONSE_CACHE_FILE = os.path.expanduser(
+    os.environ.get("SKILL_RESPONSE_CACHE_FILE", "~/.trae_skill_response_cache.json"))
+
+# 写操作除作废自身资源外，还会影响的其他资源 (新建文档 / 表格 / 多维表格会出现在云空间文件列表中)
+LINKED_SCOPES = {
+    "docx/v1/documents": ["drive/v1/files"],
+    "sheets/v3/spreadsheets": ["drive/v1/files"],
+    "bitable/v1/apps": ["drive/v1/files"],
+}
+
+_API_PREFIX = urlparse(FEISHU_API_BASE).path.rstrip("/")
+
+
+def resource_scope(url):
+    """
+    资源范围：接口路径的前三段 (<业务>/<版本>/<资源>)
+    例如 /open-apis/calendar/v4/calendars/xxx/events -> calendar/v4/calendars
+    """
+    path = urlparse(url).path
+    if _API_PREFIX and path.startswith(_API_PREFIX):
+        path = path[len(_API_PREFIX):]
+    return "/".join([s for s in path.split("/") if s][:3])
+
+
+def cache_key(url, params=None, headers=None):
+    """URL + 排序后的查询参数 + Authorization 摘要 (不同应用 / token 的结果互不混用，磁盘上不保存明文 token)"""
+    if isinstance(params, dict):
+        params = sorted((k, v) for k, v in params.items() if v is not None)
+    query = urlencode(params or [], doseq=True)
+    auth = ""
+    for name, value in (headers or {}).items():
+        if name.lower() == "authorization":
+            auth = hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+    return f"{url}?{query}#{auth}"
+
+
+class ResponseCache:
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, persist_path=None):
+        """
+        :param ttl: 缓存有效期 (秒)
+        :param max_entries: 最多缓存的响应数，超过后淘汰最久未使用的
+        :param persist_path: 持久化文件路径，为 None 时只缓存在内存中
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> {"expires_at", "scope", "status", "headers", "content"}
+        self._lock = threading.Lock()
+        self._file_mtime = None
+
+    def get(self, key):
+        """:return: (status, headers, content)，没有有效缓存时返回 None"""
+        with self._lock:
+            self._sync_from_file()
+            entry = self._entries.get(key)
+            if entry is None or entry["expires_at"] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["status"], dict(entry["headers"]), entry["content"]
+
+    def put(self, key, url, status, headers, content):
+        """只缓存成功的响应"""
+        if status != 200 or sniff_code(content) not in (0, None):
+            return
+        entry = {
+            "expires_at": time.time() + self.ttl,
+            "scope": resource_scope(url),
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() == "content-type"},
+            "content": content,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+            self._persist(lambda entries: entries.__setitem__(key, entry))
+
+    def invalidate(self, url):
+        """写操作后调用，作废该资源及关联资源下的所有缓存"""
+        scope = resource_scope(url)
+        scopes = {scope, *LINKED_SCOPES.get(scope, [])}
+        with self._lock:
+            self._drop_scopes(self._entries, scopes)
+            self._persist(lambda entries: self._drop_scopes(entries, scopes))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._persist(lambda entries: entries.clear())
+
+    def _drop_scopes(self, entries, scopes):
+        for key in [k for k, v in entries.items() if v["scope"] in scopes]:
+            del entries[key]
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # --- 磁盘持久化 ---
+
+    def _sync_from_file(self):
+        """其他进程写入 (新缓存或作废) 后文件 mtime 会变化，重新加载"""
+        if not self.persist_path:
+            return
+        try:
+            mtime = os.stat(self.persist_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._file_mtime:
+            self._entries = self._read_file()
+            self._file_mtime = mtime
+
+    def _persist(self, apply):
+        """在文件锁内读取 -> 修改 -> 写回，合并其他进程的改动"""
+        if not self.persist_path:
+            return
+        with FileLock(self.persist_path + ".lock"):
+            entries = self._read_file()
+            apply(entries)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._write_file(entries)
+            self._entries = entries
+            self._file_mtime = os.stat(self.persist_path).st_mtime_ns
+
+    def _read_file(self):
+        entries = OrderedDict()
+        if not os.path.exists(self.persist_path):
+            return entries
+        try:
+            with open(self.persist_path, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return entries
+        now = time.time()
+        for key, entry in data.items():
+            if entry.get("expires_at", 0) > now:
+                entry["content"] = base64.b64decode(entry["content"])
+                entries[key] = entry
+        return entries
+
+    def _write_file(self, entries):
+        now = time.time()
+        data = {
+            key: dict(entry, content=base64.b64encode(entry["content"]).decode("ascii"))
+            for key, entry in entries.items() if entry["expires_at"] > now
+        }
+        tmp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.persist_path)
+
+
+def _from_env():
+    mode = os.environ.get("SKILL_RESPONSE_CACHE", "").lower()
+    if mode in ("", "0", "off", "false", "no"):
+        return None
+    return ResponseCache(persist_path=RESPONSE_CACHE_FILE if mode == "disk" else None)
+
+
+_default_cache = _from_env()
+
+
+def get_response_cache():
+    """进程内共享的响应缓存，未启用时返回 None"""
+    return _default_cache
+
+
+def configure_response_cache(enabled=True, **kwargs):
+    """
+    启用 / 关闭响应缓存 (参数同 ResponseCache)
+    例如: configure_response_cache(ttl=30, persist_path=RESPONSE_CACHE_FILE)
+    """
+    global _default_cache
+    _default_cache = ResponseCache(**kwargs) if enabled else None
+    return _default_cache
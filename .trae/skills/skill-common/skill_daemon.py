@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+常驻 Skill 守护进程
+用法: python3 skill_daemon.py start|stop|status|serve|metrics [--idle-timeout SECONDS] [--format json|prometheus]
+
+在 Unix domain socket 上接收 skill_run.py 转发的命令，在本进程内执行对应的 CLI 脚本：
+- Python 解释器、requests 等模块只加载一次
+- tenant_access_token 缓存在内存中，HTTP 连接池保持热连接
+- 脚本的 stdout / stderr / 退出码原样返回给 shim 打印
+- 累计所有执行的请求指标，可通过 metrics 命令导出 (JSON / Prometheus 文本)
+
+CLI 脚本依赖进程级状态 (sys.argv、sys.stdout、工作目录)，因此脚本按顺序逐个执行；
+每次执行后卸载从该 skill 目录导入的模块，不同 skill 中的同名模块互不干扰。
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import runpy
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from daemon_protocol import SOCKET_PATH, LOG_FILE, send_message, recv_message, request
+from metrics import MetricsRegistry, get_metrics, add_request_hook, remove_request_hook
+
+
+def _exit_code(exc):
+    """把 SystemExit 转换为进程退出码"""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    return 1
+
+
+def _unload_script_modules(script, saved_modules):
+    """
+    卸载本次执行中从脚本所在 skill 目录导入的模块
+    各 skill 目录中有同名的脚本模块 (list、query、modify 等)，留在 sys.modules 中会遮蔽另一个 skill 的同名模块
+    """
+    skill_dir = os.path.join(os.path.dirname(os.path.abspath(script)), "")
+    for name in set(sys.modules) - saved_modules:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path and os.path.abspath(path).startswith(skill_dir):
+            del sys.modules[name]
+
+
+class SkillDaemon:
+    def __init__(self, socket_path=SOCKET_PATH, idle_timeout=0):
+        """
+        :param idle_timeout: 空闲超过该秒数后自动退出，0 表示不自动退出
+        """
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.started_at = time.time()
+        self.last_active = time.time()
+        self.runs = 0
+        self._run_lock = threading.Lock()
+        self._server = None
+
+    def run_script(self, script, argv, cwd=None, metrics=None):
+        """
+        在本进程内以 __main__ 身份执行脚本，返回 (stdout, stderr, exit_code, metrics_output)
+        :param metrics: json / prometheus 时额外返回本次执行的请求指标
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        run_metrics = MetricsRegistry() if metrics else None
+        with self._run_lock:
+            saved_argv = sys.argv
+            saved_path = list(sys.path)
+            saved_cwd = os.getcwd()
+            saved_stdin = sys.stdin
+            saved_modules = set(sys.modules)
+            exit_code = 0
+            if run_metrics:
+                add_request_hook(run_metrics.record)
+            try:
+                sys.argv = [script] + list(argv)
+                sys.stdin = io.StringIO()  # 守护进程中不支持交互式输入
+                if cwd:
+                    os.chdir(cwd)
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    try:
+                        runpy.run_path(script, run_name="__main__")
+                    except SystemExit as e:
+                        exit_code = _exit_code(e)
+                        if exit_code and not isinstance(e.code, int):
+                            print(e.code, file=sys.stderr)
+                    except BaseException:
+                        traceback.print_exc()
+                        exit_code = 1
+            finally:
+                if run_metrics:
+                    remove_request_hook(run_metrics.record)
+                sys.argv = saved_argv
+                sys.path[:] = saved_path
+                sys.stdin = saved_stdin
+                os.chdir(saved_cwd)
+                _unload_script_modules(script, saved_modules)
+                self.runs += 1
+                self.last_active = time.time()
+        metrics_output = run_metrics.export(metrics) if run_metrics else None
+        return stdout.getvalue(), stderr.getvalue(), exit_code, metrics_output
+
+    def handle(self, message):
+        command = message.get("command")
+        if command == "run":
+            script = message.get("script")
+            if not script or not os.path.isfile(script):
+                return {"ok": False, "error": f"Script not found: {script}"}
+            stdout, stderr, exit_code, metrics = self.run_script(
+                script, message.get("argv", []), message.get("cwd"), message.get("metrics"))
+            response = {"ok": True, "stdout": stdout, "stderr": stderr, "exit_code": exit_code}
+            if metrics:
+                response["metrics"] = metrics
+            return response
+        if command == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started_at, 1),
+                "runs": self.runs
+            }
+        if command == "metrics":
+            registry = get_metrics()
+            output = registry.export(message.get("format", "json"))
+            if message.get("reset"):
+                registry.reset()
+            return {"ok": True, "metrics": output}
+        if command == "shutdown":
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command: {command}"}
+
+    def serve(self):
+        # 清理上次异常退出遗留的 socket 文件
+        if os.path.exists(self.socket_path):
+            if request({"command": "ping"}, self.socket_path):
+                print(f"Daemon already running on {self.socket_path}")
+                return False
+            os.unlink(self.socket_path)
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    message = recv_message(self.connection)
+                    if message is None:
+                        return
+                    response = daemon.handle(message)
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                send_message(self.connection, response)
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        old_umask = os.umask(0o177)  # socket 仅当前用户可访问
+        try:
+            self._server = Server(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+
+        print(f"Skill daemon listening on {self.socket_path} (pid {os.getpid()})", flush=True)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            print("Skill daemon stopped.", flush=True)
+        return True
+
+    def _watch_idle(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 30))
+            if time.time() - self.last_active > self.idle_timeout and not self._run_lock.locked():
+                print("Idle timeout reached, shutting down.", flush=True)
+                self._server.shutdown()
+                return
+
+
+def start_background(idle_timeout):
+    """以后台进程启动 daemon，日志写入 LOG_FILE"""
+    if request({"command": "ping"}):
+        print(f"✅ Daemon already running ({SOCKET_PATH})")
+        return True
+
+    cmd = [sys.executable, os.path.abspath(__file__), "serve", "--idle-timeout", str(idle_timeout)]
+    with open(LOG_FILE, "a") as log:
+        subprocess.Popen(cmd, stdout=log, stderr=log, stdin=subprocess.DEVNULL, start_new_session=True)
+
+    # 等待 socket 就绪
+    for _ in range(50):
+        time.sleep(0.1)
+        status = request({"command": "ping"})
+        if status:
+            print(f"✅ Daemon started (pid {status.get('pid')}, socket {SOCKET_PATH})")
+            return True
+    print(f"❌ Daemon failed to start, see {LOG_FILE}")
+    return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="常驻 Skill 守护进程")
+    parser.add_argument("action", choices=["start", "stop", "status", "serve", "metrics"],
+                        help="start: 后台启动; stop: 停止; status: 查看状态; serve: 前台运行; metrics: 导出请求指标")
+    parser.add_argument("--idle-timeout", type=int, default=0, help="空闲多少秒后自动退出 (默认不退出)")
+    parser.add_argument("--format", choices=["json", "prometheus"], default="json", help="metrics 输出格式")
+    parser.add_argument("--reset", action="store_true", help="metrics 导出后清空累计指标")
+
+    args = parser.parse_args()
+
+    if args.action == "serve":
+        ok = SkillDaemon(idle_timeout=args.idle_timeout).serve()
+        sys.exit(0 if ok else 1)
+    elif args.action == "start":
+        sys.exit(0 if start_background(args.idle_timeout) else 1)
+    elif args.action == "stop":
+        if request({"command": "shutdown"}):
+            print("🛑 Daemon stopped")
+        else:
+            print("Daemon is not running")
+    elif args.action == "status":
+        status = request({"command": "ping"})
+        if status:
+            print(f"✅ Running: pid {status.get('pid')}, uptime {status.get('uptime')}s, runs {status.get('runs')}")
+        else:
+            print("Daemon is not running")
+            sys.exit(1)
+    elif args.action == "metrics":
+        response = request({"command": "metrics", "format": args.format, "reset": args.reset})
+        if response and response.get("ok"):
+            sys.stdout.write(response["metrics"])
+        else:
+            print("Daemon is not running")
+            sys.exit(1)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Skill CLI 转发脚本
+用法: python3 skill_run.py [--metrics json|prometheus] [--metrics-file PATH] <skill>/<script.py> [原脚本参数...]
+示例: python3 .trae/skills/skill-common/skill_run.py feishu-tasks/list.py 10 --type created
+      python3 .trae/skills/skill-common/skill_run.py --metrics prometheus feishu-calendar/list.py 7
+
+如果 skill_daemon 正在运行，命令会转发给 daemon 执行 (跳过模块导入、token 获取与 TLS 握手)，
+输出与退出码与直接运行原脚本一致；daemon 未运行时在当前进程内直接执行原脚本。
+--metrics 会在脚本结束后把本次执行的请求指标 (各接口耗时、状态码、重试等) 输出到 stderr 或 --metrics-file。
+"""
+
+import os
+import runpy
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+SKILLS_DIR = os.path.dirname(current_dir)
+sys.path.append(current_dir)
+
+from daemon_protocol import request
+
+
+def resolve_script(name):
+    """支持绝对/相对路径，或相对于 .trae/skills 的 <skill>/<script.py>"""
+    if os.path.isfile(name):
+        return os.path.abspath(name)
+    candidate = os.path.join(SKILLS_DIR, name)
+    if os.path.isfile(candidate):
+        return candidate
+    return None
+
+
+def parse_options(args):
+    """解析脚本路径之前的 shim 选项，返回 (options, 剩余参数)"""
+    options = {"metrics": None, "metrics_file": None}
+    while args and args[0] in ("--metrics", "--metrics-file"):
+        if len(args) < 2:
+            print(f"❌ {args[0]} requires a value")
+            sys.exit(1)
+        options[args[0][2:].replace("-", "_")] = args[1]
+        args = args[2:]
+    if options["metrics_file"] and not options["metrics"]:
+        options["metrics"] = "json"
+    if options["metrics"] not in (None, "json", "prometheus"):
+        print(f"❌ Unknown metrics format: {options['metrics']} (json|prometheus)")
+        sys.exit(1)
+    return options, args
+
+
+def write_metrics(output, path=None):
+    if path:
+        with open(os.path.expanduser(path), "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        sys.stderr.write(output)
+
+
+def run(script, argv, metrics=None, metrics_file=None):
+    message = {"command": "run", "script": script, "argv": argv, "cwd": os.getcwd()}
+    if metrics:
+        message["metrics"] = metrics
+    response = request(message)
+    if response and response.get("ok"):
+        sys.stdout.write(response.get("stdout", ""))
+        sys.stderr.write(response.get("stderr", ""))
+        if response.get("metrics"):
+            write_metrics(response["metrics"], metrics_file)
+        return response.get("exit_code", 0)
+    if response:
+        print(f"Daemon error: {response.get('error')}, running in-process.", file=sys.stderr)
+
+    # 回退：在当前进程内执行，指标由 metrics 模块在退出时输出
+    if metrics:
+        os.environ["SKILL_METRICS"] = metrics
+        if metrics_file:
+            os.environ["SKILL_METRICS_FILE"] = metrics_file
+    sys.argv = [script] + argv
+    runpy.run_path(script, run_name="__main__")
+    return 0
+
+
+if __name__ == "__main__":
+    options, args = parse_options(sys.argv[1:])
+    if not args:
+        print("Usage: python3 skill_run.py [--metrics json|prometheus] [--metrics-file PATH] <skill>/<script.py> [args...]")
+        print("Example: python3 skill_run.py feishu-calendar/list.py 7")
+        sys.exit(1)
+
+    script = resolve_script(args[0])
+    if not script:
+        print(f"❌ Script not found: {args[0]}")
+        sys.exit(1)
+
+    sys.exit(run(script, args[1:], options["metrics"], options["metrics_file"]))
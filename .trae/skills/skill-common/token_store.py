@@ -0,0 +1,173 @@
+"""
+跨进程共享的 tenant_access_token 缓存
+
+所有飞书 Skill 客户端 (calendar / tasks / drive / cards) 通过本模块获取 token：
+- 缓存文件 ~/.feishu_token_cache.json，按 app_id 存储 token 与过期时间
+- 刷新时持有文件锁，并在锁内再次检查缓存，保证同一时刻只有一个进程去请求飞书
+- 写入使用临时文件 + os.replace，读取端永远看不到写了一半的文件
+- 接口返回 token 失效时，传输层调用 refresh_invalid() 作废缓存并换用新 token 重放一次请求；
+  之后仍带着旧 token 的请求 (客户端实例内的缓存) 由 current() 直接换成新 token
+"""
+
+import json
+import os
+import threading
+import time
+
+from api_base import FEISHU_API_BASE
+from file_lock import FileLock
+from http_transport import get_transport
+from request_scheduler import INVALID_TOKEN_CODES
+
+TOKEN_CACHE_FILE = os.path.expanduser("~/.feishu_token_cache.json")
+TOKEN_URL = f"{FEISHU_API_BASE}/auth/v3/tenant_access_token/internal"
+EXPIRE_MARGIN = 60  # 提前60秒过期
+
+
+class TokenStore:
+    def __init__(self, path=TOKEN_CACHE_FILE):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._memory = {}  # app_id -> {"token": ..., "expire_at": ...}
+        self._secrets = {}  # app_id -> app_secret，token 失效时用于重新获取 (只保存在内存中)
+        self._owners = {}  # token -> app_id
+        self._replaced = {}  # 失效的 token -> 换用的 {"token": ..., "expire_at": ...}
+        self._thread_lock = threading.Lock()
+
+    def get_token(self, app_id, app_secret, force_refresh=False):
+        """
+        获取 app_id 对应的 tenant_access_token
+        :return: (token, expire_at) expire_at 为已扣除提前量的绝对时间戳
+        """
+        if not app_id or not app_secret:
+            raise ValueError("App ID and App Secret are required.")
+        self._secrets[app_id] = app_secret
+
+        if not force_refresh:
+            cached = self.peek(app_id)
+            if cached:
+                return cached
+
+        with self._thread_lock, self._file_lock():
+            # 加锁后再读一次：可能其他进程刚刚完成了刷新
+            cache = self._read_file()
+            entry = None if force_refresh else self._valid_entry(cache.get(app_id))
+            if not entry:
+                entry = self._fetch(app_id, app_secret)
+                cache[app_id] = entry
+                self._write_file(cache)
+            self._remember(app_id, entry)
+            return entry["token"], entry["expire_at"]
+
+    def peek(self, app_id, app_secret=None):
+        """
+        只读查询缓存 (不加锁、不发请求)
+        :param app_secret: 传入时记下，返回的 token 失效时 refresh_invalid() 可以重新获取
+        :return: (token, expire_at)，没有有效缓存时返回 None
+        """
+        if app_secret:
+            self._secrets[app_id] = app_secret
+        entry = self._valid_entry(self._memory.get(app_id))
+        if not entry:
+            entry = self._valid_entry(self._read_file().get(app_id))
+        if not entry:
+            return None
+        self._remember(app_id, entry)
+        return entry["token"], entry["expire_at"]
+
+    def invalidate(self, app_id, token=None):
+        """
+        作废缓存中的 token (例如接口返回 token 失效)
+        :param token: 仅当缓存中的 token 与之相同时才作废，避免误删其他进程刚刷新的 token
+        """
+        with self._thread_lock, self._file_lock():
+            self._memory.pop(app_id, None)
+            cache = self._read_file()
+            entry = cache.get(app_id)
+            if entry and (token is None or entry.get("token") == token):
+                cache.pop(app_id)
+                self._write_file(cache)
+
+    def refresh_invalid(self, token):
+        """
+        接口返回 token 失效 (INVALID_TOKEN_CODES) 时由传输层调用：作废缓存并重新获取
+        同一个失效 token 只刷新一次，并发请求随后拿到的都是同一个新 token
+        :return: 新 token；不是经本对象获取的 token (不知道 app_secret) 或刷新后仍是同一个 token 时返回 None
+        """
+        replaced = self._valid_entry(self._replaced.get(token))
+        if replaced:
+            return replaced["token"]
+        app_id = self._owners.get(token)
+        app_secret = self._secrets.get(app_id)
+        if not app_secret:
+            return None
+        self.invalidate(app_id, token)
+        new_token, expire_at = self.get_token(app_id, app_secret)
+        if new_token == token:
+            return None
+        self._replaced[token] = {"token": new_token, "expire_at": expire_at}
+        return new_token
+
+    def current(self, token):
+        """token 已被 refresh_invalid() 换掉时返回新 token，否则原样返回"""
+        replaced = self._valid_entry(self._replaced.get(token))
+        return replaced["token"] if replaced else token
+
+    def _remember(self, app_id, entry):
+        self._memory[app_id] = entry
+        self._owners[entry["token"]] = app_id
+
+    def _fetch(self, app_id, app_secret):
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        payload = {
+            "app_id": app_id,
+            "app_secret": app_secret
+        }
+        response = get_transport().post(TOKEN_URL, headers=headers, json=payload)
+        resp_json = response.json()
+
+        if resp_json.get("code") != 0:
+            raise Exception(f"Get token failed: {resp_json}")
+
+        return {
+            "token": resp_json.get("tenant_access_token"),
+            "expire_at": time.time() + resp_json.get("expire", 7200) - EXPIRE_MARGIN
+        }
+
+    def _valid_entry(self, entry):
+        if entry and entry.get("token") and time.time() < entry.get("expire_at", 0):
+            return entry
+        return None
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+                return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _write_file(self, cache):
+        # 只保留未过期的条目，避免文件无限增长
+        cache = {k: v for k, v in cache.items() if self._valid_entry(v)}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.path)
+
+    def _file_lock(self):
+        return FileLock(self.lock_path)
+
+
+_default_store = None
+
+
+def get_token_store():
+    """进程内单例，配合文件缓存在进程之间共享 token"""
+    global _default_store
+    if _default_store is None:
+        _default_store = TokenStore()
+    return _default_store
@@ -0,0 +1,82 @@
+import asyncio
+
+from volcengine_client import VolcengineVision, DEFAULT_MODEL, API_ENDPOINT
+from async_transport import get_async_transport, close_async_transport, AsyncHTTPError, aiohttp
+from metrics import instrument_client
+
+
+@instrument_client
+class AsyncVolcengineVision(VolcengineVision):
+    """
+    VolcengineVision 的 asyncio 版本，方法与同步版本一致，需要 await 调用
+    配置读取与 initialize() 复用同步版本
+    """
+
+    async def analyze_image(self, image_url, prompt="图片主要讲了什么?", model=DEFAULT_MODEL):
+        """
+        调用火山引擎视觉模型分析图片 (参数同 VolcengineVision.analyze_image)
+        :return: 模型返回的文本描述
+        """
+        if not self.api_key:
+            print("API Key is missing. Please run initialize() first.")
+            return None
+
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        payload = {
+            "model": model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": image_url
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": prompt
+                        }
+                    ]
+                }
+            ]
+        }
+
+        transport = get_async_transport()
+        try:
+            response = await transport.post(API_ENDPOINT, headers=headers, json=payload)
+            response.raise_for_status()
+
+            resp_json = response.json()
+
+            if "choices" in resp_json and len(resp_json["choices"]) > 0:
+                return resp_json["choices"][0]["message"]["content"]
+            else:
+                return f"Error: Unexpected response format: {resp_json}"
+
+        except (AsyncHTTPError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return f"API Request Failed: {e}"
+        except Exception as e:
+            return f"An error occurred: {e}"
+
+
+if __name__ == "__main__":
+    import sys
+
+    async def main(image_url):
+        client = AsyncVolcengineVision()
+        if not client.api_key:
+            print("Volcengine Vision is not configured. Please run: python3 volcengine_client.py")
+            return
+        print(await client.analyze_image(image_url))
+        await close_async_transport()
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 async_volcengine_client.py IMAGE_URL")
+        sys.exit(1)
+    asyncio.run(main(sys.argv[1]))
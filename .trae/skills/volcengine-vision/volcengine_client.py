@@ -1,12 +1,22 @@
 import json
 import os
+import sys
 import requests
 
+# 共享运行时 (连接池等) 位于 .trae/skills/skill-common
+COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "skill-common")
+if COMMON_DIR not in sys.path:
+    sys.path.append(COMMON_DIR)
+from http_transport import get_transport
+from api_base import ARK_API_BASE
+from metrics import instrument_client
+
 CONFIG_FILE = os.path.expanduser("~/.volcengine_config.json")
 LOCAL_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".volcengine_config.json")
 DEFAULT_MODEL = "doubao-seed-1-6-vision-250815"
-API_ENDPOINT = "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+API_ENDPOINT = f"{ARK_API_BASE}/chat/completions"
 
+@instrument_client
 class VolcengineVision:
     def __init__(self):
         self.config = self._load_config()
@@ -93,7 +103,7 @@ class VolcengineVision:
         }
         
         try:
-            response = requests.post(API_ENDPOINT, headers=headers, json=payload)
+            response = get_transport().post(API_ENDPOINT, headers=headers, json=payload)
             response.raise_for_status() # 检查 HTTP 错误
             
             resp_json = response.json()
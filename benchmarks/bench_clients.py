@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Skill 客户端离线基准测试
+用法: python3 benchmarks/bench_clients.py [--iterations 200] [--concurrency 8] [--latency 20] [--only task]
+                                          [--async] [--json bench_output.json]
+                                          [--baseline old.json --max-regression 0.25]
+
+启动本地 mock 服务 (mock_feishu_server.py)，对每个客户端的每个公开方法执行 N 次调用
+(批量完成 / 修改 / 删除、批量创建任务与导入 ICS 每次调用处理 BULK_SIZE 行)，
+输出延迟分位数 (p50/p90/p99/max) 与吞吐；指定 --baseline 时与历史结果比较，退化超过阈值则以非 0 退出。
+运行期间 HOME 指向临时目录，不会读写真实的 ~/.feishu_*_config.json。
+"""
+
+import argparse
+import asyncio
+import contextlib
+import inspect
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SKILLS_DIR = os.path.join(os.path.dirname(BENCH_DIR), ".trae", "skills")
+sys.path.append(BENCH_DIR)
+
+from mock_feishu_server import MockFeishuServer
+
+# 批量 / 导入类操作每次调用处理的行数
+BULK_SIZE = 10
+# 忙闲查询的参与人
+FREEBUSY_USERS = ["ou_bench", "ou_member_1", "ou_member_2"]
+
+BENCH_CONFIG = {
+    "app_id": "cli_bench",
+    "app_secret": "bench_secret",
+    "phone": "13800000000",
+    "open_id": "ou_bench"
+}
+
+
+def prepare_environment(server):
+    """隔离 HOME 并让客户端指向 mock 服务，必须在导入客户端之前调用"""
+    home = tempfile.mkdtemp(prefix="skill_bench_")
+    os.environ["HOME"] = home
+    os.environ["FEISHU_API_BASE"] = server.feishu_api_base
+    os.environ["ARK_API_BASE"] = server.ark_api_base
+    for name in ["calendar", "task", "drive", "card"]:
+        with open(os.path.join(home, f".feishu_{name}_config.json"), "w") as f:
+            json.dump(BENCH_CONFIG, f)
+    with open(os.path.join(home, ".volcengine_config.json"), "w") as f:
+        json.dump({"ark_api_key": "bench_key"}, f)
+    for skill in ["skill-common", "feishu-calendar", "feishu-tasks", "feishu-drive", "feishu-cards", "volcengine-vision"]:
+        sys.path.append(os.path.join(SKILLS_DIR, skill))
+    return home
+
+
+def load_clients(use_async=False):
+    if use_async:
+        from async_feishu_client import AsyncFeishuCalendar
+        from async_feishu_task_client import AsyncFeishuTask
+        from async_feishu_drive_client import AsyncFeishuDrive
+        from async_feishu_card_client import AsyncFeishuCard
+        from async_volcengine_client import AsyncVolcengineVision
+        return {
+            "calendar": AsyncFeishuCalendar(),
+            "task": AsyncFeishuTask(),
+            "drive": AsyncFeishuDrive(),
+            "card": AsyncFeishuCard(),
+            "vision": AsyncVolcengineVision(),
+        }
+    from feishu_client import FeishuCalendar
+    from feishu_task_client import FeishuTask
+    from feishu_drive_client import FeishuDrive
+    from feishu_card_client import FeishuCard
+    from volcengine_client import VolcengineVision
+    return {
+        "calendar": FeishuCalendar(),
+        "task": FeishuTask(),
+        "drive": FeishuDrive(),
+        "card": FeishuCard(),
+        "vision": VolcengineVision(),
+    }
+
+
+def build_operations(clients, n, upload_path):
+    """
+    返回 [(操作名, 客户端 key, 方法名, 每次调用的参数列表)]
+    需要已有资源的操作 (get/update/delete 等) 在这里用同步客户端预先创建，不计入耗时
+    """
+    task = clients["task"]
+    drive = clients["drive"]
+    now = int(time.time())
+
+    def create_tasks(count):
+        return [task.create_task(f"bench setup {i}")["data"]["task"]["guid"] for i in range(count)]
+
+    def create_files(count):
+        return [drive.create_folder(f"bench setup {i}")["data"]["token"] for i in range(count)]
+
+    def write_inputs(count):
+        """每次导入调用使用各自的输入文件 (清单写在旁边)，重复运行基准时不会被当作已完成"""
+        folder = tempfile.mkdtemp(prefix="inputs_", dir=os.environ["HOME"])
+        ics_paths, csv_paths = [], []
+        for i in range(count):
+            ics_path = os.path.join(folder, f"import_{i}.ics")
+            with open(ics_path, "w", encoding="utf-8") as f:
+                f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+                for j in range(BULK_SIZE):
+                    start = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(now + (i * BULK_SIZE + j) * 3600))
+                    f.write(f"BEGIN:VEVENT\r\nUID:bench-{i}-{j}\r\nSUMMARY:import {i}-{j}\r\n"
+                            f"DTSTART:{start}\r\nDURATION:PT30M\r\nEND:VEVENT\r\n")
+                f.write("END:VCALENDAR\r\n")
+            csv_path = os.path.join(folder, f"tasks_{i}.csv")
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("summary\n" + "".join(f"import {i}-{j}\n" for j in range(BULK_SIZE)))
+            ics_paths.append(ics_path)
+            csv_paths.append(csv_path)
+        return ics_paths, csv_paths
+
+    shared_task = create_tasks(1)[0]
+    shared_file = create_files(1)[0]
+    target_folder = create_files(1)[0]
+    doc_id = drive.create_doc("bench doc")["data"]["document"]["document_id"]
+    delete_tasks = create_tasks(n)
+    delete_files = create_files(n)
+    bulk_tasks = create_tasks(BULK_SIZE)
+    bulk_delete_tasks = create_tasks(n * BULK_SIZE)
+    ics_paths, csv_paths = write_inputs(n)
+    week = (now, now + 7 * 86400)
+
+    return [
+        ("calendar.list_calendars", "calendar", "list_calendars", [() for _ in range(n)]),
+        ("calendar.create_event", "calendar", "create_event",
+         [(f"bench {i}", now + i * 3600, now + i * 3600 + 1800) for i in range(n)]),
+        ("calendar.iter_events", "calendar", "iter_events", [(now, now + n * 3600) for _ in range(n)]),
+        ("calendar.batch_freebusy", "calendar", "batch_freebusy", [(FREEBUSY_USERS, *week) for _ in range(n)]),
+        ("calendar.find_common_free_slots", "calendar", "find_common_free_slots",
+         [(FREEBUSY_USERS, 30, *week) for _ in range(n)]),
+        ("calendar.import_ics", "calendar", "import_ics", [(path,) for path in ics_paths]),
+        ("task.create_task", "task", "create_task", [(f"bench {i}",) for i in range(n)]),
+        ("task.list_tasks", "task", "list_tasks", [() for _ in range(n)]),
+        ("task.get_task", "task", "get_task", [(shared_task,) for _ in range(n)]),
+        ("task.update_task", "task", "update_task", [(shared_task, f"renamed {i}") for i in range(n)]),
+        ("task.complete_task", "task", "complete_task", [(shared_task,) for _ in range(n)]),
+        ("task.delete_task", "task", "delete_task", [(guid,) for guid in delete_tasks]),
+        ("task.iter_tasks", "task", "iter_tasks", [() for _ in range(n)]),
+        ("task.sync_tasks", "task", "sync_tasks", [() for _ in range(n)]),
+        ("task.bulk_create_tasks", "task", "bulk_create_tasks", [(path,) for path in csv_paths]),
+        ("task.complete_tasks", "task", "complete_tasks", [(bulk_tasks,) for _ in range(n)]),
+        ("task.update_tasks", "task", "update_tasks", [(bulk_tasks, f"bulk {i}") for i in range(n)]),
+        ("task.delete_tasks", "task", "delete_tasks",
+         [(bulk_delete_tasks[i * BULK_SIZE:(i + 1) * BULK_SIZE],) for i in range(n)]),
+        ("drive.create_folder", "drive", "create_folder", [(f"folder {i}",) for i in range(n)]),
+        ("drive.create_doc", "drive", "create_doc", [(f"doc {i}",) for i in range(n)]),
+        ("drive.create_sheet", "drive", "create_sheet", [(f"sheet {i}",) for i in range(n)]),
+        ("drive.create_bitable", "drive", "create_bitable", [(f"bitable {i}",) for i in range(n)]),
+        ("drive.upload_file", "drive", "upload_file", [(upload_path,) for _ in range(n)]),
+        ("drive.list_files", "drive", "list_files", [() for _ in range(n)]),
+        ("drive.rename_file", "drive", "rename_file", [(shared_file, f"name {i}") for i in range(n)]),
+        ("drive.move_file", "drive", "move_file", [(shared_file, target_folder) for _ in range(n)]),
+        ("drive.delete_file", "drive", "delete_file", [(token, "folder") for token in delete_files]),
+        ("drive.add_docx_content", "drive", "add_docx_content", [(doc_id, f"line {i}") for i in range(n)]),
+        ("drive.add_member_permission", "drive", "add_member_permission",
+         [(shared_file, "ou_member") for _ in range(n)]),
+        ("card.send_card", "card", "send_card", [("bench", f"**message {i}**") for i in range(n)]),
+        ("vision.analyze_image", "vision", "analyze_image",
+         [("https://example.com/image.jpg",) for _ in range(n)]),
+    ]
+
+
+def _is_success(result):
+    if isinstance(result, dict):
+        if "code" in result:
+            return result.get("code") == 0
+        # 导入的统计 {"created", "failed", ...}、同步结果、忙闲结果
+        return not result.get("failed")
+    if isinstance(result, list) and result and isinstance(result[0], dict) and "ok" in result[0]:
+        # 批量完成 / 修改 / 删除：[{"guid", "ok", "error", ...}]
+        return all(item["ok"] for item in result)
+    return bool(result) and not str(result).startswith(("Error", "API Request Failed", "An error occurred"))
+
+
+def run_sync(client, method, calls, concurrency):
+    func = getattr(client, method)
+
+    def timed(args):
+        start = time.perf_counter()
+        result = func(*args)
+        if inspect.isgenerator(result):
+            result = list(result)
+        return time.perf_counter() - start, _is_success(result)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, calls))
+    return samples, time.perf_counter() - start
+
+
+async def run_async(client, method, calls, concurrency):
+    func = getattr(client, method)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(args):
+        async with semaphore:
+            start = time.perf_counter()
+            result = func(*args)
+            if inspect.isasyncgen(result):
+                result = [item async for item in result]
+            else:
+                result = await result
+            return time.perf_counter() - start, _is_success(result)
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*[timed(args) for args in calls])
+    return samples, time.perf_counter() - start
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, wall):
+    latencies = sorted(s[0] for s in samples)
+    return {
+        "count": len(samples),
+        "errors": sum(1 for s in samples if not s[1]),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0,
+        "throughput_rps": round(len(samples) / wall, 1) if wall else 0,
+    }
+
+
+def print_report(title, results):
+    print(f"\n{title}")
+    header = f"{'operation':<40}{'n':>6}{'err':>5}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}{'req/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<40}{r['count']:>6}{r['errors']:>5}{r['p50_ms']:>10.2f}{r['p90_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{r['throughput_rps']:>10.1f}")
+
+
+def compare_baseline(results, baseline, max_regression):
+    """返回退化超过阈值的 (操作, 指标, 基线, 当前) 列表"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if base.get(metric) and current[metric] > base[metric] * (1 + max_regression):
+                regressions.append((name, metric, base[metric], current[metric]))
+        if base.get("throughput_rps") and current["throughput_rps"] < base["throughput_rps"] / (1 + max_regression):
+            regressions.append((name, "throughput_rps", base["throughput_rps"], current["throughput_rps"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skill 客户端离线基准测试")
+    parser.add_argument("--iterations", type=int, default=200, help="每个操作的调用次数")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发数 (线程数 / 协程数)")
+    parser.add_argument("--latency", type=float, default=0, help="mock 服务固定延迟 (毫秒)")
+    parser.add_argument("--jitter", type=float, default=0, help="mock 服务随机延迟上限 (毫秒)")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="mock 服务返回频控错误的概率")
+    parser.add_argument("--only", help="只运行名称匹配该正则的操作，如 'task\\.'")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="同时测试 asyncio 客户端")
+    parser.add_argument("--respect-qps", action="store_true", help="保留默认的分组 QPS 限制 (默认关闭以测量客户端本身)")
+    parser.add_argument("--json", help="把结果写入 JSON 文件")
+    parser.add_argument("--baseline", help="与该 JSON 基线比较")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="允许的退化比例 (默认 0.25)")
+
+    args = parser.parse_args()
+
+    server = MockFeishuServer(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                              throttle_rate=args.throttle_rate).start()
+    prepare_environment(server)
+
+    from request_scheduler import configure_scheduler, DEFAULT_QPS
+    if not args.respect_qps:
+        configure_scheduler(qps={group: 0 for group in DEFAULT_QPS})
+
+    upload_path = os.path.join(os.environ["HOME"], "bench_upload.bin")
+    with open(upload_path, "wb") as f:
+        f.write(os.urandom(64 * 1024))
+
+    pattern = re.compile(args.only) if args.only else None
+    results = {}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        clients = load_clients()
+        clients["calendar"]._get_tenant_access_token()  # 预热 token 缓存与连接
+        operations = build_operations(clients, args.iterations, upload_path)
+        for name, key, method, calls in operations:
+            if pattern and not pattern.search(name):
+                continue
+            samples, wall = run_sync(clients[key], method, calls, args.concurrency)
+            results[name] = summarize(samples, wall)
+
+        if args.use_async:
+            from async_transport import close_async_transport
+
+            async def run_all_async():
+                async_clients = load_clients(use_async=True)
+                for name, key, method, calls in build_operations(clients, args.iterations, upload_path):
+                    if pattern and not pattern.search(name):
+                        continue
+                    samples, wall = await run_async(async_clients[key], method, calls, args.concurrency)
+                    results[f"async.{name}"] = summarize(samples, wall)
+                await close_async_transport()
+
+            asyncio.run(run_all_async())
+
+    server.stop()
+
+    print_report(f"Benchmark: iterations={args.iterations} concurrency={args.concurrency} "
+                 f"latency={args.latency}ms jitter={args.jitter}ms (latencies in ms)", results)
+    print(f"\nMock server requests: {sum(server.hits.values())}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.max_regression:.0%}:")
+            for name, metric, base, current in regressions:
+                print(f"  {name} {metric}: {base} -> {current}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
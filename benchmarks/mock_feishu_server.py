@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+本地 mock 飞书开放平台 / 火山方舟服务
+用法: python3 mock_feishu_server.py [--port 8900] [--latency 20] [--jitter 5] [--throttle-rate 0.0]
+
+模拟 Skill 客户端用到的接口 (auth/v3, contact/v3, calendar/v4, task/v2, drive/v1, docx/v1,
+sheets/v3, bitable/v1, im/v1 以及 Ark chat/completions)，数据保存在内存中，支持分页。
+启动后设置环境变量即可让客户端指向本服务：
+
+    export FEISHU_API_BASE=http://127.0.0.1:8900/open-apis
+    export ARK_API_BASE=http://127.0.0.1:8900/api/v3
+"""
+
+import argparse
+import collections
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+THROTTLE_CODE = 99991400
+INVALID_TOKEN_CODE = 99991663
+
+
+def _ok(data=None):
+    return {"code": 0, "msg": "success", "data": data or {}}
+
+
+def _error(code, msg):
+    return {"code": code, "msg": msg, "data": {}}
+
+
+def _parse_rfc3339(value):
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+
+
+def _format_rfc3339(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _event_ts(value):
+    """日程时间 -> 秒级时间戳；全天日程为 {"date": "YYYY-MM-DD"} (按本地时区零点计算)"""
+    if value.get("timestamp"):
+        return int(value["timestamp"])
+    return int(datetime.strptime(value["date"], "%Y-%m-%d").timestamp())
+
+
+def _now_ms():
+    return str(int(time.time() * 1000))
+
+
+class MockState:
+    """内存中的日历 / 任务 / 云空间数据"""
+
+    def __init__(self, calendars=1):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.calendars = collections.OrderedDict()
+        for i in range(calendars):
+            calendar_id = f"feishu.cn_mock{i}@group.calendar.feishu.cn"
+            self.calendars[calendar_id] = {
+                "calendar_id": calendar_id,
+                "summary": "默认日历" if i == 0 else f"日历 {i}",
+                "type": "primary" if i == 0 else "shared",
+                "role": "owner"
+            }
+        self.events = {calendar_id: collections.OrderedDict() for calendar_id in self.calendars}
+        # 日程变更序号，sync_token 即上次同步时的序号；删除的日程保留为 status=cancelled 的墓碑
+        self.event_seq = 0
+        # 额外的忙碌时段 open_id -> [(start, end)]，与作为参与人的日程一起由忙闲接口返回
+        self.busy = collections.defaultdict(list)
+        self.tasks = collections.OrderedDict()
+        self.task_tokens = {}
+        self.event_tokens = {}
+        self.files = collections.OrderedDict()
+        # 已吊销的 tenant_access_token，带着它的请求返回 token 失效
+        self.revoked_tokens = set()
+
+    def next_id(self, prefix):
+        return f"{prefix}_{next(self.ids)}_{uuid.uuid4().hex[:8]}"
+
+    def touch_event(self, event):
+        self.event_seq += 1
+        event["_seq"] = self.event_seq
+
+    def live_event(self, cid, eid):
+        event = self.events.get(cid, {}).get(eid)
+        return event if event and event.get("status") != "cancelled" else None
+
+
+def _paginate(items, query, default_size=50, max_size=500):
+    """page_token 为下一页起始下标"""
+    page_size = min(int(query.get("page_size", default_size)), max_size)
+    start = int(query.get("page_token") or 0)
+    page = items[start:start + page_size]
+    has_more = start + page_size < len(items)
+    return page, has_more, str(start + page_size) if has_more else ""
+
+
+class MockFeishuServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, throttle_rate=0.0, calendars=1):
+        """
+        :param latency: 每个请求的固定延迟 (秒)
+        :param jitter: 在固定延迟之上额外增加 [0, jitter] 的随机延迟 (秒)
+        :param throttle_rate: 以该概率返回飞书频控错误 (用于验证退避重试)
+        :param calendars: 预置的日历数量
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.state = MockState(calendars)
+        self.hits = collections.Counter()
+        self.routes = self._build_routes()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def feishu_api_base(self):
+        return f"{self.base_url}/open-apis"
+
+    @property
+    def ark_api_base(self):
+        return f"{self.base_url}/api/v3"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # --- 路由 ---
+
+    def _build_routes(self):
+        routes = [
+            ("POST", r"/open-apis/auth/v3/tenant_access_token/internal", self.auth_token),
+            ("POST", r"/open-apis/contact/v3/users/batch_get_id", self.batch_get_id),
+            ("GET", r"/open-apis/calendar/v4/calendars", self.list_calendars),
+            ("GET", r"/open-apis/calendar/v4/calendars/(?P<cid>[^/]+)/events", self.list_events),
+            ("POST", r"/open-apis/calendar/v4/calendars/(?P<cid>[^/]+)/events", self.create_event),
+            ("GET", r"/open-apis/calendar/v4/calendars/(?P<cid>[^/]+)/events/(?P<eid>[^/]+)", self.get_event),
+            ("PATCH", r"/open-apis/calendar/v4/calendars/(?P<cid>[^/]+)/events/(?P<eid>[^/]+)", self.patch_event),
+            ("DELETE", r"/open-apis/calendar/v4/calendars/(?P<cid>[^/]+)/events/(?P<eid>[^/]+)", self.delete_event),
+            ("POST", r"/open-apis/calendar/v4/calendars/(?P<cid>[^/]+)/events/(?P<eid>[^/]+)/attendees", self.add_attendees),
+            ("POST", r"/open-apis/calendar/v4/freebusy/list", self.list_freebusy),
+            ("GET", r"/open-apis/task/v2/tasks", self.list_tasks),
+            ("POST", r"/open-apis/task/v2/tasks", self.create_task),
+            ("GET", r"/open-apis/task/v2/tasks/(?P<guid>[^/]+)", self.get_task),
+            ("PATCH", r"/open-apis/task/v2/tasks/(?P<guid>[^/]+)", self.patch_task),
+            ("DELETE", r"/open-apis/task/v2/tasks/(?P<guid>[^/]+)", self.delete_task),
+            ("GET", r"/open-apis/drive/v1/files", self.list_files),
+            ("POST", r"/open-apis/drive/v1/files/create_folder", self.create_folder),
+            ("POST", r"/open-apis/drive/v1/files/upload_all", self.upload_file),
+            ("POST", r"/open-apis/drive/v1/files/(?P<token>[^/]+)/move", self.move_file),
+            ("PATCH", r"/open-apis/drive/v1/files/(?P<token>[^/]+)", self.rename_file),
+            ("DELETE", r"/open-apis/drive/v1/files/(?P<token>[^/]+)", self.delete_file),
+            ("POST", r"/open-apis/drive/v1/permissions/(?P<token>[^/]+)/members", self.add_permission),
+            ("POST", r"/open-apis/docx/v1/documents", self.create_docx),
+            ("POST", r"/open-apis/docx/v1/documents/(?P<doc>[^/]+)/blocks/(?P<block>[^/]+)/children", self.add_blocks),
+            ("POST", r"/open-apis/sheets/v3/spreadsheets", self.create_sheet),
+            ("POST", r"/open-apis/bitable/v1/apps", self.create_bitable),
+            ("POST", r"/open-apis/im/v1/messages", self.send_message),
+            ("POST", r"/api/v3/chat/completions", self.chat_completions),
+        ]
+        return [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in routes]
+
+    def dispatch(self, method, path, query, body, token=None):
+        """返回 (HTTP 状态码, 响应 JSON, 路由名)"""
+        for route_method, pattern, handler in self.routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                name = handler.__name__
+                if self.throttle_rate and random.random() < self.throttle_rate:
+                    return 400, _error(THROTTLE_CODE, "request trigger frequency limit"), name
+                if token and token in self.state.revoked_tokens:
+                    return 400, _error(INVALID_TOKEN_CODE, "Invalid access token for authorization"), name
+                with self.state.lock:
+                    return 200, handler(query, body, **match.groupdict()), name
+        return 404, _error(404, f"404 page not found: {method} {path}"), "not_found"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 支持 keep-alive
+            disable_nagle_algorithm = True  # 避免响应头与响应体分两次发送时触发 Nagle + 延迟 ACK (~40ms)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = {}
+                if raw and "json" in (self.headers.get("Content-Type") or ""):
+                    body = json.loads(raw)
+                elif raw:
+                    body = {"_raw_size": len(raw)}
+
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+
+                auth = self.headers.get("Authorization") or ""
+                token = auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+                status, payload, name = server.dispatch(self.command, parsed.path, query, body, token)
+                server.hits[name] += 1
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        return Handler
+
+    # --- auth / contact ---
+
+    def auth_token(self, query, body):
+        # 吊销后再次获取时签发新的 token
+        token = f"t-mock-{body.get('app_id')}"
+        while token in self.state.revoked_tokens:
+            token = f"t-mock-{body.get('app_id')}-{next(self.state.ids)}"
+        return {"code": 0, "msg": "ok", "tenant_access_token": token, "expire": 7200}
+
+    def batch_get_id(self, query, body):
+        mobiles, emails = body.get("mobiles", []), body.get("emails", [])
+        if len(mobiles) > 50 or len(emails) > 50:
+            return _error(99992402, "field validation failed: at most 50 mobiles / emails")
+        # 以 100 开头的手机号、external. 域名的邮箱模拟通讯录中不存在的用户 (不返回 user_id)
+        user_list = []
+        for mobile in mobiles:
+            user = {"mobile": mobile}
+            if not mobile.lstrip("+").startswith("100"):
+                user["user_id"] = f"ou_mobile_{mobile}"
+            user_list.append(user)
+        for email in emails:
+            user = {"email": email}
+            if "@external." not in email:
+                user["user_id"] = f"ou_email_{email.split('@')[0]}"
+            user_list.append(user)
+        return _ok({"user_list": user_list})
+
+    # --- calendar/v4 ---
+
+    def list_calendars(self, query, body):
+        items, has_more, page_token = _paginate(list(self.state.calendars.values()), query)
+        return _ok({"calendar_list": items, "has_more": has_more, "page_token": page_token})
+
+    def list_events(self, query, body, cid):
+        if cid not in self.state.events:
+            return _error(191001, "calendar not found")
+        events = list(self.state.events[cid].values())
+        sync_token = query.get("sync_token")
+        if sync_token:
+            # 增量同步：返回该序号之后新增 / 修改 / 删除 (cancelled) 的日程
+            if not sync_token.isdigit() or int(sync_token) > self.state.event_seq:
+                return _error(191004, "invalid sync_token")
+            events = [e for e in events if e["_seq"] > int(sync_token)]
+        else:
+            # 重复日程中被取消的某一次实例仍作为例外返回
+            events = [e for e in events if e.get("status") != "cancelled" or e.get("recurring_event_id")]
+        time_range = query.get("start_time") and query.get("end_time")
+        if time_range:
+            start, end = int(query["start_time"]), int(query["end_time"])
+            events = [e for e in events
+                      if _event_ts(e["start_time"]) < end and _event_ts(e["end_time"]) > start]
+        items, has_more, page_token = _paginate(events, query)
+        data = {
+            "items": [{k: v for k, v in e.items() if k != "_seq"} for e in items],
+            "has_more": has_more,
+            "page_token": page_token
+        }
+        if not has_more and not time_range:
+            data["sync_token"] = str(self.state.event_seq)
+        return _ok(data)
+
+    def create_event(self, query, body, cid):
+        if cid not in self.state.events:
+            return _error(191001, "calendar not found")
+        # 相同 idempotency_key 的请求返回已创建的日程
+        token = query.get("idempotency_key")
+        if token and (cid, token) in self.state.event_tokens:
+            event = self.state.events[cid][self.state.event_tokens[(cid, token)]]
+            return _ok({"event": {k: v for k, v in event.items() if k != "_seq"}})
+        event = dict(body)
+        event["event_id"] = self.state.next_id("evt")
+        event["status"] = "confirmed"
+        self.state.touch_event(event)
+        self.state.events[cid][event["event_id"]] = event
+        if token:
+            self.state.event_tokens[(cid, token)] = event["event_id"]
+        return _ok({"event": {k: v for k, v in event.items() if k != "_seq"}})
+
+    def get_event(self, query, body, cid, eid):
+        if cid not in self.state.events:
+            return _error(191001, "calendar not found")
+        event = self.state.live_event(cid, eid)
+        if not event:
+            return _error(193001, "event not found")
+        return _ok({"event": {k: v for k, v in event.items() if k != "_seq"}})
+
+    def patch_event(self, query, body, cid, eid):
+        if cid not in self.state.events:
+            return _error(191001, "calendar not found")
+        event = self.state.live_event(cid, eid)
+        if not event:
+            return _error(193001, "event not found")
+        event.update(body)
+        self.state.touch_event(event)
+        return _ok({"event": {k: v for k, v in event.items() if k != "_seq"}})
+
+    def delete_event(self, query, body, cid, eid):
+        if cid not in self.state.events:
+            return _error(191001, "calendar not found")
+        event = self.state.live_event(cid, eid)
+        if not event:
+            return _error(193001, "event not found")
+        event["status"] = "cancelled"
+        self.state.touch_event(event)
+        return _ok()
+
+    def add_attendees(self, query, body, cid, eid):
+        event = self.state.live_event(cid, eid)
+        if not event:
+            return _error(193001, "event not found")
+        event.setdefault("attendees", []).extend(body.get("attendees", []))
+        return _ok({"attendees": body.get("attendees", [])})
+
+    def list_freebusy(self, query, body):
+        user_id = body.get("user_id")
+        time_min = _parse_rfc3339(body["time_min"])
+        time_max = _parse_rfc3339(body["time_max"])
+        intervals = list(self.state.busy.get(user_id, []))
+        for events in self.state.events.values():
+            for event in list(events.values()):
+                if event.get("status") == "cancelled":
+                    continue
+                if any(a.get("user_id") == user_id for a in event.get("attendees", [])):
+                    intervals.append((_event_ts(event["start_time"]), _event_ts(event["end_time"])))
+        return _ok({"freebusy_list": [
+            {"start_time": _format_rfc3339(start), "end_time": _format_rfc3339(end)}
+            for start, end in sorted(intervals) if start < time_max and end > time_min
+        ]})
+
+    # --- task/v2 ---
+
+    def list_tasks(self, query, body):
+        items, has_more, page_token = _paginate(list(self.state.tasks.values()), query, default_size=50, max_size=100)
+        return _ok({"items": items, "has_more": has_more, "page_token": page_token})
+
+    def create_task(self, query, body):
+        # 相同 client_token 的请求返回已创建的任务
+        token = body.get("client_token")
+        if token and token in self.state.task_tokens:
+            return _ok({"task": self.state.tasks[self.state.task_tokens[token]]})
+        task = {k: v for k, v in body.items() if k != "client_token"}
+        task["guid"] = self.state.next_id("task")
+        task["completed_at"] = "0"
+        task["created_at"] = task["updated_at"] = _now_ms()
+        self.state.tasks[task["guid"]] = task
+        if token:
+            self.state.task_tokens[token] = task["guid"]
+        return _ok({"task": task})
+
+    def get_task(self, query, body, guid):
+        task = self.state.tasks.get(guid)
+        if not task:
+            return _error(1470404, "task not found")
+        return _ok({"task": task})
+
+    def patch_task(self, query, body, guid):
+        task = self.state.tasks.get(guid)
+        if not task:
+            return _error(1470404, "task not found")
+        for field in body.get("update_fields", []):
+            task[field] = body.get("task", {}).get(field)
+        task["updated_at"] = _now_ms()
+        return _ok({"task": task})
+
+    def delete_task(self, query, body, guid):
+        if not self.state.tasks.pop(guid, None):
+            return _error(1470404, "task not found")
+        return _ok()
+
+    # --- drive/v1, docx/v1, sheets/v3, bitable/v1 ---
+
+    def _add_file(self, name, type, parent=""):
+        token = self.state.next_id(type)
+        self.state.files[token] = {"token": token, "name": name, "type": type, "parent_token": parent}
+        return token
+
+    def list_files(self, query, body):
+        folder = query.get("folder_token", "")
+        files = [f for f in self.state.files.values() if f["parent_token"] == folder]
+        items, has_more, page_token = _paginate(files, query, default_size=100, max_size=200)
+        return _ok({"files": items, "has_more": has_more, "next_page_token": page_token})
+
+    def create_folder(self, query, body):
+        token = self._add_file(body.get("name"), "folder", body.get("folder_token", ""))
+        return _ok({"token": token, "url": f"https://feishu.cn/drive/folder/{token}"})
+
+    def upload_file(self, query, body):
+        token = self._add_file("upload", "file")
+        return _ok({"file_token": token})
+
+    def move_file(self, query, body, token):
+        if token not in self.state.files:
+            return _error(1061003, "not found")
+        self.state.files[token]["parent_token"] = body.get("folder_token", "")
+        return _ok({"task_id": ""})
+
+    def rename_file(self, query, body, token):
+        if token not in self.state.files:
+            return _error(1061003, "not found")
+        self.state.files[token]["name"] = body.get("name")
+        return _ok()
+
+    def delete_file(self, query, body, token):
+        if not self.state.files.pop(token, None):
+            return _error(1061003, "not found")
+        return _ok({"task_id": ""})
+
+    def add_permission(self, query, body, token):
+        return _ok({"member": body})
+
+    def create_docx(self, query, body):
+        token = self._add_file(body.get("title"), "docx", body.get("folder_token", ""))
+        return _ok({"document": {"document_id": token, "title": body.get("title")}})
+
+    def add_blocks(self, query, body, doc, block):
+        return _ok({"children": body.get("children", [])})
+
+    def create_sheet(self, query, body):
+        token = self._add_file(body.get("title"), "sheet", body.get("folder_token", ""))
+        return _ok({"spreadsheet": {"spreadsheet_token": token}})
+
+    def create_bitable(self, query, body):
+        token = self._add_file(body.get("name"), "bitable", body.get("folder_token", ""))
+        return _ok({"app": {"app_token": token}})
+
+    # --- im/v1 ---
+
+    def send_message(self, query, body):
+        return _ok({"message_id": self.state.next_id("om"), "msg_type": body.get("msg_type")})
+
+    # --- Ark ---
+
+    def chat_completions(self, query, body):
+        return {
+            "id": self.state.next_id("chatcmpl"),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "这是一张 mock 图片描述。"}}]
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地 mock 飞书开放平台 / 火山方舟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0, help="每个请求的固定延迟 (毫秒)")
+    parser.add_argument("--jitter", type=float, default=0, help="额外随机延迟上限 (毫秒)")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="返回频控错误的概率 (0~1)")
+    parser.add_argument("--calendars", type=int, default=1, help="预置日历数量")
+
+    args = parser.parse_args()
+
+    server = MockFeishuServer(args.host, args.port, args.latency / 1000, args.jitter / 1000,
+                              args.throttle_rate, args.calendars)
+    print(f"Mock server listening on {server.base_url}")
+    print(f"export FEISHU_API_BASE={server.feishu_api_base}")
+    print(f"export ARK_API_BASE={server.ark_api_base}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()